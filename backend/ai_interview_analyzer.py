@@ -1,24 +1,20 @@
-import openai
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from datetime import datetime
-import os
-from dotenv import load_dotenv
 import asyncio
 from dataclasses import dataclass
 from enum import Enum
 
-# Load environment variables
-load_dotenv()
+from llm_providers import LLMProvider
+from llm_routing import get_route_policy, routed_completion, routed_stream
+from llm_stream import JSONSectionParser, stream_json_sections
+from prompt_builder import PromptBuilder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 class AnalysisType(Enum):
     REAL_TIME = "real_time"
     POST_INTERVIEW = "post_interview"
@@ -37,10 +33,9 @@ class InterviewMetrics:
     learning_ability: float
 
 class AIInterviewAnalyzer:
-    def __init__(self):
-        self.model = "gpt-4"
-        self.max_tokens = 2000
-        self.temperature = 0.7
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        self.provider = provider  # None = the process-wide provider (LLM_PROVIDER)
+        # Model, max_tokens and temperature come from each AnalysisType's route (llm_routing)
         
     async def analyze_interview_session(self, 
                                       session_data: Dict[str, Any],
@@ -72,50 +67,17 @@ class AIInterviewAnalyzer:
     async def _analyze_post_interview(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze completed interview session"""
         try:
-            prompt = self._create_post_interview_prompt(session_data)
-            logger.info(f"Created prompt for post-interview analysis: {prompt[:200]}...")
-            
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt("post_interview")},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            feedback_text = await routed_completion(
+                AnalysisType.POST_INTERVIEW.value,
+                provider=self.provider,
+                messages=self._post_interview_messages(session_data)
             )
             
-            feedback_text = response.choices[0].message.content
             logger.info(f"OpenAI response received: {feedback_text[:200]}...")
             
             structured_feedback = self._parse_comprehensive_feedback(feedback_text)
             logger.info(f"Parsed feedback: {type(structured_feedback)} - {structured_feedback}")
-            
-            # Calculate overall metrics
-            metrics = self._calculate_overall_metrics(structured_feedback)
-            
-            return {
-                "success": True,
-                "analysis_type": "post_interview",
-                "timestamp": datetime.now().isoformat(),
-                "session_id": session_data.get("session_id", "unknown"),
-                "overall_score": structured_feedback.get("overall_score", 0),
-                "metrics": metrics,
-                "summary": structured_feedback.get("summary", ""),
-                "strengths": structured_feedback.get("strengths", []),
-                "improvements": structured_feedback.get("improvements", []),
-                "recommendations": structured_feedback.get("recommendations", []),
-                "next_steps": structured_feedback.get("next_steps", []),
-                "career_advice": structured_feedback.get("career_advice", []),
-                "skill_gaps": structured_feedback.get("skill_gaps", []),
-                "development_plan": structured_feedback.get("development_plan", []),
-                "interview_readiness": structured_feedback.get("interview_readiness", 0),
-                "detailed_analysis": structured_feedback.get("detailed_analysis", {}),
-                "confidence_indicators": structured_feedback.get("confidence_indicators", []),
-                "communication_patterns": structured_feedback.get("communication_patterns", []),
-                "technical_depth": structured_feedback.get("technical_depth", {}),
-                "behavioral_insights": structured_feedback.get("behavioral_insights", [])
-            }
+            return self._post_interview_result(session_data, structured_feedback)
             
         except Exception as e:
             logger.error(f"Error in post-interview analysis: {e}")
@@ -123,22 +85,84 @@ class AIInterviewAnalyzer:
             logger.error(f"Exception details: {str(e)}")
             return self._get_error_response(str(e))
     
+    async def stream_interview_session(self,
+                                       session_data: Dict[str, Any],
+                                       analysis_type: AnalysisType = AnalysisType.POST_INTERVIEW) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of ``analyze_interview_session``
+
+        Post-interview analysis is streamed: ``delta`` records carry raw
+        completion text and a ``section`` record follows as soon as each
+        top-level field is complete. Every analysis ends with one ``result``
+        record holding what ``analyze_interview_session`` would return (the
+        other analysis types only produce that record).
+        """
+        if analysis_type != AnalysisType.POST_INTERVIEW:
+            yield {"type": "result", "analysis": await self.analyze_interview_session(session_data, analysis_type)}
+            return
+        parser = JSONSectionParser()
+        try:
+            chunks = routed_stream(
+                AnalysisType.POST_INTERVIEW.value,
+                provider=self.provider,
+                messages=self._post_interview_messages(session_data)
+            )
+            async for record in stream_json_sections(chunks, parser):
+                yield record
+            structured_feedback = self._parse_comprehensive_feedback(parser.text)
+            yield {"type": "result", "analysis": self._post_interview_result(session_data, structured_feedback)}
+        except Exception as e:
+            logger.error(f"Error streaming post-interview analysis: {e}")
+            yield {"type": "error", "error": str(e), "analysis": self._get_error_response(str(e))}
+    
+    def _post_interview_messages(self, session_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        prompt = self._create_post_interview_prompt(session_data)
+        logger.info(f"Created prompt for post-interview analysis: {prompt[:200]}...")
+        return [
+            {"role": "system", "content": self._get_system_prompt("post_interview")},
+            {"role": "user", "content": prompt}
+        ]
+    
+    def _post_interview_result(self, session_data: Dict[str, Any], structured_feedback: Dict[str, Any]) -> Dict[str, Any]:
+        # Calculate overall metrics
+        metrics = self._calculate_overall_metrics(structured_feedback)
+        
+        return {
+            "success": True,
+            "analysis_type": "post_interview",
+            "timestamp": datetime.now().isoformat(),
+            "session_id": session_data.get("session_id", "unknown"),
+            "overall_score": structured_feedback.get("overall_score", 0),
+            "metrics": metrics,
+            "summary": structured_feedback.get("summary", ""),
+            "strengths": structured_feedback.get("strengths", []),
+            "improvements": structured_feedback.get("improvements", []),
+            "recommendations": structured_feedback.get("recommendations", []),
+            "next_steps": structured_feedback.get("next_steps", []),
+            "career_advice": structured_feedback.get("career_advice", []),
+            "skill_gaps": structured_feedback.get("skill_gaps", []),
+            "development_plan": structured_feedback.get("development_plan", []),
+            "interview_readiness": structured_feedback.get("interview_readiness", 0),
+            "detailed_analysis": structured_feedback.get("detailed_analysis", {}),
+            "confidence_indicators": structured_feedback.get("confidence_indicators", []),
+            "communication_patterns": structured_feedback.get("communication_patterns", []),
+            "technical_depth": structured_feedback.get("technical_depth", {}),
+            "behavioral_insights": structured_feedback.get("behavioral_insights", [])
+        }
+    
     async def _analyze_real_time(self, session_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze interview responses in real-time"""
         try:
             prompt = self._create_real_time_prompt(session_data)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
+            feedback_text = await routed_completion(
+                AnalysisType.REAL_TIME.value,
+                provider=self.provider,
                 messages=[
                     {"role": "system", "content": self._get_system_prompt("real_time")},
                     {"role": "user", "content": prompt}
-                ],
-                max_tokens=1500,
-                temperature=0.6
+                ]
             )
             
-            feedback_text = response.choices[0].message.content
             structured_feedback = self._parse_real_time_feedback(feedback_text)
             
             return {
@@ -164,17 +188,15 @@ class AIInterviewAnalyzer:
         try:
             prompt = self._create_skill_gap_prompt(session_data)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
+            feedback_text = await routed_completion(
+                AnalysisType.SKILL_ASSESSMENT.value,
+                provider=self.provider,
                 messages=[
                     {"role": "system", "content": self._get_system_prompt("skill_assessment")},
                     {"role": "user", "content": prompt}
-                ],
-                max_tokens=1800,
-                temperature=0.7
+                ]
             )
             
-            feedback_text = response.choices[0].message.content
             structured_feedback = self._parse_skill_gap_feedback(feedback_text)
             
             return {
@@ -200,17 +222,15 @@ class AIInterviewAnalyzer:
         try:
             prompt = self._create_career_development_prompt(session_data)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
+            feedback_text = await routed_completion(
+                AnalysisType.CAREER_DEVELOPMENT.value,
+                provider=self.provider,
                 messages=[
                     {"role": "system", "content": self._get_system_prompt("career_development")},
                     {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.8
+                ]
             )
             
-            feedback_text = response.choices[0].message.content
             structured_feedback = self._parse_career_development_feedback(feedback_text)
             
             return {
@@ -245,11 +265,13 @@ class AIInterviewAnalyzer:
         return prompts.get(analysis_type, prompts["post_interview"])
     
     def _create_post_interview_prompt(self, session_data: Dict[str, Any]) -> str:
-        """Create prompt for post-interview analysis"""
+        """Create prompt for post-interview analysis, fitted to the route's token budget"""
         role = session_data.get("role", "Software Engineer")
         responses = session_data.get("responses", [])
+        policy = get_route_policy(AnalysisType.POST_INTERVIEW.value)
+        builder = PromptBuilder(policy.prompt_tokens, policy.model, route=AnalysisType.POST_INTERVIEW.value)
         
-        prompt = f"""
+        header = f"""
         Analyze this interview session for a {role} position and provide comprehensive feedback.
         
         Interview Details:
@@ -261,22 +283,7 @@ class AIInterviewAnalyzer:
         Responses:
         """
         
-        for i, response in enumerate(responses):
-            # Handle both dictionary and string response formats
-            if isinstance(response, dict):
-                question = response.get('question', 'N/A')
-                answer = response.get('answer', 'No answer provided')
-            else:
-                # If response is a string, treat it as the answer
-                question = f"Question {i+1}"
-                answer = str(response)
-            
-            prompt += f"""
-        Question {i+1}: {question}
-        Answer: {answer}
-        """
-        
-        prompt += """
+        footer = """
         
         Please provide a comprehensive analysis including:
         1. Overall score (1-10) with detailed breakdown
@@ -293,7 +300,9 @@ class AIInterviewAnalyzer:
         Format the response as structured JSON with clear sections.
         """
         
-        return prompt
+        system = self._get_system_prompt("post_interview")
+        transcript = builder.fit_responses(responses, builder.remaining(system, header, footer))
+        return builder.finish(system, header + transcript + footer)
     
     def _create_real_time_prompt(self, session_data: Dict[str, Any]) -> str:
         """Create prompt for real-time analysis"""
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Optional, Dict, Any
+
+import speech_recognition as sr
+
+try:
+    import vosk
+except ImportError:  # optional offline engine (pip install vosk + a model directory)
+    vosk = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Engine selection (google | vosk | fake)
+ASR_ENGINE = os.getenv("ASR_ENGINE", "google").lower()
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk")
+ASR_POOL_SIZE = int(os.getenv("ASR_POOL_SIZE", "4"))
+FAKE_ASR_LATENCY = float(os.getenv("FAKE_ASR_LATENCY", "0.05"))  # seconds per call
+FAKE_ASR_LATENCY_PER_SECOND = float(os.getenv("FAKE_ASR_LATENCY_PER_SECOND", "0.0"))  # per second of audio
+
+
+class ASREngine:
+    """Speech-recognition backend shared by every VoiceProcessor.
+
+    ``transcribe`` is blocking and is called from the voice executor, so
+    implementations must be safe to call from several threads at once.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.audio_seconds = 0.0
+        self.busy_seconds = 0.0
+
+    def transcribe(self, pcm_data, sample_rate: int = 16000, sample_width: int = 2) -> Optional[str]:
+        """Transcribe one PCM16 utterance; returns None when nothing was understood"""
+        started = time.perf_counter()
+        text = None
+        try:
+            text = self._transcribe(pcm_data, sample_rate, sample_width)
+        except Exception as e:
+            logger.error(f"{self.name} ASR engine error: {e}")
+            with self._stats_lock:
+                self.failures += 1
+        finally:
+            with self._stats_lock:
+                self.calls += 1
+                self.audio_seconds += len(pcm_data) / float(sample_rate * sample_width)
+                self.busy_seconds += time.perf_counter() - started
+        return text if text and text.strip() else None
+
+    def _transcribe(self, pcm_data, sample_rate: int, sample_width: int) -> Optional[str]:
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "engine": self.name,
+                "calls": self.calls,
+                "failures": self.failures,
+                "audio_seconds": round(self.audio_seconds, 3),
+                "busy_seconds": round(self.busy_seconds, 3),
+                "real_time_factor": round(self.busy_seconds / self.audio_seconds, 4) if self.audio_seconds else 0.0
+            }
+
+
+class GoogleASREngine(ASREngine):
+    """Google Web Speech API via speech_recognition (network round-trip)"""
+
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        super().__init__()
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def _transcribe(self, pcm_data, sample_rate: int, sample_width: int) -> Optional[str]:
+        audio = sr.AudioData(pcm_data, sample_rate, sample_width)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            logger.info("Speech recognition could not understand audio")
+            return None
+        except sr.RequestError as e:
+            logger.error(f"Speech recognition service error: {e}")
+            return None
+
+
+class VoskASREngine(ASREngine):
+    """Offline CPU recognition with Vosk (Kaldi).
+
+    The acoustic model is loaded once per process and shared; recognizers
+    are kept in a fixed-size pool so concurrent utterances never build a
+    new recognizer on the hot path.
+    """
+
+    name = "vosk"
+
+    def __init__(self, model_path: str = VOSK_MODEL_PATH, pool_size: int = ASR_POOL_SIZE, sample_rate: int = 16000):
+        super().__init__()
+        if vosk is None:
+            raise RuntimeError("vosk is not installed; pip install vosk to use ASR_ENGINE=vosk")
+        if not os.path.isdir(model_path):
+            raise RuntimeError(f"Vosk model directory not found: {model_path}")
+        vosk.SetLogLevel(-1)
+        self.sample_rate = sample_rate
+        self.model = vosk.Model(model_path)
+        self._pool: "queue.Queue" = queue.Queue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(vosk.KaldiRecognizer(self.model, sample_rate))
+
+    def _transcribe(self, pcm_data, sample_rate: int, sample_width: int) -> Optional[str]:
+        if sample_rate != self.sample_rate or sample_width != 2:
+            raise ValueError(f"Vosk engine expects {self.sample_rate} Hz PCM16 audio")
+        recognizer = self._pool.get()
+        try:
+            recognizer.AcceptWaveform(bytes(pcm_data))
+            result = json.loads(recognizer.FinalResult())
+            return result.get("text")
+        finally:
+            recognizer.Reset()
+            self._pool.put(recognizer)
+
+
+class FakeASREngine(ASREngine):
+    """Deterministic stand-in for load tests and offline benchmarks.
+
+    The transcript is derived from a hash of the audio, so identical input
+    always yields identical text, and the word count scales with duration.
+    Latency is ``latency + latency_per_second * audio_seconds``.
+    """
+
+    name = "fake"
+
+    VOCABULARY = [
+        "i", "have", "worked", "on", "distributed", "systems", "with", "python",
+        "and", "react", "my", "team", "shipped", "a", "feature", "that", "improved",
+        "latency", "for", "our", "customers", "we", "used", "tests", "to",
+        "measure", "impact", "before", "release", "collaboration", "design", "data"
+    ]
+
+    def __init__(self, latency: float = FAKE_ASR_LATENCY,
+                 latency_per_second: float = FAKE_ASR_LATENCY_PER_SECOND,
+                 words_per_second: float = 2.5):
+        super().__init__()
+        self.latency = latency
+        self.latency_per_second = latency_per_second
+        self.words_per_second = words_per_second
+
+    def _transcribe(self, pcm_data, sample_rate: int, sample_width: int) -> Optional[str]:
+        seconds = len(pcm_data) / float(sample_rate * sample_width)
+        delay = self.latency + self.latency_per_second * seconds
+        if delay > 0:
+            time.sleep(delay)
+
+        digest = hashlib.sha256(pcm_data).digest()
+        word_count = max(1, int(round(seconds * self.words_per_second)))
+        words = [self.VOCABULARY[digest[i % len(digest)] % len(self.VOCABULARY)] for i in range(word_count)]
+        return " ".join(words)
+
+
+def create_asr_engine(name: str = ASR_ENGINE, **kwargs) -> ASREngine:
+    """Build an engine by name (google, vosk or fake)"""
+    name = (name or "google").lower()
+    if name == "fake":
+        return FakeASREngine(**kwargs)
+    if name == "vosk":
+        return VoskASREngine(**kwargs)
+    if name == "google":
+        return GoogleASREngine(**kwargs)
+    raise ValueError(f"Unknown ASR engine: {name}")
+
+
+_engine: Optional[ASREngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_asr_engine() -> ASREngine:
+    """Return the process-wide engine, creating it from ASR_ENGINE on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                # No fallback: a mistyped or broken local engine must not quietly send audio to Google
+                try:
+                    _engine = create_asr_engine(ASR_ENGINE)
+                except Exception as e:
+                    logger.error(f"Failed to initialise ASR engine '{ASR_ENGINE}': {e}")
+                    raise
+                logger.info(f"Using ASR engine: {_engine.name}")
+    return _engine
+
+
+def set_asr_engine(engine: Optional[ASREngine]) -> Optional[ASREngine]:
+    """Swap the process-wide engine (used by tests and benchmarks); None recreates it from ASR_ENGINE on next use"""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+    return engine
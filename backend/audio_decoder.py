@@ -0,0 +1,188 @@
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import threading
+from typing import List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+DECODER_READ_SIZE = int(os.getenv("DECODER_READ_SIZE", "8192"))
+DECODER_FINISH_TIMEOUT = float(os.getenv("DECODER_FINISH_TIMEOUT", "2.0"))  # seconds
+# How long feed() waits for the decoder to emit PCM for the chunk just written
+DECODER_FEED_WAIT = float(os.getenv("DECODER_FEED_WAIT", "0.05"))  # seconds
+
+# Leading bytes of the containers browsers record into (MediaRecorder)
+CONTAINER_SIGNATURES = (
+    (b"\x1a\x45\xdf\xa3", "webm"),  # EBML header: WebM / Matroska
+    (b"OggS", "ogg"),
+)
+# ffmpeg demuxer for each container
+FFMPEG_INPUT_FORMATS = {"webm": "matroska", "ogg": "ogg"}
+
+
+class AudioDecodeError(ValueError):
+    """Raised when compressed or containerised audio cannot be decoded"""
+
+
+def ffmpeg_available() -> bool:
+    """Whether FFMPEG_BINARY can be found, i.e. whether WebM/Ogg audio can be decoded"""
+    return shutil.which(FFMPEG_BINARY) is not None
+
+
+def detect_container(data) -> Optional[str]:
+    """Return "wav", "webm" or "ogg" for a chunk that starts a container, else None (raw PCM)"""
+    head = bytes(memoryview(data)[:12])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    for signature, name in CONTAINER_SIGNATURES:
+        if head.startswith(signature):
+            return name
+    return None
+
+
+def parse_wav(data) -> Tuple[int, int, int, memoryview]:
+    """Parse a PCM WAV chunk into (sample_rate, channels, sample_width, zero-copy PCM view)"""
+    view = memoryview(data).cast("B")
+    offset = 12
+    fmt = None
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        (size,) = struct.unpack_from("<I", view, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if size < 16:
+                raise AudioDecodeError("WAV fmt chunk is too short")
+            audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", view, body)
+            if audio_format not in (1, 0xFFFE) or bits != 16:
+                raise AudioDecodeError(f"Unsupported WAV encoding (format {audio_format}, {bits} bits)")
+            fmt = (sample_rate, channels, bits // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise AudioDecodeError("WAV data chunk precedes fmt chunk")
+            # Streaming writers may leave the size unset; take what is there
+            end = min(len(view), body + size)
+            frame = fmt[1] * fmt[2]
+            end -= (end - body) % frame
+            return fmt[0], fmt[1], fmt[2], view[body:end]
+        offset = body + size + (size & 1)
+    raise AudioDecodeError("WAV chunk has no data")
+
+
+class StreamingDecoder:
+    """Long-lived decoder process for one session's compressed audio stream.
+
+    A single ffmpeg process is started when the first chunk of a WebM/Ogg
+    stream arrives and is fed every following chunk over its stdin, so the
+    container header is parsed once and no process is spawned per chunk. A
+    reader thread drains decoded PCM16 from stdout as it is produced;
+    ``feed`` waits up to ``DECODER_FEED_WAIT`` for new output and returns
+    whatever has been decoded so far (the decoder holds back a few
+    milliseconds of audio), and ``finish`` flushes the tail.
+    """
+
+    def __init__(self, container: str, sample_rate: int = 16000, channels: int = 1,
+                 command: Optional[List[str]] = None):
+        self.container = container
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_bytes = 2 * channels
+        self.command = command or self.ffmpeg_command(container, sample_rate, channels)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._output = bytearray()
+        self._lock = threading.Lock()
+        self._produced = threading.Condition(self._lock)
+        self._received = 0
+        try:
+            self._process = subprocess.Popen(
+                self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            raise AudioDecodeError(f"Could not start audio decoder '{self.command[0]}': {e}")
+        self._reader = threading.Thread(target=self._read_loop, name=f"decoder-{container}", daemon=True)
+        self._reader.start()
+
+    @staticmethod
+    def ffmpeg_command(container: str, sample_rate: int, channels: int) -> List[str]:
+        return [
+            FFMPEG_BINARY, "-hide_banner", "-loglevel", "error",
+            "-fflags", "nobuffer", "-analyzeduration", "0",
+            "-f", FFMPEG_INPUT_FORMATS.get(container, container), "-i", "pipe:0",
+            "-f", "s16le", "-acodec", "pcm_s16le", "-ac", str(channels), "-ar", str(sample_rate),
+            "-flush_packets", "1", "pipe:1",
+        ]
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def feed(self, data, wait: float = DECODER_FEED_WAIT) -> bytearray:
+        """Write one compressed chunk and return the PCM decoded so far"""
+        if not self.alive:
+            raise AudioDecodeError(f"{self.container} decoder exited with code {self._process.returncode}")
+        with self._lock:
+            received = self._received
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (BrokenPipeError, ValueError) as e:
+            raise AudioDecodeError(f"{self.container} decoder rejected input: {e}")
+        self.bytes_in += len(data)
+        if wait > 0:
+            with self._produced:
+                self._produced.wait_for(lambda: self._received > received, timeout=wait)
+        return self.read()
+
+    def read(self) -> bytearray:
+        """Take the decoded PCM available now, whole sample frames only"""
+        with self._lock:
+            usable = len(self._output) - len(self._output) % self.frame_bytes
+            if usable == len(self._output):
+                pcm, self._output = self._output, bytearray()
+            else:
+                pcm, self._output = self._output, self._output[usable:]
+                del pcm[usable:]
+        self.bytes_out += len(pcm)
+        return pcm
+
+    def finish(self, timeout: float = DECODER_FINISH_TIMEOUT) -> bytearray:
+        """Close the input, wait for the decoder to flush and return the remaining PCM"""
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self._reader.join(timeout)
+        if self._reader.is_alive():
+            self.close()
+            self._reader.join(timeout)
+        return self.read()
+
+    def close(self):
+        """Stop the decoder without blocking; the reader thread reaps the process once its output closes
+
+        Called on the event loop when a session is closed or evicted.
+        """
+        if self.alive:
+            self._process.kill()
+
+    def _read_loop(self):
+        stdout = self._process.stdout
+        while True:
+            block = stdout.read1(DECODER_READ_SIZE)
+            if not block:
+                break
+            with self._produced:
+                self._output += block
+                self._received += len(block)
+                self._produced.notify_all()
+        try:
+            self._process.wait(timeout=DECODER_FINISH_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            logger.error(f"{self.container} decoder did not exit")
+            self._process.kill()
+            self._process.wait()
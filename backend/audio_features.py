@@ -0,0 +1,155 @@
+import logging
+import os
+from dataclasses import dataclass, asdict
+from typing import Dict, Any
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Speech-gate thresholds (int16 sample scale)
+SPEECH_RMS_THRESHOLD = float(os.getenv("SPEECH_RMS_THRESHOLD", "500"))
+SPEECH_ZCR_MIN = float(os.getenv("SPEECH_ZCR_MIN", "0.01"))
+SPEECH_ZCR_MAX = float(os.getenv("SPEECH_ZCR_MAX", "0.3"))
+# Chunks whose loudest frame is below this are treated as silence without running the VAD
+SILENCE_RMS_THRESHOLD = float(os.getenv("SILENCE_RMS_THRESHOLD", "150"))
+
+
+@dataclass
+class AudioFeatures:
+    rms: float = 0.0
+    zcr: float = 0.0
+    noise_floor: float = 0.0  # mean power of the quietest 10% of frames
+    snr: float = 0.0  # dB
+    spectral_centroid: float = 0.0  # Hz
+    peak_frame_rms: float = 0.0
+    num_samples: int = 0
+    sample_rate: int = 16000
+
+    @property
+    def has_speech(self) -> bool:
+        """Chunk-level RMS/ZCR speech gate"""
+        return (self.rms > SPEECH_RMS_THRESHOLD and
+                SPEECH_ZCR_MIN < self.zcr < SPEECH_ZCR_MAX)
+
+    @property
+    def is_silent(self) -> bool:
+        """True when no frame in the chunk is loud enough to be speech"""
+        return self.peak_frame_rms < SILENCE_RMS_THRESHOLD
+
+    @property
+    def clarity(self) -> float:
+        """Spectral centroid normalised to 0-1 against the Nyquist frequency
+
+        Before this extractor, clarity was ``abs(centroid) / 8000`` with the
+        centroid taken over the full two-sided ``fftfreq`` spectrum in
+        cycles/sample. The positive and negative halves cancel for real
+        audio, so that score was ~0 for every chunk. Scores stored before
+        the change are not comparable with these; nothing server-side
+        thresholds on clarity (the client only draws it as a 0-100% bar).
+        """
+        nyquist = self.sample_rate / 2
+        return min(1.0, max(0.0, self.spectral_centroid / nyquist)) if nyquist else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class AudioFeatureExtractor:
+    """Single-pass PCM16 feature extraction with reusable buffers.
+
+    Each chunk is cast to float32 once and split into non-overlapping
+    Hann-windowed frames. One batched ``rfft`` over those frames gives the
+    spectral centroid, and per-frame energies give RMS, the noise floor and
+    SNR, so neither a full sort of the samples nor a full-length complex FFT
+    is needed. Buffers grow to the largest chunk seen and are reused after
+    that; an extractor is not thread-safe and belongs to one session.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_size: int = 512):
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.window = np.hanning(frame_size).astype(np.float32)
+        self.freqs = np.fft.rfftfreq(frame_size, d=1.0 / sample_rate).astype(np.float32)
+        self._capacity = 0
+        self._samples = np.empty(0, dtype=np.float32)
+        self._signs = np.empty(0, dtype=bool)
+        self._crossings = np.empty(0, dtype=bool)
+        self._windowed = np.empty((0, frame_size), dtype=np.float32)
+        self._magnitude = np.empty((0, len(self.freqs)), dtype=np.float32)
+
+    def _ensure_capacity(self, num_samples: int):
+        if num_samples <= self._capacity:
+            return
+        capacity = max(num_samples, self._capacity * 2)
+        frames = max(1, -(-capacity // self.frame_size))
+        self._samples = np.empty(capacity, dtype=np.float32)
+        self._signs = np.empty(capacity, dtype=bool)
+        self._crossings = np.empty(capacity, dtype=bool)
+        self._windowed = np.empty((frames, self.frame_size), dtype=np.float32)
+        self._magnitude = np.empty((frames, len(self.freqs)), dtype=np.float32)
+        self._capacity = capacity
+
+    def extract(self, audio_data) -> AudioFeatures:
+        """Compute features for one chunk of raw PCM16 (bytes-like, odd byte ignored)"""
+        view = memoryview(audio_data).cast("B")
+        pcm = np.frombuffer(view[:len(view) - len(view) % 2], dtype=np.int16)
+        n = len(pcm)
+        if n == 0:
+            return AudioFeatures(sample_rate=self.sample_rate)
+
+        self._ensure_capacity(n)
+        x = self._samples[:n]
+        np.copyto(x, pcm, casting="unsafe")
+
+        energy_total = float(np.dot(x, x))
+        rms = np.sqrt(energy_total / n)
+
+        if n > 1:
+            np.signbit(x, out=self._signs[:n])
+            np.not_equal(self._signs[1:n], self._signs[:n - 1], out=self._crossings[:n - 1])
+            zcr = np.count_nonzero(self._crossings[:n - 1]) / n
+        else:
+            zcr = 0.0
+
+        num_frames = n // self.frame_size
+        if num_frames:
+            frames = x[:num_frames * self.frame_size].reshape(num_frames, self.frame_size)
+            frame_power = np.einsum("ij,ij->i", frames, frames) / self.frame_size
+            windowed = self._windowed[:num_frames]
+            np.multiply(frames, self.window, out=windowed)
+        elif n >= 64:
+            # Shorter than one frame: zero-pad a single frame for the spectrum
+            frame_power = np.array([energy_total / n], dtype=np.float32)
+            windowed = self._windowed[:1]
+            windowed[0, :n] = x * self.window[:n]
+            windowed[0, n:] = 0.0
+        else:
+            frame_power = np.array([energy_total / n], dtype=np.float32)
+            windowed = None
+
+        centroid = 0.0
+        if windowed is not None:
+            magnitude = self._magnitude[:len(windowed)]
+            np.abs(np.fft.rfft(windowed, axis=1), out=magnitude, casting="same_kind")
+            total_magnitude = float(magnitude.sum())
+            if total_magnitude > 0:
+                centroid = float(magnitude.sum(axis=0) @ self.freqs) / total_magnitude
+
+        k = int(0.1 * (len(frame_power) - 1))
+        noise_floor = max(float(np.partition(frame_power, k)[k]), 1.0)
+        signal_power = energy_total / n
+        snr = max(0.0, 10 * np.log10(signal_power / noise_floor)) if signal_power > 0 else 0.0
+
+        return AudioFeatures(
+            rms=float(rms),
+            zcr=float(zcr),
+            noise_floor=noise_floor,
+            snr=float(snr),
+            spectral_centroid=centroid,
+            peak_frame_rms=float(np.sqrt(frame_power.max())),
+            num_samples=n,
+            sample_rate=self.sample_rate
+        )
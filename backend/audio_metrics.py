@@ -0,0 +1,189 @@
+import base64
+import logging
+import os
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-chunk points kept for the detailed view (~7 min at 10 chunks/s)
+METRICS_RING_CAPACITY = int(os.getenv("METRICS_RING_CAPACITY", "4096"))
+METRICS_HISTOGRAM_BINS = int(os.getenv("METRICS_HISTOGRAM_BINS", "256"))
+
+METRIC_DTYPE = np.dtype([
+    ("timestamp", np.float64),
+    ("volume", np.float32),
+    ("snr", np.float32),
+    ("clarity", np.float32),
+])
+
+# Value ranges for the fixed-bin percentile sketches
+METRIC_RANGES = {
+    "volume": (0.0, 32768.0),
+    "snr": (0.0, 100.0),
+    "clarity": (0.0, 1.0),
+}
+
+
+class RunningStat:
+    """Count/mean/min/max (Welford) plus a fixed-bin histogram for percentiles"""
+
+    def __init__(self, low: float, high: float, bins: int = METRICS_HISTOGRAM_BINS):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.histogram = np.zeros(bins, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float):
+        self.count += 1
+        self.mean += (value - self.mean) / self.count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        position = (value - self.low) / (self.high - self.low) * self.bins
+        self.histogram[min(self.bins - 1, max(0, int(position)))] += 1
+
+    def percentile(self, q: float) -> float:
+        """Approximate percentile (bin midpoint), accurate to one bin width"""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        index = int(np.searchsorted(np.cumsum(self.histogram), max(target, 1)))
+        width = (self.high - self.low) / self.bins
+        value = self.low + (index + 0.5) * width
+        return float(min(max(value, self.min), self.max))
+
+    def to_dict(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0, "mean": 0.0, "min": 0.0, "max": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0}
+        return {
+            "count": self.count,
+            "mean": float(self.mean),
+            "min": float(self.min),
+            "max": float(self.max),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+    def export_state(self) -> Dict[str, Any]:
+        return {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max,
+                "histogram": self.histogram.tolist()}
+
+    def load_state(self, state: Dict[str, Any]):
+        self.count = int(state["count"])
+        self.mean = float(state["mean"])
+        self.min = float(state["min"])
+        self.max = float(state["max"])
+        self.histogram = np.asarray(state["histogram"], dtype=np.int64)
+
+
+class MetricsRingBuffer:
+    """Fixed-size structured-array store for per-chunk audio quality metrics.
+
+    Only the most recent ``capacity`` points are kept, while the running
+    aggregates cover every point ever appended, so summaries are O(1) and a
+    session's metric memory stays constant however long the interview runs.
+    Points are numbered from 0 in arrival order; ``total`` is the next index.
+    A ring restored from a partial snapshot only holds points from ``first`` on.
+    """
+
+    def __init__(self, capacity: int = METRICS_RING_CAPACITY):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=METRIC_DTYPE)
+        self.total = 0
+        self.first = 0
+        self.stats = {name: RunningStat(low, high) for name, (low, high) in METRIC_RANGES.items()}
+
+    @property
+    def oldest(self) -> int:
+        """Index of the oldest point still held"""
+        return max(self.first, self.total - self.capacity)
+
+    def __len__(self) -> int:
+        return self.total - self.oldest
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + sum(stat.histogram.nbytes for stat in self.stats.values())
+
+    def append(self, metrics: Dict[str, float]):
+        row = self._data[self.total % self.capacity]
+        row["timestamp"] = metrics.get("timestamp", 0.0)
+        for name, stat in self.stats.items():
+            value = float(metrics.get(name, 0.0))
+            row[name] = value
+            stat.add(value)
+        self.total += 1
+
+    def mean(self, name: str) -> float:
+        return float(self.stats[name].mean)
+
+    def records(self, start: Optional[int] = None) -> np.ndarray:
+        """Retained points with index >= ``start``, oldest first (a copy)"""
+        oldest = self.oldest
+        start = oldest if start is None else max(start, oldest)
+        if start >= self.total:
+            return self._data[:0].copy()
+        first = start % self.capacity
+        count = self.total - start
+        if first + count <= self.capacity:
+            return self._data[first:first + count].copy()
+        return np.concatenate([self._data[first:], self._data[:first + count - self.capacity]])
+
+    def to_list(self, start: Optional[int] = None) -> List[Dict[str, float]]:
+        rows = self.records(start)
+        return [
+            {"timestamp": float(row["timestamp"]), "volume": float(row["volume"]),
+             "snr": float(row["snr"]), "clarity": float(row["clarity"])}
+            for row in rows
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """Running aggregates over the whole session"""
+        return {name: stat.to_dict() for name, stat in self.stats.items()}
+
+    def export_state(self, points: Optional[int] = None) -> Dict[str, Any]:
+        """JSON-serialisable snapshot for shared session state
+
+        The aggregates always cover the whole session; only the newest
+        ``points`` raw points (all retained ones if None) are included, as
+        base64 of their packed records.
+        """
+        rows = self.records(None if points is None else max(0, self.total - points))
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "first": self.total - len(rows),
+            "data": base64.b64encode(rows.tobytes()).decode("ascii"),
+            "stats": {name: stat.export_state() for name, stat in self.stats.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "MetricsRingBuffer":
+        ring = cls(capacity=int(state["capacity"]))
+        rows = np.frombuffer(base64.b64decode(state["data"]), dtype=METRIC_DTYPE)
+        ring.total = int(state["total"])
+        if "first" in state:
+            ring.first = int(state["first"])
+            ring._data[np.arange(ring.first, ring.total) % ring.capacity] = rows
+        else:  # whole ring, as written before snapshots were trimmed
+            ring._data = rows.copy()
+        for name, stat_state in state["stats"].items():
+            if name in ring.stats:
+                ring.stats[name].load_state(stat_state)
+        return ring
@@ -0,0 +1,121 @@
+import logging
+import os
+from math import gcd
+from typing import Dict, Tuple
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Taps per polyphase branch; more taps give a sharper anti-aliasing filter
+RESAMPLER_TAPS_PER_PHASE = int(os.getenv("RESAMPLER_TAPS_PER_PHASE", "32"))
+# Passband edge as a fraction of the output (or input) Nyquist frequency
+RESAMPLER_CUTOFF = float(os.getenv("RESAMPLER_CUTOFF", "0.9"))
+
+# Polyphase banks are shared by every stream with the same conversion ratio
+_filter_banks: Dict[Tuple[int, int, int], np.ndarray] = {}
+
+
+def _polyphase_bank(up: int, down: int, taps_per_phase: int) -> np.ndarray:
+    """Kaiser-windowed sinc low-pass split into ``up`` branches, each reversed for a dot product"""
+    key = (up, down, taps_per_phase)
+    bank = _filter_banks.get(key)
+    if bank is None:
+        length = up * taps_per_phase
+        cutoff = RESAMPLER_CUTOFF / max(up, down)  # relative to the upsampled Nyquist
+        n = np.arange(length) - (length - 1) / 2.0
+        prototype = cutoff * np.sinc(cutoff * n) * np.kaiser(length, 8.0)
+        prototype *= up / prototype.sum()  # unity DC gain after zero-stuffing
+        # Branch p holds taps p, p + up, p + 2*up, ...; reversed so it lines up with
+        # a window of input samples ordered oldest to newest
+        bank = prototype.reshape(taps_per_phase, up).T[:, ::-1].astype(np.float32)
+        _filter_banks[key] = bank
+    return bank
+
+
+class StreamingResampler:
+    """Rational-ratio polyphase resampler with channel downmix for PCM16 streams.
+
+    Interleaved PCM16 at any rate and channel count is averaged to mono and
+    converted to ``output_rate`` in one vectorised pass per chunk. The last
+    ``taps - 1`` input samples and the output phase carry over between
+    chunks, so chunk boundaries do not introduce clicks or drift. The filter
+    bank is built once per ratio and shared. Same-rate mono input is passed
+    through untouched. A resampler belongs to one stream and is not
+    thread-safe.
+    """
+
+    def __init__(self, input_rate: int, channels: int = 1, output_rate: int = 16000,
+                 taps_per_phase: int = RESAMPLER_TAPS_PER_PHASE):
+        if input_rate <= 0 or channels <= 0:
+            raise ValueError(f"Invalid input format: {input_rate} Hz, {channels} channels")
+        self.input_rate = input_rate
+        self.channels = channels
+        self.output_rate = output_rate
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.passthrough = self.up == self.down and channels == 1
+        self.taps = taps_per_phase
+        self._bank = _polyphase_bank(self.up, self.down, taps_per_phase) if self.up != self.down else None
+        self.reset()
+
+    @property
+    def frame_bytes(self) -> int:
+        return 2 * self.channels
+
+    def reset(self):
+        """Forget stream history (e.g. at the start of a new recording)"""
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        # Upsampled-time position of the next output sample, relative to the
+        # first history sample; the first output lines up with the first new input
+        self._position = (self.taps - 1) * self.up
+        self._partial = b""
+
+    def process(self, audio_data):
+        """Convert one interleaved PCM16 chunk; returns mono PCM16 at ``output_rate``"""
+        if self.passthrough:
+            return audio_data
+        view = memoryview(audio_data).cast("B")
+        if self._partial:
+            view = memoryview(self._partial + bytes(view))
+        usable = len(view) - len(view) % self.frame_bytes
+        self._partial = bytes(view[usable:])
+        samples = np.frombuffer(view[:usable], dtype=np.int16)
+        if self.channels > 1:
+            mono = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        else:
+            mono = samples.astype(np.float32)
+        if self._bank is None:
+            return self._to_pcm(mono)
+        return self._to_pcm(self._filter(mono))
+
+    def flush(self) -> memoryview:
+        """Emit the samples still held back by the filter delay"""
+        if self.passthrough or self._bank is None:
+            return memoryview(b"")
+        tail = self._filter(np.zeros(self.taps // 2, dtype=np.float32))
+        self.reset()
+        return self._to_pcm(tail)
+
+    def _filter(self, mono: np.ndarray) -> np.ndarray:
+        signal = np.concatenate((self._history, mono))
+        end = len(signal) * self.up  # first upsampled position without input
+        count = max(0, -(-(end - self._position) // self.down))
+        positions = self._position + self.down * np.arange(count)
+        newest = positions // self.up  # newest input sample under each output
+        windows = np.lib.stride_tricks.sliding_window_view(signal, self.taps)
+        # Window i covers signal[i : i + taps], i.e. ends at newest sample i + taps - 1
+        output = np.einsum("nk,nk->n", windows[newest - (self.taps - 1)], self._bank[positions % self.up])
+
+        consumed = len(signal) - (self.taps - 1)
+        self._history = signal[consumed:].copy()
+        self._position += count * self.down - consumed * self.up
+        return output
+
+    @staticmethod
+    def _to_pcm(samples: np.ndarray) -> memoryview:
+        pcm = np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
+        return memoryview(pcm).cast("B")
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterable, Dict, Optional
+
+import aiofiles
+import aiofiles.os
+
+from config import BACKEND_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AUDIO_STORAGE_DIR = Path(os.getenv("AUDIO_STORAGE_DIR", str(BACKEND_DIR / "audio_responses")))
+AUDIO_UPLOAD_MAX_BYTES = int(os.getenv("AUDIO_UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+AUDIO_UPLOAD_CHUNK_BYTES = 64 * 1024
+AUDIO_MULTIPART_OVERHEAD_BYTES = 64 * 1024  # boundaries, part headers and small fields around the audio
+
+# Extensions we store under; anything else is kept as .bin
+AUDIO_EXTENSIONS = {
+    "audio/wav": "wav", "audio/x-wav": "wav", "audio/wave": "wav",
+    "audio/webm": "webm", "audio/ogg": "ogg", "audio/mpeg": "mp3", "audio/mp4": "m4a",
+}
+
+
+class AudioUploadTooLarge(Exception):
+    """Raised when an upload exceeds AUDIO_UPLOAD_MAX_BYTES"""
+
+
+def extension_for(content_type: Optional[str]) -> str:
+    """Storage extension for a Content-Type such as ``audio/webm;codecs=opus``"""
+    if not content_type:
+        return "bin"
+    return AUDIO_EXTENSIONS.get(content_type.split(";", 1)[0].strip().lower(), "bin")
+
+
+def path_for_digest(digest: str, extension: str, root: Path = AUDIO_STORAGE_DIR) -> Path:
+    """Content-addressed location: <root>/objects/<first two hex chars>/<sha256>.<ext>"""
+    return root / "objects" / digest[:2] / f"{digest}.{extension}"
+
+
+async def find_stored_audio(digest: str, root: Path = AUDIO_STORAGE_DIR) -> Optional[Path]:
+    """Path of previously stored audio with this SHA-256, whatever its extension"""
+    digest = digest.lower()
+    if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+        return None
+    folder = root / "objects" / digest[:2]
+    try:
+        names = await aiofiles.os.listdir(folder)
+    except FileNotFoundError:
+        return None
+    for name in names:
+        if name.startswith(f"{digest}."):
+            return folder / name
+    return None
+
+
+async def store_audio_stream(chunks: AsyncIterable[bytes],
+                             extension: str = "bin",
+                             max_bytes: int = AUDIO_UPLOAD_MAX_BYTES,
+                             root: Path = AUDIO_STORAGE_DIR) -> Dict[str, Any]:
+    """Write an audio stream to content-addressed storage without holding it in memory
+
+    Chunks are hashed and appended to a temporary file as they arrive; at
+    the end the file is renamed to its SHA-256 path, or dropped if that
+    content is already stored. Raises ``AudioUploadTooLarge`` (and removes
+    the partial file) as soon as ``max_bytes`` is exceeded.
+    """
+    incoming = root / "incoming"
+    await aiofiles.os.makedirs(incoming, exist_ok=True)
+    temp_path = incoming / f"{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AudioUploadTooLarge(f"Audio upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        await _remove_quietly(temp_path)
+        raise
+
+    sha256 = digest.hexdigest()
+    final_path = path_for_digest(sha256, extension, root)
+    await aiofiles.os.makedirs(final_path.parent, exist_ok=True)
+    deduplicated = await aiofiles.os.path.exists(final_path)
+    if deduplicated:
+        await _remove_quietly(temp_path)
+    else:
+        await aiofiles.os.replace(temp_path, final_path)
+    logger.info(f"Stored {size} bytes of audio as {final_path.name}{' (duplicate)' if deduplicated else ''}")
+    return {"sha256": sha256, "size": size, "path": str(final_path), "deduplicated": deduplicated}
+
+
+async def store_audio_bytes(data: bytes, extension: str = "bin", **kwargs) -> Dict[str, Any]:
+    """Store an in-memory payload (legacy base64 uploads) through the same path"""
+    async def single():
+        view = memoryview(data)
+        for start in range(0, len(view), AUDIO_UPLOAD_CHUNK_BYTES):
+            yield view[start:start + AUDIO_UPLOAD_CHUNK_BYTES]
+    return await store_audio_stream(single(), extension=extension, **kwargs)
+
+
+async def capped_chunks(chunks: AsyncIterable[bytes], max_bytes: int = AUDIO_UPLOAD_MAX_BYTES) -> AsyncIterable[bytes]:
+    """Pass ``chunks`` through, raising ``AudioUploadTooLarge`` once more than ``max_bytes`` have arrived"""
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise AudioUploadTooLarge(f"Audio upload exceeds {max_bytes} bytes")
+        yield chunk
+
+
+async def upload_file_chunks(upload) -> AsyncIterable[bytes]:
+    """Read a Starlette ``UploadFile`` (spooled to disk past 1 MB) in fixed-size chunks"""
+    while True:
+        chunk = await upload.read(AUDIO_UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _remove_quietly(path: Path):
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.error(f"Could not remove partial audio upload {path}: {e}")
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_ANALYSIS_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "8"))
+BATCH_ANALYSIS_MAX_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_MAX_CONCURRENCY", "32"))
+BATCH_ANALYSIS_ITEM_TIMEOUT = float(os.getenv("BATCH_ANALYSIS_ITEM_TIMEOUT", "90"))  # seconds
+BATCH_ANALYSIS_MAX_ITEM_TIMEOUT = float(os.getenv("BATCH_ANALYSIS_MAX_ITEM_TIMEOUT", "300"))
+
+# Streaming formats and their media types
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def stream_format(requested: Optional[str], accept: str = "") -> Optional[str]:
+    """"ndjson", "sse" or None (one JSON response) from a ``stream`` field or the Accept header"""
+    if requested in STREAM_MEDIA_TYPES:
+        return requested
+    if requested in (True, "true", "1"):
+        return "ndjson"
+    accept = accept.lower()
+    if "text/event-stream" in accept:
+        return "sse"
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    return None
+
+
+def clamp_batch_options(concurrency: Any = None, item_timeout: Any = None) -> Dict[str, float]:
+    """Client-supplied limits, defaulted and clamped to the server maximums"""
+    try:
+        concurrency = int(concurrency) if concurrency is not None else BATCH_ANALYSIS_CONCURRENCY
+    except (TypeError, ValueError):
+        concurrency = BATCH_ANALYSIS_CONCURRENCY
+    try:
+        item_timeout = float(item_timeout) if item_timeout is not None else BATCH_ANALYSIS_ITEM_TIMEOUT
+    except (TypeError, ValueError):
+        item_timeout = BATCH_ANALYSIS_ITEM_TIMEOUT
+    return {
+        "concurrency": max(1, min(concurrency, BATCH_ANALYSIS_MAX_CONCURRENCY)),
+        "item_timeout": max(0.1, min(item_timeout, BATCH_ANALYSIS_MAX_ITEM_TIMEOUT)),
+    }
+
+
+async def iter_batch_analysis(sessions: List[Dict[str, Any]],
+                              analyze: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                              concurrency: int = BATCH_ANALYSIS_CONCURRENCY,
+                              item_timeout: float = BATCH_ANALYSIS_ITEM_TIMEOUT) -> AsyncIterator[Dict[str, Any]]:
+    """Analyze sessions with at most ``concurrency`` in flight, yielding records as they finish
+
+    Each session yields one ``{"type": "result", ...}`` record in completion
+    order (``index`` is its position in the request), then a single
+    ``{"type": "summary", ...}`` record closes the stream. Closing or
+    cancelling the iterator (e.g. the client disconnected) cancels every
+    item that has not finished.
+    """
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_item(index: int, session: Dict[str, Any]) -> Dict[str, Any]:
+        session_id = session.get("session_id", "unknown") if isinstance(session, dict) else "unknown"
+        async with semaphore:
+            item_started = time.perf_counter()
+            record = {"type": "result", "index": index, "session_id": session_id}
+            try:
+                analysis = await asyncio.wait_for(analyze(session), timeout=item_timeout)
+                record.update({"success": True, "analysis": analysis})
+            except asyncio.TimeoutError:
+                record.update({"success": False, "error": f"Analysis timed out after {item_timeout:g}s", "timed_out": True})
+            except Exception as e:
+                logger.error(f"Batch analysis of session {session_id} failed: {e}")
+                record.update({"success": False, "error": str(e)})
+            record["elapsed_ms"] = round((time.perf_counter() - item_started) * 1000, 1)
+            return record
+
+    tasks = [asyncio.ensure_future(run_item(index, session)) for index, session in enumerate(sessions)]
+    succeeded = failed = timed_out = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            if record["success"]:
+                succeeded += 1
+            else:
+                failed += 1
+                timed_out += bool(record.get("timed_out"))
+            yield record
+        yield {
+            "type": "summary",
+            "success": True,
+            "total_sessions": len(sessions),
+            "successful_analyses": succeeded,
+            "failed_analyses": failed,
+            "timed_out": timed_out,
+            "concurrency": concurrency,
+            "item_timeout": item_timeout,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    finally:
+        outstanding = [task for task in tasks if not task.done()]
+        for task in outstanding:
+            task.cancel()
+        if outstanding:
+            logger.info(f"Batch analysis stopped early; cancelled {len(outstanding)} outstanding item(s)")
+            await asyncio.gather(*outstanding, return_exceptions=True)
+
+
+def encode_stream_record(record: Dict[str, Any], fmt: str) -> str:
+    """One record as an NDJSON line or an SSE event named after its type"""
+    payload = json.dumps(record, default=str)
+    if fmt == "sse":
+        return f"event: {record.get('type', 'message')}\ndata: {payload}\n\n"
+    return payload + "\n"
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Concurrent voice-pipeline load benchmark
+
+Simulates N Socket.IO interview clients streaming synthetic speech-like
+PCM16 (voiced tones, noise bursts, pauses) to the ``voice`` event and
+reports per-chunk latency percentiles, throughput, server event-loop lag
+and memory per session.
+
+By default a server is started as a subprocess with the deterministic fake
+ASR engine, so no network speech service is involved:
+
+    python bench_voice_load.py --clients 50 --duration 20 --speed 4
+
+Use ``--url`` to load an already running server instead (its lag and
+memory figures then cover its whole lifetime, not just this run).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import numpy as np
+import socketio
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from generate_test_audio import synthesize_speech_like
+from voice_frames import encode_framed_message
+
+SAMPLE_RATE = 16000
+
+
+class ClientResult:
+    def __init__(self):
+        self.connected = False
+        self.error: Optional[str] = None
+        self.sent = 0
+        self.latencies_ms: List[float] = []
+        self.answered = set()
+        self.backpressure = 0
+        self.transcripts = 0
+        self.partials = 0
+
+
+async def run_client(index: int, args, chunks: List[bytes], run_id: str, result: ClientResult):
+    """One interview: connect, stream every chunk on schedule, wait for the last result"""
+    client = socketio.AsyncClient(reconnection=False)
+    sent_at: Dict[int, float] = {}
+    last_seq = len(chunks) - 1
+    finished = asyncio.Event()
+
+    @client.on("voice_result")
+    async def on_voice_result(data):
+        now = time.perf_counter()
+        for seq in range(data.get("seq", 0), data.get("seq_end", data.get("seq", 0)) + 1):
+            if seq in sent_at and seq not in result.answered:
+                result.answered.add(seq)
+                result.latencies_ms.append((now - sent_at[seq]) * 1000)
+        if data.get("transcript"):
+            result.transcripts += 1
+        if data.get("partial_transcript"):
+            result.partials += 1
+        if data.get("seq_end") == last_seq:
+            finished.set()
+
+    @client.on("voice_backpressure")
+    async def on_backpressure(data):
+        result.backpressure += 1
+
+    try:
+        await client.connect(args.url, transports=["websocket"])
+        result.connected = True
+        session_id = f"bench-{run_id}-{index}"
+        chunk_seconds = args.chunk_ms / 1000
+        started = time.perf_counter()
+        for seq, chunk in enumerate(chunks):
+            metadata = {"session_id": session_id, "role": "Software Engineer", "seq": seq,
+                        "final": seq == last_seq, "interim": args.interim}
+            sent_at[seq] = time.perf_counter()
+            if args.framed:
+                await client.emit("voice", encode_framed_message(metadata, chunk))
+            else:
+                await client.emit("voice", {**metadata, "audio_data": chunk})
+            result.sent += 1
+            if args.speed > 0:
+                delay = started + (seq + 1) * chunk_seconds / args.speed - time.perf_counter()
+                await asyncio.sleep(max(0.0, delay))
+            else:
+                await asyncio.sleep(0)
+        await asyncio.wait_for(finished.wait(), timeout=args.result_timeout)
+    except asyncio.TimeoutError:
+        result.error = "timed out waiting for the final result"
+    except Exception as e:
+        result.error = str(e)
+    finally:
+        if client.connected:
+            await client.disconnect()
+
+
+async def fetch_metrics(http: aiohttp.ClientSession, url: str) -> Dict[str, Any]:
+    async with http.get(f"{url}/api/voice/metrics") as response:
+        return await response.json()
+
+
+async def wait_for_server(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.monotonic() < deadline:
+            try:
+                async with http.get(f"{url}/api/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {url} did not become healthy within {timeout}s")
+
+
+def start_server(args) -> subprocess.Popen:
+    """Run main:socket_app under uvicorn with the fake ASR engine"""
+    env = dict(os.environ)
+    env.update({
+        "ASR_ENGINE": "fake",
+        "FAKE_ASR_LATENCY": str(args.asr_latency),
+    })
+    command = [sys.executable, "-m", "uvicorn", "main:socket_app", "--host", "127.0.0.1",
+               "--port", str(args.port), "--log-level", "warning", "--workers", str(args.workers)]
+    log = open(args.server_log, "wb") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    data = np.asarray(values)
+    return {
+        "count": int(data.size),
+        "mean": float(data.mean()),
+        "p50": float(np.percentile(data, 50)),
+        "p90": float(np.percentile(data, 90)),
+        "p99": float(np.percentile(data, 99)),
+        "max": float(data.max()),
+    }
+
+
+def build_chunks(args, index: int) -> List[bytes]:
+    audio = synthesize_speech_like(duration=args.duration, sample_rate=SAMPLE_RATE, seed=index)
+    step = int(SAMPLE_RATE * args.chunk_ms / 1000)
+    return [audio[i:i + step].tobytes() for i in range(0, len(audio), step)]
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    run_id = uuid.uuid4().hex[:8]
+    chunk_sets = [build_chunks(args, i) for i in range(args.clients)]
+    results = [ClientResult() for _ in range(args.clients)]
+
+    async with aiohttp.ClientSession() as http:
+        before = await fetch_metrics(http, args.url)
+
+        async def staggered(index: int):
+            if args.ramp > 0:
+                await asyncio.sleep(args.ramp * index / args.clients)
+            await run_client(index, args, chunk_sets[index], run_id, results[index])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(staggered(i) for i in range(args.clients)))
+        elapsed = time.perf_counter() - started
+        after = await fetch_metrics(http, args.url)
+
+    latencies = [latency for result in results for latency in result.latencies_ms]
+    sent = sum(result.sent for result in results)
+    answered = sum(len(result.answered) for result in results)
+    connected = sum(1 for result in results if result.connected)
+    sessions = after.get("sessions", {})
+    live = max(1, sessions.get("live_sessions", 0))
+    rss_growth = after["process"]["rss_bytes"] - before["process"]["rss_bytes"]
+
+    return {
+        "config": {
+            "clients": args.clients, "audio_seconds_per_client": args.duration, "chunk_ms": args.chunk_ms,
+            "speed": args.speed, "interim": args.interim, "framed": args.framed,
+            "asr_latency_s": args.asr_latency, "workers": args.workers,
+        },
+        "clients": {
+            "connected": connected,
+            "errors": [result.error for result in results if result.error][:10],
+        },
+        "chunks": {
+            "sent": sent,
+            "answered": answered,
+            "unanswered": sent - answered,  # dropped by backpressure or still in flight at timeout
+            "backpressure_signals": sum(result.backpressure for result in results),
+            "transcripts": sum(result.transcripts for result in results),
+            "partials": sum(result.partials for result in results),
+        },
+        "latency_ms": percentiles(latencies),
+        "throughput": {
+            "wall_seconds": elapsed,
+            "chunks_per_second": answered / elapsed if elapsed else 0.0,
+            "audio_seconds_per_second": answered * args.chunk_ms / 1000 / elapsed if elapsed else 0.0,
+        },
+        "server": {
+            "event_loop_lag_ms": after.get("event_loop_lag_ms"),
+            "rss_bytes_before": before["process"]["rss_bytes"],
+            "rss_bytes_after": after["process"]["rss_bytes"],
+            "rss_growth_per_session_bytes": rss_growth / max(1, connected),
+            "resident_bytes_per_session": sessions.get("resident_bytes", 0) / live,
+            "live_sessions": sessions.get("live_sessions"),
+            "chunk_queues": sessions.get("chunk_queues"),
+        },
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    config, latency, throughput, server = report["config"], report["latency_ms"], report["throughput"], report["server"]
+    lag = server.get("event_loop_lag_ms") or {}
+    print("\n📊 Voice pipeline load benchmark")
+    print(f"   Clients: {report['clients']['connected']}/{config['clients']} connected, "
+          f"{config['audio_seconds_per_client']} s of audio each in {config['chunk_ms']} ms chunks at {config['speed']}x")
+    print(f"   Chunks: {report['chunks']['answered']}/{report['chunks']['sent']} answered, "
+          f"{report['chunks']['backpressure_signals']} backpressure signals, "
+          f"{report['chunks']['transcripts']} transcripts, {report['chunks']['partials']} partials")
+    if latency.get("count"):
+        print(f"   Chunk latency ms: p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+              f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"   Throughput: {throughput['chunks_per_second']:.1f} chunks/s, "
+          f"{throughput['audio_seconds_per_second']:.1f} s of audio per second")
+    if lag.get("count"):
+        print(f"   Server loop lag ms: p50 {lag['p50']:.1f}  p99 {lag['p99']:.1f}  max {lag['max']:.1f}")
+    print(f"   Memory per session: {server['resident_bytes_per_session'] / 1024:.1f} KiB resident in session state, "
+          f"{server['rss_growth_per_session_bytes'] / 1024:.1f} KiB RSS growth")
+    for error in report["clients"]["errors"]:
+        print(f"   ⚠️  {error}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="concurrent interview clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of audio per client")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="audio per voice event")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 4 = four times faster, 0 = unthrottled")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which clients connect")
+    parser.add_argument("--interim", action="store_true", help="request interim transcripts")
+    parser.add_argument("--framed", action="store_true", help="send framed binary messages instead of dicts")
+    parser.add_argument("--asr-latency", type=float, default=0.05, help="fake ASR latency (spawned server only)")
+    parser.add_argument("--result-timeout", type=float, default=30.0, help="seconds to wait for a client's last result")
+    parser.add_argument("--url", help="existing server to load (default: spawn one)")
+    parser.add_argument("--port", type=int, default=0, help="port for the spawned server (default: any free port)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the spawned server")
+    parser.add_argument("--server-log", help="write the spawned server's output here")
+    parser.add_argument("--json", help="also write the report as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = None
+    if not args.url:
+        if not args.port:
+            with socket.socket() as probe:
+                probe.bind(("127.0.0.1", 0))
+                args.port = probe.getsockname()[1]
+        args.url = f"http://127.0.0.1:{args.port}"
+        server = start_server(args)
+    try:
+        asyncio.run(wait_for_server(args.url))
+        report = asyncio.run(run_benchmark(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"   Report written to {args.json}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,39 @@ def generate_sine_wav(output_file=OUTPUT_FILE, sample_rate=SAMPLE_RATE, duration
         except Exception as e:
             raise RuntimeError("Neither soundfile nor scipy.io.wavfile available or write failed") from e
 
+def synthesize_speech_like(duration=DURATION, sample_rate=SAMPLE_RATE, seed=0):
+    """Speech-like PCM16 test signal: voiced syllables, noise bursts and pauses
+
+    Voiced stretches are harmonic tones (100-220 Hz fundamental, with
+    vibrato and a ~4 Hz syllable envelope), fricatives are short noise
+    bursts and pauses are near-silent room noise, so the VAD, feature
+    extractor and endpointing all see realistic transitions. The same seed
+    always gives the same audio.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(sample_rate * duration)
+    audio = np.empty(total, dtype=np.float64)
+    position = 0
+    while position < total:
+        kind = rng.choice(["voiced", "fricative", "pause"], p=[0.55, 0.15, 0.3])
+        if kind == "voiced":
+            length = int(sample_rate * rng.uniform(0.4, 1.5))
+            t = np.arange(length) / sample_rate
+            f0 = rng.uniform(100, 220) * (1 + 0.03 * np.sin(2 * np.pi * 5 * t))
+            phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+            segment = sum(np.sin(k * phase) / k for k in range(1, 6))
+            segment *= 0.25 * (0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(3, 5) * t) ** 2)
+        elif kind == "fricative":
+            length = int(sample_rate * rng.uniform(0.05, 0.15))
+            segment = 0.15 * rng.standard_normal(length)
+        else:
+            length = int(sample_rate * rng.uniform(0.2, 0.9))
+            segment = 0.002 * rng.standard_normal(length)
+        end = min(total, position + length)
+        audio[position:end] = segment[:end - position]
+        position = end
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
 def main():
     try:
         generate_sine_wav()
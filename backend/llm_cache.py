@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import BACKEND_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+# "" (memory only) or "sqlite:///path/to/llm_cache.db" for a persistent tier shared by workers
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "")
+LLM_CACHE_DISK_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DISK_MAX_ENTRIES", "20000"))
+DEFAULT_LLM_CACHE_PATH = str(BACKEND_DIR / "llm_cache.db")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so re-indented but otherwise identical prompts share a key"""
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+def make_cache_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+    """SHA-256 of (model, normalized messages, sampling params)"""
+    payload = {
+        "model": model,
+        "messages": [[m.get("role", ""), normalize_prompt(m.get("content", ""))] for m in messages],
+        "params": params,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Completion text cache: TTL'd in-memory LRU plus an optional SQLite tier.
+
+    The memory tier is bounded by entry count and by total text size and is
+    only touched from the event loop. The SQLite tier (WAL, one connection
+    per thread) is read and written through ``asyncio.to_thread``, survives
+    restarts and is shared by every worker on the host; disk hits are
+    promoted into memory.
+    """
+
+    PRUNE_EVERY = 200  # disk writes
+
+    def __init__(self,
+                 ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 path: Optional[str] = None,
+                 disk_max_entries: int = LLM_CACHE_DISK_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._local = threading.local()
+        self._disk_writes = 0
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+                      "stores": 0, "evictions": 0, "expirations": 0, "disk_errors": 0}
+        if path:
+            self._conn().execute("""
+                CREATE TABLE IF NOT EXISTS llm_response_cache (
+                    key TEXT PRIMARY KEY,
+                    model TEXT,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    response TEXT NOT NULL
+                )
+            """)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                self.stats["memory_hits"] += 1
+                return entry[1]
+            self._discard(key)
+            self.stats["expirations"] += 1
+        if self.path:
+            try:
+                row = await asyncio.to_thread(self._disk_get, key, now)
+            except sqlite3.Error as e:
+                self.stats["disk_errors"] += 1
+                logger.error(f"LLM cache read failed: {e}")
+                row = None
+            if row is not None:
+                expires_at, response = row
+                self._remember(key, response, expires_at)
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return response
+        self.stats["misses"] += 1
+        return None
+
+    async def put(self, key: str, response: str, model: Optional[str] = None):
+        expires_at = time.time() + self.ttl
+        self._remember(key, response, expires_at)
+        self.stats["stores"] += 1
+        if self.path:
+            try:
+                await asyncio.to_thread(self._disk_put, key, model, response, expires_at)
+            except sqlite3.Error as e:
+                self.stats["disk_errors"] += 1
+                logger.error(f"LLM cache write failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+        if self.path:
+            self._conn().execute("DELETE FROM llm_response_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "persistent": bool(self.path),
+        }
+
+    def _remember(self, key: str, response: str, expires_at: float):
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._discard(key)
+        self._entries[key] = (expires_at, response, size)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.stats["evictions"] += 1
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        return self._conn().execute(
+            "SELECT expires_at, response FROM llm_response_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+
+    def _disk_put(self, key: str, model: Optional[str], response: str, expires_at: float):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_response_cache (key, model, created_at, expires_at, response) VALUES (?, ?, ?, ?, ?)",
+            (key, model, now, expires_at, response)
+        )
+        self._disk_writes += 1
+        if self._disk_writes % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM llm_response_cache WHERE key NOT IN "
+                "(SELECT key FROM llm_response_cache ORDER BY created_at DESC LIMIT ?)",
+                (self.disk_max_entries,)
+            )
+
+
+def create_llm_cache(url: str = LLM_CACHE_BACKEND) -> Optional[LLMResponseCache]:
+    """Cache configured by LLM_CACHE_* settings, or None when caching is disabled"""
+    if not LLM_CACHE_ENABLED:
+        return None
+    path = None
+    if url.startswith("sqlite://"):
+        path = url[len("sqlite:///"):] or DEFAULT_LLM_CACHE_PATH
+    elif url:
+        logger.warning(f"Unsupported LLM_CACHE_BACKEND {url!r}; using the in-memory cache only")
+    try:
+        return LLMResponseCache(path=path)
+    except sqlite3.Error as e:
+        logger.error(f"Could not open persistent LLM cache at {path}: {e}; using memory only")
+        return LLMResponseCache()
+
+
+llm_cache = create_llm_cache()
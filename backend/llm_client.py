@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from llm_cache import llm_cache, make_cache_key
+from llm_providers import LLMProvider, get_llm_provider
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# In-flight completions by prompt key; concurrent identical requests share one call
+_inflight: Dict[str, asyncio.Task] = {}
+call_stats = {"api_calls": 0, "api_errors": 0, "coalesced": 0}
+
+
+def get_call_stats() -> Dict[str, Any]:
+    """API calls made, how many identical concurrent requests piggybacked on one, and provider health"""
+    return {**call_stats, "in_flight": len(_inflight), "provider": get_llm_provider().get_stats()}
+
+
+def _cache_key(provider: LLMProvider, model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+    # OpenAI keys stay as they were; other providers never share entries with it
+    if provider.name != "openai":
+        params = {**params, "provider": provider.name}
+    return make_cache_key(model, messages, params)
+
+
+async def chat_completion(model: str,
+                          messages: List[Dict[str, str]],
+                          use_cache: bool = True,
+                          provider: Optional[LLMProvider] = None,
+                          **params) -> str:
+    """Text of the first choice of a chat completion, served from the response cache when possible
+
+    ``params`` (max_tokens, temperature, ...) are part of the cache key.
+    Callers asking for the same key while a call is in flight await that
+    call and get its result or its exception; a caller being cancelled does
+    not cancel the call for the others. Only successful completions are
+    cached. ``provider`` defaults to the process-wide one (LLM_PROVIDER).
+    """
+    provider = provider or get_llm_provider()
+    cache = llm_cache if use_cache else None
+    key = _cache_key(provider, model, messages, params)
+    pending = _inflight.get(key)
+    if pending is None:
+        if cache is not None:
+            cached = await cache.get(key)
+            if cached is not None:
+                logger.debug(f"LLM cache hit for {model} ({key[:12]})")
+                return cached
+        # Another caller may have started the same call while the disk tier was read
+        pending = _inflight.get(key)
+    if pending is not None:
+        call_stats["coalesced"] += 1
+        logger.debug(f"Joining in-flight LLM call for {model} ({key[:12]})")
+        return await asyncio.shield(pending)
+
+    task = asyncio.ensure_future(_complete(provider, key, model, messages, cache, params))
+    _inflight[key] = task
+    task.add_done_callback(lambda done: _finish_inflight(key, done))
+    return await asyncio.shield(task)
+
+
+async def _complete(provider: LLMProvider, key: str, model: str, messages: List[Dict[str, str]],
+                    cache, params: Dict[str, Any]) -> str:
+    call_stats["api_calls"] += 1
+    try:
+        text = await provider.complete(model, messages, **params)
+    except Exception:
+        call_stats["api_errors"] += 1
+        raise
+    if cache is not None and text:
+        await cache.put(key, text, model=model)
+    return text
+
+
+async def stream_chat_completion(model: str,
+                                 messages: List[Dict[str, str]],
+                                 use_cache: bool = True,
+                                 provider: Optional[LLMProvider] = None,
+                                 **params) -> AsyncIterator[str]:
+    """Yield completion text as the API produces it
+
+    A cached completion is yielded whole. A streamed completion is cached
+    once it has arrived in full, so a later non-streaming call for the same
+    prompt is a cache hit too (the key is the same as ``chat_completion``'s).
+    """
+    provider = provider or get_llm_provider()
+    cache = llm_cache if use_cache else None
+    key = _cache_key(provider, model, messages, params)
+    if cache is not None:
+        cached = await cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    call_stats["api_calls"] += 1
+    parts = []
+    try:
+        async for delta in provider.stream(model, messages, **params):
+            parts.append(delta)
+            yield delta
+    except Exception:
+        call_stats["api_errors"] += 1
+        raise
+    text = "".join(parts)
+    if cache is not None and text:
+        await cache.put(key, text, model=model)
+
+
+def _finish_inflight(key: str, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        # Mark the exception retrieved even if every waiter was cancelled
+        task.exception()
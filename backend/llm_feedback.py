@@ -1,25 +1,31 @@
-import openai
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from datetime import datetime
-import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from llm_providers import LLMProvider
+from llm_routing import get_route_policy, routed_completion, routed_stream
+from llm_stream import JSONSectionParser, stream_json_sections
+from prompt_builder import PromptBuilder
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai.api_key = os.getenv("OPENAI_API_KEY")
+RESPONSE_ANALYSIS_SYSTEM_PROMPT = (
+    "You are an expert interview coach and hiring manager with deep knowledge of technical roles, behavioral psychology, and corporate culture. Provide comprehensive, constructive feedback on interview responses with specific actionable insights."
+)
+COMPREHENSIVE_FEEDBACK_SYSTEM_PROMPT = (
+    "You are an expert interview coach and career advisor. Provide comprehensive feedback on interview performance including technical skills, communication, emotional intelligence, cultural fit, and career readiness. Focus on actionable insights and specific improvement areas."
+)
+EMOTIONAL_INTELLIGENCE_SYSTEM_PROMPT = (
+    "You are an expert in emotional intelligence and workplace psychology. Analyze interview responses for emotional intelligence indicators including self-awareness, empathy, social skills, and emotional regulation."
+)
 
 class LLMFeedbackEngine:
-    def __init__(self):
-        self.model = "gpt-4"  # or "gpt-3.5-turbo" for faster/cheaper responses
-        self.max_tokens = 1500  # Increased for more detailed analysis
+    def __init__(self, provider: Optional[LLMProvider] = None):
+        self.provider = provider  # None = the process-wide provider (LLM_PROVIDER)
+        # Model, max_tokens and temperature come from each method's route (llm_routing)
         
     async def analyze_interview_response(self, 
                                        question: str, 
@@ -30,18 +36,15 @@ class LLMFeedbackEngine:
         try:
             prompt = self._create_enhanced_response_analysis_prompt(question, answer, role, context)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
+            feedback_text = await routed_completion(
+                "analyze_interview_response",
+                provider=self.provider,
                 messages=[
-                    {"role": "system", "content": "You are an expert interview coach and hiring manager with deep knowledge of technical roles, behavioral psychology, and corporate culture. Provide comprehensive, constructive feedback on interview responses with specific actionable insights."},
+                    {"role": "system", "content": RESPONSE_ANALYSIS_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=0.7
+                ]
             )
             
-            feedback_text = response.choices[0].message.content
-            
             # Parse structured feedback
             structured_feedback = self._parse_enhanced_feedback(feedback_text)
             
@@ -88,83 +91,111 @@ class LLMFeedbackEngine:
                                             role: str) -> Dict[str, Any]:
         """Generate comprehensive feedback for entire interview session with enhanced metrics"""
         try:
-            prompt = self._create_enhanced_comprehensive_feedback_prompt(session_data, role)
-            
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert interview coach and career advisor. Provide comprehensive feedback on interview performance including technical skills, communication, emotional intelligence, cultural fit, and career readiness. Focus on actionable insights and specific improvement areas."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.7
+            feedback_text = await routed_completion(
+                "generate_comprehensive_feedback",
+                provider=self.provider,
+                messages=self._comprehensive_feedback_messages(session_data, role)
             )
             
-            feedback_text = response.choices[0].message.content
-            
             # Parse comprehensive feedback
             structured_feedback = self._parse_enhanced_comprehensive_feedback(feedback_text)
-            
-            return {
-                "overall_score": structured_feedback.get("overall_score", 0),
-                "communication_score": structured_feedback.get("communication_score", 0),
-                "technical_score": structured_feedback.get("technical_score", 0),
-                "confidence_score": structured_feedback.get("confidence_score", 0),
-                "emotional_intelligence_score": structured_feedback.get("emotional_intelligence_score", 0),
-                "cultural_fit_score": structured_feedback.get("cultural_fit_score", 0),
-                "problem_solving_score": structured_feedback.get("problem_solving_score", 0),
-                "leadership_score": structured_feedback.get("leadership_score", 0),
-                "summary": structured_feedback.get("summary", ""),
-                "strengths": structured_feedback.get("strengths", []),
-                "improvements": structured_feedback.get("improvements", []),
-                "recommendations": structured_feedback.get("recommendations", []),
-                "next_steps": structured_feedback.get("next_steps", []),
-                "career_advice": structured_feedback.get("career_advice", []),
-                "skill_gaps": structured_feedback.get("skill_gaps", []),
-                "development_plan": structured_feedback.get("development_plan", []),
-                "interview_readiness": structured_feedback.get("interview_readiness", 0),
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._comprehensive_feedback_result(structured_feedback)
             
         except Exception as e:
             logger.error(f"Error generating comprehensive feedback: {e}")
-            return {
-                "overall_score": 0,
-                "communication_score": 0,
-                "technical_score": 0,
-                "confidence_score": 0,
-                "emotional_intelligence_score": 0,
-                "cultural_fit_score": 0,
-                "problem_solving_score": 0,
-                "leadership_score": 0,
-                "summary": "Unable to generate comprehensive feedback at this time.",
-                "strengths": [],
-                "improvements": ["Technical issue prevented analysis"],
-                "recommendations": [],
-                "next_steps": [],
-                "career_advice": [],
-                "skill_gaps": [],
-                "development_plan": [],
-                "interview_readiness": 0,
-                "timestamp": datetime.now().isoformat()
-            }
+            return self._comprehensive_feedback_error()
+
+    async def stream_comprehensive_feedback(self,
+                                            session_data: Dict[str, Any],
+                                            role: str) -> AsyncIterator[Dict[str, Any]]:
+        """Comprehensive feedback as it is generated
+
+        Yields ``delta`` records with raw completion text, a ``section``
+        record as soon as each top-level field (``summary``, ``strengths``,
+        ...) has been fully generated, and finally a ``result`` record with
+        the same payload ``generate_comprehensive_feedback`` returns (or an
+        ``error`` record carrying the fallback feedback).
+        """
+        parser = JSONSectionParser()
+        try:
+            chunks = routed_stream(
+                "generate_comprehensive_feedback",
+                provider=self.provider,
+                messages=self._comprehensive_feedback_messages(session_data, role)
+            )
+            async for record in stream_json_sections(chunks, parser):
+                yield record
+            structured_feedback = self._parse_enhanced_comprehensive_feedback(parser.text)
+            yield {"type": "result", "feedback": self._comprehensive_feedback_result(structured_feedback)}
+        except Exception as e:
+            logger.error(f"Error streaming comprehensive feedback: {e}")
+            yield {"type": "error", "error": str(e), "feedback": self._comprehensive_feedback_error()}
+
+    def _comprehensive_feedback_messages(self, session_data: Dict[str, Any], role: str) -> List[Dict[str, str]]:
+        prompt = self._create_enhanced_comprehensive_feedback_prompt(session_data, role)
+        return [
+            {"role": "system", "content": COMPREHENSIVE_FEEDBACK_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _comprehensive_feedback_result(self, structured_feedback: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "overall_score": structured_feedback.get("overall_score", 0),
+            "communication_score": structured_feedback.get("communication_score", 0),
+            "technical_score": structured_feedback.get("technical_score", 0),
+            "confidence_score": structured_feedback.get("confidence_score", 0),
+            "emotional_intelligence_score": structured_feedback.get("emotional_intelligence_score", 0),
+            "cultural_fit_score": structured_feedback.get("cultural_fit_score", 0),
+            "problem_solving_score": structured_feedback.get("problem_solving_score", 0),
+            "leadership_score": structured_feedback.get("leadership_score", 0),
+            "summary": structured_feedback.get("summary", ""),
+            "strengths": structured_feedback.get("strengths", []),
+            "improvements": structured_feedback.get("improvements", []),
+            "recommendations": structured_feedback.get("recommendations", []),
+            "next_steps": structured_feedback.get("next_steps", []),
+            "career_advice": structured_feedback.get("career_advice", []),
+            "skill_gaps": structured_feedback.get("skill_gaps", []),
+            "development_plan": structured_feedback.get("development_plan", []),
+            "interview_readiness": structured_feedback.get("interview_readiness", 0),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _comprehensive_feedback_error(self) -> Dict[str, Any]:
+        return {
+            "overall_score": 0,
+            "communication_score": 0,
+            "technical_score": 0,
+            "confidence_score": 0,
+            "emotional_intelligence_score": 0,
+            "cultural_fit_score": 0,
+            "problem_solving_score": 0,
+            "leadership_score": 0,
+            "summary": "Unable to generate comprehensive feedback at this time.",
+            "strengths": [],
+            "improvements": ["Technical issue prevented analysis"],
+            "recommendations": [],
+            "next_steps": [],
+            "career_advice": [],
+            "skill_gaps": [],
+            "development_plan": [],
+            "interview_readiness": 0,
+            "timestamp": datetime.now().isoformat()
+        }
 
     async def analyze_emotional_intelligence(self, responses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze emotional intelligence from interview responses"""
         try:
             prompt = self._create_emotional_intelligence_prompt(responses)
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
+            ei_text = await routed_completion(
+                "analyze_emotional_intelligence",
+                provider=self.provider,
                 messages=[
-                    {"role": "system", "content": "You are an expert in emotional intelligence and workplace psychology. Analyze interview responses for emotional intelligence indicators including self-awareness, empathy, social skills, and emotional regulation."},
+                    {"role": "system", "content": EMOTIONAL_INTELLIGENCE_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
-                ],
-                max_tokens=1000,
-                temperature=0.7
+                ]
             )
             
-            ei_text = response.choices[0].message.content
             return self._parse_emotional_intelligence(ei_text)
             
         except Exception as e:
@@ -189,18 +220,15 @@ class LLMFeedbackEngine:
             Format as a JSON array of strings.
             """
             
-            response = await openai.ChatCompletion.acreate(
-                model=self.model,
+            questions_text = await routed_completion(
+                "suggest_questions",
+                provider=self.provider,
                 messages=[
                     {"role": "system", "content": "You are an expert hiring manager and technical recruiter. Generate relevant, challenging interview questions that assess both technical skills and soft skills."},
                     {"role": "user", "content": prompt}
-                ],
-                max_tokens=800,
-                temperature=0.8
+                ]
             )
             
-            questions_text = response.choices[0].message.content
-            
             # Try to parse as JSON, fallback to simple parsing
             try:
                 questions = json.loads(questions_text)
@@ -216,20 +244,19 @@ class LLMFeedbackEngine:
             return []
 
     def _create_enhanced_response_analysis_prompt(self, question: str, answer: str, role: str, context: Dict[str, Any] = None) -> str:
-        """Create enhanced prompt for analyzing individual responses"""
-        context_str = ""
-        if context:
-            context_str = f"\nContext: {json.dumps(context)}"
+        """Create enhanced prompt for analyzing individual responses, fitted to the route's token budget"""
+        policy = get_route_policy("analyze_interview_response")
+        builder = PromptBuilder(policy.prompt_tokens, policy.model, route="analyze_interview_response")
         
-        return f"""
+        head = f"""
         Analyze this interview response for a {role} position with comprehensive metrics:
         
         Question: {question}
-        Answer: {answer}
-        {context_str}
+        Answer: """
+        tail = """
         
         Provide detailed feedback in the following JSON format:
-        {{
+        {
             "score": <1-10>,
             "feedback": "<detailed, actionable feedback>",
             "strengths": ["<specific strength1>", "<specific strength2>"],
@@ -244,7 +271,7 @@ class LLMFeedbackEngine:
             "confidence_level": <1-10>,
             "specificity": <1-10>,
             "relevance": <1-10>
-        }}
+        }
         
         Consider:
         - Technical accuracy and depth
@@ -256,16 +283,28 @@ class LLMFeedbackEngine:
         - Specificity of examples
         - Relevance to the question
         """
+        
+        # The answer is what is being assessed; context only gets a quarter of what is left
+        available = builder.remaining(RESPONSE_ANALYSIS_SYSTEM_PROMPT, head, tail)
+        context_str = f"\n        Context: {builder.fit_json(context, available // 4)}" if context else ""
+        answer = builder.fit_text(answer, available - builder.count(context_str))
+        # Joined, not substituted: user text must never be scanned for placeholders
+        prompt = head + answer + context_str + tail
+        return builder.finish(RESPONSE_ANALYSIS_SYSTEM_PROMPT, prompt)
 
     def _create_enhanced_comprehensive_feedback_prompt(self, session_data: Dict[str, Any], role: str) -> str:
-        """Create enhanced prompt for comprehensive session feedback"""
-        return f"""
+        """Create enhanced prompt for comprehensive session feedback, fitted to the route's token budget"""
+        policy = get_route_policy("generate_comprehensive_feedback")
+        builder = PromptBuilder(policy.prompt_tokens, policy.model, route="generate_comprehensive_feedback")
+        
+        head = f"""
         Analyze this complete interview session for a {role} position with comprehensive evaluation:
         
-        Session Data: {json.dumps(session_data, indent=2)}
+        Session Data: """
+        tail = """
         
         Provide comprehensive feedback in the following JSON format:
-        {{
+        {
             "overall_score": <1-10>,
             "communication_score": <1-10>,
             "technical_score": <1-10>,
@@ -283,7 +322,7 @@ class LLMFeedbackEngine:
             "skill_gaps": ["<skill gap1>", "<skill gap2>"],
             "development_plan": ["<development step1>", "<development step2>"],
             "interview_readiness": <1-10>
-        }}
+        }
         
         Evaluate:
         - Overall interview performance
@@ -295,22 +334,28 @@ class LLMFeedbackEngine:
         - Leadership potential
         - Career readiness
         """
+        
+        available = builder.remaining(COMPREHENSIVE_FEEDBACK_SYSTEM_PROMPT, head, tail)
+        prompt = head + builder.fit_json(session_data, available) + tail
+        return builder.finish(COMPREHENSIVE_FEEDBACK_SYSTEM_PROMPT, prompt)
 
     def _create_emotional_intelligence_prompt(self, responses: List[Dict[str, Any]]) -> str:
-        """Create prompt for emotional intelligence analysis"""
-        responses_text = json.dumps(responses, indent=2)
+        """Create prompt for emotional intelligence analysis, fitted to the route's token budget"""
+        policy = get_route_policy("analyze_emotional_intelligence")
+        builder = PromptBuilder(policy.prompt_tokens, policy.model, route="analyze_emotional_intelligence")
         
-        return f"""
+        head = """
         Analyze the emotional intelligence indicators in these interview responses:
         
-        Responses: {responses_text}
+        Responses: """
+        tail = """
         
         Provide analysis in the following JSON format:
-        {{
+        {
             "ei_score": <1-10>,
             "insights": ["<insight1>", "<insight2>"],
             "recommendations": ["<recommendation1>", "<recommendation2>"]
-        }}
+        }
         
         Consider:
         - Self-awareness and self-reflection
@@ -319,6 +364,10 @@ class LLMFeedbackEngine:
         - Emotional regulation and stress management
         - Motivation and drive
         """
+        
+        available = builder.remaining(EMOTIONAL_INTELLIGENCE_SYSTEM_PROMPT, head, tail)
+        prompt = head + builder.fit_json(responses, available) + tail
+        return builder.finish(EMOTIONAL_INTELLIGENCE_SYSTEM_PROMPT, prompt)
 
     def _parse_enhanced_feedback(self, feedback_text: str) -> Dict[str, Any]:
         """Parse enhanced feedback text into structured format"""
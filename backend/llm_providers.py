@@ -0,0 +1,316 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import openai
+from dotenv import load_dotenv
+
+from llm_transport import llm_transport
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Provider selection (openai | fake)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4")
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.2"))  # seconds to first token
+FAKE_LLM_TOKEN_RATE = float(os.getenv("FAKE_LLM_TOKEN_RATE", "200"))  # tokens per second; 0 = instant
+CHARS_PER_TOKEN = 4  # rough English average, used to pace the fake
+
+
+class LLMProvider:
+    """Chat-completion backend shared by the LLM engines.
+
+    ``complete`` returns the text of one completion; ``stream`` yields it
+    in pieces as they are produced. Both receive the OpenAI-style
+    ``messages`` list and sampling params (max_tokens, temperature, ...).
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.calls = 0
+        self.failures = 0
+        self.busy_seconds = 0.0
+
+    async def complete(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        started = time.perf_counter()
+        self.calls += 1
+        try:
+            return await self._complete(model, messages, **params)
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    async def stream(self, model: str, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        self.calls += 1
+        try:
+            async for delta in self._stream(model, messages, **params):
+                yield delta
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.busy_seconds += time.perf_counter() - started
+
+    async def _complete(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        raise NotImplementedError
+
+    async def _stream(self, model: str, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        # Providers without native streaming yield the whole completion at once
+        yield await self._complete(model, messages, **params)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "calls": self.calls,
+            "failures": self.failures,
+            "busy_seconds": round(self.busy_seconds, 3)
+        }
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI chat completions through the pooled, retrying ``llm_transport``"""
+
+    name = "openai"
+
+    def __init__(self, transport=None, api_key: Optional[str] = None):
+        super().__init__()
+        self.transport = transport or llm_transport
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if api_key:
+            openai.api_key = api_key
+
+    async def _complete(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        response = await self.transport.create(model=model, messages=messages, **params)
+        return response.choices[0].message.content
+
+    async def _stream(self, model: str, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        async for chunk in self.transport.stream(model=model, messages=messages, **params):
+            delta = chunk["choices"][0]["delta"].get("content")
+            if delta:
+                yield delta
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "transport": self.transport.get_stats()}
+
+
+class FakeLLMProvider(LLMProvider):
+    """Deterministic stand-in for load tests and offline development.
+
+    The prompt is matched against the engines' prompt wording to pick a
+    response schema (response analysis, comprehensive, emotional
+    intelligence, real-time, skill gap, career, question list), and the
+    values are drawn from a generator seeded with a hash of the request, so
+    identical prompts always get identical, schema-valid JSON. Objects come
+    in a ```json fence like the real model's answers. Timing is ``latency``
+    to the first token, then ``token_rate`` tokens per second.
+    """
+
+    name = "fake"
+
+    # (prompt type, phrase that identifies it), checked in order
+    PROMPT_SIGNATURES = [
+        ("response_analysis", "analyze this interview response"),
+        ("emotional_intelligence", "emotional intelligence indicators"),
+        ("real_time", "real-time feedback for this interview response"),
+        ("skill_gap", "analyze skill gaps"),
+        ("career", "career development analysis"),
+        ("questions", "interview questions for a"),
+        ("comprehensive", "interview session"),
+    ]
+
+    STRENGTHS = ["Clear structure", "Concrete examples", "Good technical depth", "Calm delivery",
+                 "Quantified impact", "Ownership of outcomes", "Collaborative mindset"]
+    IMPROVEMENTS = ["Use the STAR format", "Quantify results", "Keep answers under two minutes",
+                    "Explain trade-offs", "Slow down on key points", "Link answers to the role"]
+    RECOMMENDATIONS = ["Practice mock interviews", "Prepare three project stories", "Review system design basics",
+                       "Record and replay answers", "Research the company's product"]
+    SKILLS = ["System design", "Testing strategy", "SQL performance", "Cloud deployment",
+              "Stakeholder communication", "Algorithms", "Leadership"]
+    QUESTIONS = ["Tell me about a system you designed end to end?",
+                 "How do you decide what to test first?",
+                 "Describe a disagreement with a teammate and how you resolved it?",
+                 "How would you debug a slow API endpoint?",
+                 "What would you improve in your last project?",
+                 "How do you keep up with new technology?",
+                 "Walk me through a production incident you handled?"]
+
+    def __init__(self, latency: float = FAKE_LLM_LATENCY, token_rate: float = FAKE_LLM_TOKEN_RATE):
+        super().__init__()
+        self.latency = latency
+        self.token_rate = token_rate
+        self.prompt_types: Dict[str, int] = {}
+
+    def prompt_type(self, messages: List[Dict[str, str]]) -> str:
+        text = " ".join(message.get("content", "") for message in messages).lower()
+        for prompt_type, phrase in self.PROMPT_SIGNATURES:
+            if phrase in text:
+                return prompt_type
+        return "generic"
+
+    def respond(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        """Completion text for a request, without the simulated delay"""
+        prompt_type = self.prompt_type(messages)
+        self.prompt_types[prompt_type] = self.prompt_types.get(prompt_type, 0) + 1
+        seed = hashlib.sha256(json.dumps([model, messages], sort_keys=True).encode("utf-8")).digest()
+        rng = random.Random(seed)
+        payload = getattr(self, f"_{prompt_type}")(rng)
+        if prompt_type == "questions":
+            return json.dumps(payload)
+        return "```json\n" + json.dumps(payload, indent=2) + "\n```"
+
+    def _pick(self, rng: random.Random, pool: List[str], count: int = 2) -> List[str]:
+        return rng.sample(pool, count)
+
+    def _score(self, rng: random.Random) -> int:
+        return rng.randint(5, 9)
+
+    def _response_analysis(self, rng: random.Random) -> Dict[str, Any]:
+        feedback = {
+            "score": self._score(rng),
+            "feedback": "Solid answer with a clear example; tighten the ending and state the outcome.",
+            "strengths": self._pick(rng, self.STRENGTHS),
+            "improvements": self._pick(rng, self.IMPROVEMENTS),
+            "keywords": self._pick(rng, self.SKILLS, 3),
+            "confidence": round(rng.uniform(0.6, 0.95), 2),
+        }
+        for key in ["emotional_intelligence", "cultural_fit", "communication_clarity", "technical_depth",
+                    "problem_solving", "confidence_level", "specificity", "relevance"]:
+            feedback[key] = self._score(rng)
+        return feedback
+
+    def _comprehensive(self, rng: random.Random) -> Dict[str, Any]:
+        feedback = {key: self._score(rng) for key in [
+            "overall_score", "communication_score", "technical_score", "confidence_score",
+            "emotional_intelligence_score", "cultural_fit_score", "problem_solving_score", "leadership_score"]}
+        feedback.update({
+            "summary": "Consistent performance with good examples; more structure would lift the weaker answers.",
+            "strengths": self._pick(rng, self.STRENGTHS, 3),
+            "improvements": self._pick(rng, self.IMPROVEMENTS, 3),
+            "recommendations": self._pick(rng, self.RECOMMENDATIONS),
+            "next_steps": ["Review this feedback", "Schedule another practice session"],
+            "career_advice": ["Build depth in one specialty", "Share your work publicly"],
+            "skill_gaps": self._pick(rng, self.SKILLS),
+            "development_plan": ["30 days: practice STAR stories", "60 days: build a portfolio project",
+                                 "90 days: run full mock interviews"],
+            "interview_readiness": self._score(rng),
+        })
+        return feedback
+
+    def _emotional_intelligence(self, rng: random.Random) -> Dict[str, Any]:
+        return {
+            "ei_score": self._score(rng),
+            "insights": ["Acknowledges mistakes openly", "Credits teammates"],
+            "recommendations": self._pick(rng, self.RECOMMENDATIONS),
+        }
+
+    def _real_time(self, rng: random.Random) -> Dict[str, Any]:
+        return {
+            "current_response_score": self._score(rng),
+            "immediate_feedback": "Good start; add one concrete result.",
+            "suggested_improvements": self._pick(rng, self.IMPROVEMENTS),
+            "confidence_boosters": ["Your example was relevant", "Good pace"],
+            "next_question_prep": "Have a technical trade-off story ready.",
+            "overall_session_progress": self._score(rng),
+            "session_trends": {"improving": rng.random() > 0.3},
+            "quick_tips": ["Pause before answering", "Lead with the outcome"],
+        }
+
+    def _skill_gap(self, rng: random.Random) -> Dict[str, Any]:
+        return {
+            "skill_gap_analysis": {"technical": self._pick(rng, self.SKILLS), "soft": ["Leadership"]},
+            "priority_skills": self._pick(rng, self.SKILLS),
+            "learning_path": ["Online course", "Guided project", "Mock interviews"],
+            "resource_recommendations": ["System Design Primer", "LeetCode"],
+            "timeline_estimates": {"basic": f"{rng.randint(1, 3)} months", "advanced": f"{rng.randint(4, 9)} months"},
+            "certification_suggestions": ["AWS Certified Developer"],
+            "project_ideas": ["Build a rate-limited API", "Add tracing to a service"],
+            "mentorship_areas": ["Architecture", "Technical leadership"],
+        }
+
+    def _career(self, rng: random.Random) -> Dict[str, Any]:
+        return {
+            "career_path_analysis": {"current_level": "Mid", "next_level": "Senior"},
+            "role_transitions": ["Tech Lead", "Staff Engineer"],
+            "industry_opportunities": ["FinTech", "Developer tools"],
+            "salary_benchmarks": {"current": f"${rng.randint(90, 130)}k", "target": f"${rng.randint(140, 180)}k"},
+            "networking_strategies": ["Local meetups", "Open-source contributions"],
+            "personal_branding": {"blog": "Write up one project a quarter"},
+            "long_term_goals": ["Lead a platform team"],
+            "risk_assessment": {"market": "Low", "skills": "Medium"},
+        }
+
+    def _questions(self, rng: random.Random) -> List[str]:
+        return self._pick(rng, self.QUESTIONS, 5)
+
+    def _generic(self, rng: random.Random) -> Dict[str, Any]:
+        return {"summary": "Fake completion", "score": self._score(rng)}
+
+    async def _complete(self, model: str, messages: List[Dict[str, str]], **params) -> str:
+        text = self.respond(model, messages, **params)
+        delay = self.latency + (len(text) / CHARS_PER_TOKEN / self.token_rate if self.token_rate > 0 else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return text
+
+    async def _stream(self, model: str, messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+        text = self.respond(model, messages, **params)
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        # Pace in ~20 ms slices rather than sleeping per token
+        tokens_per_piece = max(1, int(self.token_rate * 0.02)) if self.token_rate > 0 else len(text)
+        piece = tokens_per_piece * CHARS_PER_TOKEN
+        for start in range(0, len(text), piece):
+            if start and self.token_rate > 0:
+                await asyncio.sleep(tokens_per_piece / self.token_rate)
+            yield text[start:start + piece]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**super().get_stats(), "prompt_types": dict(self.prompt_types)}
+
+
+def create_llm_provider(name: str = LLM_PROVIDER, **kwargs) -> LLMProvider:
+    """Build a provider by name (openai or fake)"""
+    name = (name or "openai").lower()
+    if name == "fake":
+        return FakeLLMProvider(**kwargs)
+    if name == "openai":
+        return OpenAIProvider(**kwargs)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+
+_provider: Optional[LLMProvider] = None
+
+
+def get_llm_provider() -> LLMProvider:
+    """Return the process-wide provider, creating it from LLM_PROVIDER on first use"""
+    global _provider
+    if _provider is None:
+        # No fallback: a mistyped LLM_PROVIDER must not quietly send traffic to the paid API
+        try:
+            _provider = create_llm_provider(LLM_PROVIDER)
+        except Exception as e:
+            logger.error(f"Failed to initialise LLM provider '{LLM_PROVIDER}': {e}")
+            raise
+        logger.info(f"Using LLM provider: {_provider.name}")
+    return _provider
+
+
+def set_llm_provider(provider: LLMProvider) -> LLMProvider:
+    """Swap the process-wide provider (used by tests and benchmarks)"""
+    global _provider
+    _provider = provider
+    return provider
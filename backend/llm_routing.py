@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from audio_metrics import RunningStat
+from llm_client import chat_completion, stream_chat_completion
+from llm_providers import LLM_MODEL, LLMProvider
+from prompt_builder import LLM_PROMPT_TOKEN_BUDGET, count_message_tokens
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gpt-3.5-turbo")  # for routes on the user's critical path
+# JSON object of per-route overrides, e.g. {"real_time": {"model": "gpt-4o-mini", "slo_ms": 1500}}
+LLM_ROUTE_OVERRIDES = os.getenv("LLM_ROUTE_OVERRIDES", "")
+
+
+@dataclass
+class RoutePolicy:
+    model: str
+    max_tokens: int
+    temperature: float
+    slo_ms: float  # latency objective for one completion on this route
+    tier: str = "deep"  # "fast" routes are on the critical path, "deep" ones are full reports
+    prompt_tokens: int = LLM_PROMPT_TOKEN_BUDGET  # budget the PromptBuilder fits prompts into
+
+
+# Keyed by AnalysisType value (AIInterviewAnalyzer) or engine method name (LLMFeedbackEngine)
+DEFAULT_ROUTE_POLICIES = {
+    # /api/ai/real-time-feedback and /api/ai/quick-analysis
+    "real_time": RoutePolicy(LLM_FAST_MODEL, 500, 0.6, 3000, "fast", 1500),
+    # /api/llm/analyze-response
+    "analyze_interview_response": RoutePolicy(LLM_FAST_MODEL, 700, 0.7, 4000, "fast", 1500),
+    "post_interview": RoutePolicy(LLM_MODEL, 2000, 0.7, 30000),
+    "skill_assessment": RoutePolicy(LLM_MODEL, 1800, 0.7, 30000),
+    "career_development": RoutePolicy(LLM_MODEL, 2000, 0.8, 30000),
+    "generate_comprehensive_feedback": RoutePolicy(LLM_MODEL, 2000, 0.7, 30000),
+    "analyze_emotional_intelligence": RoutePolicy(LLM_MODEL, 1000, 0.7, 20000),
+    "suggest_questions": RoutePolicy(LLM_MODEL, 800, 0.8, 15000),
+}
+DEFAULT_ROUTE = RoutePolicy(LLM_MODEL, 1500, 0.7, 30000)
+
+
+def load_route_policies(overrides: str = LLM_ROUTE_OVERRIDES) -> Dict[str, RoutePolicy]:
+    """Default policies with any fields from the overrides JSON replaced"""
+    policies = {name: RoutePolicy(**asdict(policy)) for name, policy in DEFAULT_ROUTE_POLICIES.items()}
+    if not overrides:
+        return policies
+    try:
+        for name, fields in json.loads(overrides).items():
+            base = asdict(policies.get(name, DEFAULT_ROUTE))
+            base.update({key: value for key, value in fields.items() if key in base})
+            policies[name] = RoutePolicy(**base)
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.error(f"Ignoring invalid LLM_ROUTE_OVERRIDES: {e}")
+    return policies
+
+
+class RouteMetrics:
+    """Latency of each route's completions, measured against its SLO"""
+
+    def __init__(self, policies: Dict[str, RoutePolicy]):
+        self.policies = policies
+        self.routes: Dict[str, Dict[str, Any]] = {}
+
+    def policy(self, route: str) -> RoutePolicy:
+        return self.policies.get(route, DEFAULT_ROUTE)
+
+    def _route(self, route: str) -> Dict[str, Any]:
+        if route not in self.routes:
+            # Histogram spans 4x the SLO so percentiles near the objective stay precise
+            high = self.policy(route).slo_ms * 4
+            self.routes[route] = {
+                "calls": 0, "errors": 0, "slo_breaches": 0,
+                "latency_ms": RunningStat(0.0, high),
+                "first_token_ms": RunningStat(0.0, high),
+                "prompt_tokens": RunningStat(0.0, self.policy(route).prompt_tokens * 2),
+            }
+        return self.routes[route]
+
+    def record(self, route: str, latency_ms: float, ok: bool, first_token_ms: Optional[float] = None,
+               prompt_tokens: Optional[int] = None):
+        stats = self._route(route)
+        slo_ms = self.policy(route).slo_ms
+        stats["calls"] += 1
+        if prompt_tokens is not None:
+            stats["prompt_tokens"].add(prompt_tokens)
+        stats["latency_ms"].add(latency_ms)
+        if first_token_ms is not None:
+            stats["first_token_ms"].add(first_token_ms)
+        if not ok:
+            stats["errors"] += 1
+        if latency_ms > slo_ms:
+            stats["slo_breaches"] += 1
+            logger.warning(f"LLM route {route} took {latency_ms:.0f} ms (SLO {slo_ms:.0f} ms)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        report = {}
+        for route in sorted(set(self.policies) | set(self.routes)):
+            stats = self.routes.get(route)
+            entry = {"policy": asdict(self.policy(route))}
+            if stats is not None:
+                entry.update({
+                    "calls": stats["calls"],
+                    "errors": stats["errors"],
+                    "slo_breaches": stats["slo_breaches"],
+                    "slo_attainment": round(1 - stats["slo_breaches"] / stats["calls"], 4),
+                    "latency_ms": stats["latency_ms"].to_dict(),
+                })
+                if stats["first_token_ms"].count:
+                    entry["first_token_ms"] = stats["first_token_ms"].to_dict()
+                if stats["prompt_tokens"].count:
+                    entry["prompt_tokens"] = stats["prompt_tokens"].to_dict()
+            report[route] = entry
+        return report
+
+
+ROUTE_POLICIES = load_route_policies()
+route_metrics = RouteMetrics(ROUTE_POLICIES)
+
+
+def get_route_policy(route: str) -> RoutePolicy:
+    return route_metrics.policy(route)
+
+
+async def routed_completion(route: str,
+                            messages: List[Dict[str, str]],
+                            provider: Optional[LLMProvider] = None,
+                            use_cache: bool = True) -> str:
+    """``chat_completion`` with the route's model and sampling params, timed against its SLO
+
+    The prompt's token count is recorded for the route as well.
+    """
+    policy = route_metrics.policy(route)
+    prompt_tokens = count_message_tokens(messages, policy.model)
+    started = time.perf_counter()
+    ok = False
+    try:
+        text = await chat_completion(model=policy.model, messages=messages, use_cache=use_cache, provider=provider,
+                                     max_tokens=policy.max_tokens, temperature=policy.temperature)
+        ok = True
+        return text
+    finally:
+        route_metrics.record(route, (time.perf_counter() - started) * 1000, ok, prompt_tokens=prompt_tokens)
+
+
+async def routed_stream(route: str,
+                        messages: List[Dict[str, str]],
+                        provider: Optional[LLMProvider] = None,
+                        use_cache: bool = True) -> AsyncIterator[str]:
+    """``stream_chat_completion`` for a route; records time to first token as well as the total"""
+    policy = route_metrics.policy(route)
+    prompt_tokens = count_message_tokens(messages, policy.model)
+    started = time.perf_counter()
+    first_token_ms = None
+    ok = False
+    try:
+        async for delta in stream_chat_completion(model=policy.model, messages=messages, use_cache=use_cache,
+                                                  provider=provider, max_tokens=policy.max_tokens,
+                                                  temperature=policy.temperature):
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - started) * 1000
+            yield delta
+        ok = True
+    finally:
+        route_metrics.record(route, (time.perf_counter() - started) * 1000, ok, first_token_ms, prompt_tokens)
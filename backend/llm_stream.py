@@ -0,0 +1,84 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JSONSectionParser:
+    """Incrementally pulls top-level members out of a JSON object being streamed.
+
+    The feedback prompts ask for one JSON object; as completion text arrives
+    this scans it once (tracking strings, escapes and nesting) and returns
+    each ``"key": value`` member the moment its closing ``,`` or ``}`` is
+    seen, so the client can render ``summary`` before ``development_plan``
+    has been generated. Text before the opening ``{`` (prose, code fences)
+    is skipped; members that fail to parse are dropped and left to the
+    final full parse.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start = None
+        self.done = False
+
+    def feed(self, delta: str) -> List[Tuple[str, Any]]:
+        """Add completion text; return members completed by it, in order"""
+        self.text += delta
+        sections = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            char = text[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 0:
+                # Preamble before the object: only its opening brace matters
+                if char == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._emit(text[self._member_start:self._pos], sections)
+                    self.done = True
+                self._depth -= 1
+            elif char == "," and self._depth == 1:
+                self._emit(text[self._member_start:self._pos], sections)
+                self._member_start = self._pos + 1
+            self._pos += 1
+        return sections
+
+    def _emit(self, member: str, sections: List[Tuple[str, Any]]):
+        if not member.strip():
+            return
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping unparseable streamed section: {member[:80]!r}")
+            return
+        sections.extend(parsed.items())
+
+
+async def stream_json_sections(chunks: AsyncIterator[str], parser: JSONSectionParser) -> AsyncIterator[Dict[str, Any]]:
+    """Turn completion text chunks into ``delta`` records plus a ``section`` record per parsed member
+
+    The full text is left in ``parser.text`` for the caller's final parse.
+    """
+    async for delta in chunks:
+        yield {"type": "delta", "text": delta}
+        for name, value in parser.feed(delta):
+            yield {"type": "section", "name": name, "value": value}
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+import openai
+from openai import error as openai_error
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))  # open connections to the provider
+LLM_KEEPALIVE_TIMEOUT = float(os.getenv("LLM_KEEPALIVE_TIMEOUT", "30"))  # seconds an idle connection is kept
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "60"))  # seconds per call, retries included
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "30"))  # seconds per attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive failures that open the circuit
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))  # seconds before a trial call is let through
+
+# Provider faults worth another attempt; bad requests and auth errors are not
+RETRYABLE_ERRORS = (
+    openai_error.Timeout,
+    openai_error.APIConnectionError,
+    openai_error.RateLimitError,
+    openai_error.ServiceUnavailableError,
+    openai_error.TryAgain,
+    asyncio.TimeoutError,
+    aiohttp.ClientError,
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Fails fast after repeated provider faults.
+
+    ``failure_threshold`` consecutive failed attempts open the circuit; for
+    ``reset_timeout`` seconds every call is rejected immediately. After that
+    a single trial call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_timeout: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self.stats = {"opened": 0, "rejected": 0}
+
+    def allow(self):
+        """Raise ``CircuitOpenError`` unless a call may go to the provider now"""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(f"LLM circuit open after {self.consecutive_failures} consecutive failures")
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError("LLM circuit half-open; trial call in flight")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.stats["opened"] += 1
+                logger.warning(f"LLM circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Forget a trial call that ended without a verdict (cancelled, bad request)"""
+        self._trial_in_flight = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.consecutive_failures, **self.stats}
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, RETRYABLE_ERRORS):
+        return True
+    # Generic APIError covers 5xx responses and malformed bodies from the provider
+    return type(exc) is openai_error.APIError and (exc.http_status is None or exc.http_status >= 500)
+
+
+def retry_delay(attempt: int, exc: BaseException,
+                base_delay: float = LLM_RETRY_BASE_DELAY, max_delay: float = LLM_RETRY_MAX_DELAY) -> float:
+    """Full-jitter exponential backoff, or the provider's Retry-After when it sends one"""
+    headers = getattr(exc, "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(float(retry_after), max_delay)
+        except ValueError:
+            pass
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class LLMTransport:
+    """Shared, resilient path to the chat completion API.
+
+    All calls reuse one keep-alive aiohttp connection pool (handed to the
+    openai SDK through ``openai.aiosession``) instead of the SDK opening a
+    session per request. Each call has an overall deadline; attempts that
+    fail with a retryable error are retried with jittered exponential
+    backoff while the deadline allows, and a circuit breaker rejects calls
+    outright while the provider is failing.
+    """
+
+    def __init__(self,
+                 pool_size: int = LLM_POOL_SIZE,
+                 keepalive_timeout: float = LLM_KEEPALIVE_TIMEOUT,
+                 deadline: float = LLM_CALL_DEADLINE,
+                 attempt_timeout: float = LLM_ATTEMPT_TIMEOUT,
+                 max_retries: int = LLM_MAX_RETRIES,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        self.stats = {"attempts": 0, "retries": 0, "failures": 0, "deadline_exceeded": 0, "sessions_opened": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._session_loop = loop
+            self.stats["sessions_opened"] += 1
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def _attempt(self, params: Dict[str, Any], timeout: float):
+        token = openai.aiosession.set(self._get_session())
+        try:
+            return await asyncio.wait_for(
+                openai.ChatCompletion.acreate(request_timeout=timeout, **params), timeout=timeout)
+        finally:
+            openai.aiosession.reset(token)
+
+    async def create(self, deadline: Optional[float] = None, **params):
+        """``openai.ChatCompletion.acreate(**params)`` with pooling, deadline, retries and the breaker
+
+        With ``stream=True`` only opening the stream is retried; see ``stream``.
+        """
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            remaining = deadline_at - time.monotonic()
+            self.stats["attempts"] += 1
+            try:
+                response = await self._attempt(params, min(self.attempt_timeout, remaining))
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                self.stats["failures"] += 1
+                delay = retry_delay(attempt, e)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline_at:
+                    if attempt < self.max_retries:
+                        self.stats["deadline_exceeded"] += 1
+                    logger.error(f"LLM call failed after {attempt + 1} attempt(s): {type(e).__name__}: {e}")
+                    raise
+                logger.warning(f"LLM attempt {attempt + 1} failed ({type(e).__name__}); retrying in {delay:.2f}s")
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return response
+
+    async def stream(self, deadline: Optional[float] = None, **params) -> AsyncIterator[Any]:
+        """Yield streamed completion chunks; the whole stream must finish within the deadline
+
+        Opening the stream is retried like ``create``. Once chunks have been
+        yielded a failure is raised as is, since the caller has already
+        forwarded partial text.
+        """
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        response = await self.create(deadline=deadline or self.deadline, stream=True, **params)
+        chunks = response.__aiter__()
+        try:
+            while True:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    self.stats["deadline_exceeded"] += 1
+                    raise asyncio.TimeoutError("LLM stream exceeded its deadline")
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pool_size": self.pool_size, "circuit": self.breaker.get_stats()}
+
+
+# Global transport shared by every LLM engine
+llm_transport = LLMTransport()
@@ -1,12 +1,14 @@
 from fastapi import FastAPI, Request, HTTPException, Body, UploadFile, File, Form, status
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.websockets import WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.formparsers import MultiPartParser
 import re
 import asyncio
+import functools
 import json
 import os
 import tempfile
@@ -17,7 +19,22 @@ import csv
 import socketio
 import uvicorn
 from typing import List, Dict, Any, Optional
-from voice_processor import get_or_create_session, InterviewSession
+from voice_frames import (
+    decode_voice_message, decode_audio_field, decode_audio_format, decode_question_index, decode_timestamp,
+    VoiceFrameError
+)
+from voice_queue import VoiceChunkQueue, QueuedChunk
+from shared_state import create_socketio_manager
+from runtime_metrics import loop_lag_monitor, process_memory
+from audio_decoder import FFMPEG_BINARY, ffmpeg_available
+from audio_storage import (
+    AudioUploadTooLarge, AUDIO_MULTIPART_OVERHEAD_BYTES, AUDIO_UPLOAD_MAX_BYTES, capped_chunks, extension_for,
+    find_stored_audio, store_audio_bytes, store_audio_stream, upload_file_chunks
+)
+from voice_processor import (
+    get_or_create_session, InterviewSession, close_session, get_session_metrics,
+    get_session as get_live_voice_session, parse_session_cursor
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +55,15 @@ from db_utils import (
 from voice_processor import get_or_create_session as get_voice_session
 from resume_processor import ResumeProcessor
 from llm_feedback import feedback_engine
+from llm_cache import llm_cache
+from llm_client import get_call_stats as get_llm_call_stats
+from llm_routing import route_metrics
+from llm_transport import llm_transport
+from llm_providers import get_llm_provider
+from asr_engines import get_asr_engine
+from batch_analysis import (
+    STREAM_MEDIA_TYPES, clamp_batch_options, encode_stream_record, iter_batch_analysis, stream_format
+)
 from ai_interview_analyzer import ai_analyzer, AnalysisType
 from interview_modes import InterviewModeManager, InterviewMode
 
@@ -110,12 +136,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active WebSocket connections
+# Store active WebSocket connections (sockets are per worker; Socket.IO emits are shared via its client manager)
 active_connections: Dict[str, WebSocket] = {}
 
-# Create Socket.IO server
+# Create Socket.IO server (SOCKETIO_MESSAGE_QUEUE routes emits between workers)
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=create_socketio_manager(),
     cors_allowed_origins=["http://localhost:3000", "http://127.0.0.1:3000", "*"],
     logger=True,
     engineio_logger=True,
@@ -182,6 +209,33 @@ def root():
     }
 
 
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    """Probe event-loop responsiveness for /api/voice/metrics"""
+    loop_lag_monitor.start()
+
+
+@app.on_event("startup")
+async def check_asr_engine_and_llm_provider():
+    """Fail at startup, not on the first interview, if ASR_ENGINE or LLM_PROVIDER is misconfigured"""
+    get_asr_engine()
+    get_llm_provider()
+
+
+@app.on_event("startup")
+async def check_audio_decoder():
+    """Browsers stream WebM/Ogg voice chunks, which cannot be transcribed without ffmpeg"""
+    if not ffmpeg_available():
+        logger.error(f"Audio decoder '{FFMPEG_BINARY}' not found; WebM/Ogg voice chunks will be rejected. "
+                     "Install ffmpeg or set FFMPEG_BINARY.")
+
+
+@app.on_event("shutdown")
+async def close_llm_transport():
+    """Close pooled LLM provider connections"""
+    await llm_transport.close()
+
+
 @app.get("/api/health")
 async def api_health():
     """Simple health check endpoint for monitoring/deploy checks"""
@@ -848,30 +902,63 @@ async def clear_history(request: Request):
 async def process_voice_audio(request: Request):
     """Process voice audio and return transcription and analysis"""
     try:
-        data = await request.json()
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            # Raw PCM16 body; metadata travels in the query string
+            data = dict(request.query_params)
+            audio_data = memoryview(await request.body())
+            data["final"] = data.get("final", "").lower() in ("1", "true", "yes")
+        else:
+            data = await request.json()
+            audio_data = data.get("audio_data")  # Base64 encoded audio
         session_id = data.get("session_id")
-        audio_data = data.get("audio_data")  # Base64 encoded audio
         role = data.get("role", "Software Engineer")
-        timestamp = data.get("timestamp", asyncio.get_event_loop().time())
+        final = bool(data.get("final", False))  # client stopped recording; flush open utterance
+        # Clients that send a cursor get only what changed since it instead of the full summary
+        use_delta = "cursor" in data
+        cursor = data.get("cursor")
         
         if not session_id or not audio_data:
             return JSONResponse({"error": "Missing session_id or audio_data"}, status_code=400)
         
-        # Get or create voice session
-        voice_session = get_voice_session(session_id, role)
+        if use_delta:
+            try:
+                parse_session_cursor(cursor)
+            except ValueError as e:
+                return JSONResponse({"error": str(e)}, status_code=400)
         
         # Process audio (convert from base64 if needed)
-        import base64
-        audio_bytes = base64.b64decode(audio_data)
+        try:
+            audio_bytes = decode_audio_field(audio_data)
+            sample_rate, channels = decode_audio_format(data)
+            question_index = decode_question_index(data)
+            timestamp = decode_timestamp(data, asyncio.get_event_loop().time())
+        except VoiceFrameError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        
+        # Get or create voice session
+        voice_session = await get_voice_session(session_id, role)
+        if data.get("user_email"):
+            voice_session.user_email = data["user_email"]
         
         # Process the audio
-        result = await voice_session.process_interview_audio(audio_bytes, timestamp)
+        async with voice_session.lock:
+            result = await voice_session.process_interview_audio(
+                audio_bytes, timestamp, final=final, sample_rate=sample_rate, channels=channels,
+                question_index=question_index
+            )
+            if use_delta:
+                summary_key, summary = "session_delta", voice_session.get_session_delta(cursor)
+            else:
+                summary_key, summary = "session_summary", voice_session.get_session_summary()
         
         return {
             "success": True,
             "transcript": result.get("transcript"),
             "audio_quality": result.get("audio_quality"),
-            "session_summary": voice_session.get_session_summary()
+            "speech_active": result.get("speech_active", False),
+            "pipeline_stats": result.get("pipeline_stats"),
+            "prosody": result.get("prosody"),
+            summary_key: summary
         }
         
     except Exception as e:
@@ -880,6 +967,55 @@ async def process_voice_audio(request: Request):
 
 
 
+@app.get("/api/voice/session/{session_id}/summary")
+async def get_voice_session_summary(session_id: str):
+    """Full live-session summary, for clients reconnecting without a valid cursor"""
+    try:
+        voice_session = await get_live_voice_session(session_id)
+        if voice_session is None:
+            return JSONResponse({"error": "Voice session not found"}, status_code=404)
+        
+        return {
+            "success": True,
+            "session_summary": voice_session.get_session_summary()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting voice session summary: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@app.get("/api/voice/metrics")
+async def get_voice_metrics():
+    """Live voice-session store metrics (sessions, evictions, resident bytes), loop lag and process memory"""
+    try:
+        return {
+            "success": True,
+            "sessions": get_session_metrics(),
+            "event_loop_lag_ms": loop_lag_monitor.get_stats(),
+            "process": process_memory(),
+            "audio_decoder": {"binary": FFMPEG_BINARY, "available": ffmpeg_available()}
+        }
+    except Exception as e:
+        logger.error(f"Error collecting voice metrics: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+@app.get("/api/llm/cache/stats")
+async def get_llm_cache_stats():
+    """Hit/miss counts and size of the LLM response cache"""
+    if llm_cache is None:
+        return {"success": True, "enabled": False}
+    return {"success": True, "enabled": True, "cache": llm_cache.get_stats()}
+
+@app.get("/api/llm/stats")
+async def get_llm_stats():
+    """LLM API calls made, calls saved by coalescing, provider health, per-route latency vs SLO and cache counters"""
+    return {
+        "success": True,
+        "calls": get_llm_call_stats(),
+        "routes": route_metrics.get_stats(),
+        "cache": llm_cache.get_stats() if llm_cache is not None else None
+    }
+
 @app.post("/api/llm/analyze-response")
 async def analyze_response_with_llm(request: Request):
     """Analyze interview response using LLM"""
@@ -905,9 +1041,24 @@ async def analyze_response_with_llm(request: Request):
         logger.error(f"Error analyzing response with LLM: {e}")
         return JSONResponse({"error": str(e)}, status_code=500)
 
+def stream_records_response(records, fmt: str, first: Optional[Dict[str, Any]] = None) -> StreamingResponse:
+    """Stream async records as NDJSON or SSE; ``first`` is sent before the source produces anything"""
+    async def body():
+        if first is not None:
+            yield encode_stream_record(first, fmt)
+        async for record in records:
+            yield encode_stream_record(record, fmt)
+    return StreamingResponse(body(), media_type=STREAM_MEDIA_TYPES[fmt],
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @app.post("/api/llm/comprehensive-feedback")
 async def get_comprehensive_feedback(request: Request):
-    """Get comprehensive feedback for entire interview session"""
+    """Get comprehensive feedback for entire interview session
+
+    With ``"stream": "sse"`` or ``"ndjson"`` (or a matching Accept header)
+    the completion is forwarded as it is generated: ``delta`` text,
+    ``section`` records as each field is parsed, then the ``result``.
+    """
     try:
         data = await request.json()
         session_data = data.get("session_data", {})
@@ -916,6 +1067,12 @@ async def get_comprehensive_feedback(request: Request):
         if not session_data:
             return JSONResponse({"error": "Missing session data"}, status_code=400)
         
+        fmt = stream_format(data.get("stream"), request.headers.get("accept", ""))
+        if fmt:
+            return stream_records_response(
+                feedback_engine.stream_comprehensive_feedback(session_data, role), fmt, first={"type": "start"}
+            )
+        
         # Generate comprehensive feedback
         feedback = await feedback_engine.generate_comprehensive_feedback(session_data, role)
         
@@ -930,7 +1087,7 @@ async def get_comprehensive_feedback(request: Request):
 
 @app.post("/api/ai/interview-analysis")
 async def analyze_interview_session(request: Request):
-    """Comprehensive AI interview analysis with multiple analysis types"""
+    """Comprehensive AI interview analysis with multiple analysis types (streamable like comprehensive-feedback)"""
     try:
         data = await request.json()
         session_data = data.get("session_data", {})
@@ -948,6 +1105,13 @@ async def analyze_interview_session(request: Request):
         elif analysis_type == "career_development":
             analysis_enum = AnalysisType.CAREER_DEVELOPMENT
         
+        fmt = stream_format(data.get("stream"), request.headers.get("accept", ""))
+        if fmt:
+            return stream_records_response(
+                ai_analyzer.stream_interview_session(session_data, analysis_enum), fmt,
+                first={"type": "start", "analysis_type": analysis_enum.value}
+            )
+        
         # Generate AI analysis
         analysis = await ai_analyzer.analyze_interview_session(session_data, analysis_enum)
         
@@ -1057,7 +1221,14 @@ async def get_quick_analysis(request: Request):
 
 @app.post("/api/ai/batch-analysis")
 async def batch_analyze_interviews(request: Request):
-    """Analyze multiple interview sessions in batch"""
+    """Analyze multiple interview sessions concurrently
+
+    Optional ``concurrency`` and ``item_timeout`` (seconds) bound the batch.
+    With ``"stream": "ndjson"`` or ``"sse"`` (or a matching Accept header)
+    each result is sent as soon as it finishes, followed by a summary
+    record; disconnecting cancels the items still running. Otherwise one
+    JSON response with every result is returned.
+    """
     try:
         data = await request.json()
         sessions = data.get("sessions", [])
@@ -1073,28 +1244,31 @@ async def batch_analyze_interviews(request: Request):
         elif analysis_type == "career_development":
             analysis_enum = AnalysisType.CAREER_DEVELOPMENT
         
-        # Process each session
+        options = clamp_batch_options(data.get("concurrency"), data.get("item_timeout"))
+        records = iter_batch_analysis(
+            sessions, lambda session: ai_analyzer.analyze_interview_session(session, analysis_enum), **options
+        )
+        
+        fmt = stream_format(data.get("stream"), request.headers.get("accept", ""))
+        if fmt:
+            return stream_records_response(records, fmt)
+        
         results = []
-        for session in sessions:
-            try:
-                analysis = await ai_analyzer.analyze_interview_session(session, analysis_enum)
-                results.append({
-                    "session_id": session.get("session_id", "unknown"),
-                    "success": True,
-                    "analysis": analysis
-                })
-            except Exception as e:
-                results.append({
-                    "session_id": session.get("session_id", "unknown"),
-                    "success": False,
-                    "error": str(e)
-                })
+        summary = {}
+        async for record in records:
+            if record["type"] == "summary":
+                summary = record
+            else:
+                results.append(record)
+        results.sort(key=lambda record: record["index"])
         
         return {
             "success": True,
             "total_sessions": len(sessions),
-            "successful_analyses": len([r for r in results if r["success"]]),
-            "failed_analyses": len([r for r in results if not r["success"]]),
+            "successful_analyses": summary.get("successful_analyses", 0),
+            "failed_analyses": summary.get("failed_analyses", 0),
+            "timed_out": summary.get("timed_out", 0),
+            "elapsed_ms": summary.get("elapsed_ms"),
             "results": results
         }
         
@@ -1370,54 +1544,40 @@ async def voice(sid, data):
     """Handle voice data from client"""
     try:
         logger.info(f"Received voice data from client {sid}")
-        session_id = data.get("session_id")
-        role = data.get("role", "Software Engineer")
-        audio_data = data.get("audio_data")
+        # Binary frames and binary attachments arrive as bytes and stay
+        # memoryviews through feature extraction; base64 text still works
+        try:
+            metadata, audio_bytes = decode_voice_message(data)
+            metadata["sample_rate"], metadata["channels"] = decode_audio_format(metadata)
+            metadata["question_index"] = decode_question_index(metadata)
+        except VoiceFrameError as e:
+            logger.error(f"Failed to decode voice message: {e}")
+            await sio.emit('error', {'message': 'Invalid audio data format'}, room=sid)
+            return
         
-        logger.info(f"Session ID: {session_id}, Role: {role}, Audio data length: {len(audio_data) if audio_data else 0}")
+        session_id = metadata.get("session_id")
+        role = metadata.get("role", "Software Engineer")
+        final = bool(metadata.get("final", False))
         
-        if not session_id or not audio_data:
+        logger.info(f"Session ID: {session_id}, Role: {role}, Audio data length: {len(audio_bytes)}")
+        
+        if not session_id or (not len(audio_bytes) and not final):
             logger.error("Missing session_id or audio_data")
             await sio.emit('error', {'message': 'Missing session_id or audio_data'}, room=sid)
             return
         
-        # Decode base64 audio data
-        import base64
-        try:
-            audio_bytes = base64.b64decode(audio_data)
-            logger.info(f"Decoded audio data size: {len(audio_bytes)} bytes")
-        except Exception as e:
-            logger.error(f"Failed to decode base64 audio data: {e}")
-            await sio.emit('error', {'message': 'Invalid audio data format'}, room=sid)
-            return
-        
-        # Process voice data
-        try:
-            # Get or create voice session
-            voice_session = get_or_create_session(session_id, role)
-            
-            # Process the audio data
-            result = await voice_session.process_interview_audio(audio_bytes, asyncio.get_event_loop().time())
-            
-            logger.info(f"Voice processing result: {result}")
-            
-            # Prepare response data
-            response_data = {}
-            if result.get('transcript'):
-                response_data['transcript'] = result['transcript']
-            if result.get('audio_quality'):
-                response_data['audio_quality'] = result['audio_quality']
-            
-            # Send results back to client
-            await sio.emit('voice_result', response_data, room=sid)
-            logger.info("Voice result sent to client")
-            
-        except Exception as e:
-            logger.error(f"Error in voice processing: {str(e)}", exc_info=True)
-            await sio.emit('error', {
-                'message': 'Error processing voice data',
-                'details': str(e)
-            }, room=sid)
+        # Queue the chunk; the session's drain task processes chunks one at a
+        # time and emits voice_result in sequence order
+        voice_session = await get_or_create_session(session_id, role)
+        if metadata.get("user_email"):
+            voice_session.user_email = metadata["user_email"]
+        if voice_session.chunk_queue is None:
+            voice_session.chunk_queue = VoiceChunkQueue(
+                handler=functools.partial(handle_queued_voice_chunk, voice_session),
+                notify=emit_voice_backpressure
+            )
+        seq = await voice_session.chunk_queue.put(audio_bytes, sid=sid, final=final, metadata=metadata)
+        logger.debug(f"Queued voice chunk {seq} (depth {voice_session.chunk_queue.depth})")
         
     except Exception as e:
         logger.error(f"Error processing voice data: {str(e)}", exc_info=True)
@@ -1426,6 +1586,66 @@ async def voice(sid, data):
             'details': str(e)
         }, room=sid)
 
+async def handle_queued_voice_chunk(voice_session: InterviewSession, item: QueuedChunk):
+    """Process one queued chunk and emit its voice_result"""
+    try:
+        # Hold the session lock so HTTP requests for the same session interleave safely
+        async with voice_session.lock:
+            result = await voice_session.process_interview_audio(
+                item.audio, asyncio.get_event_loop().time(), final=item.final,
+                sample_rate=item.metadata.get("sample_rate"), channels=item.metadata.get("channels"),
+                interim=bool(item.metadata.get("interim", False)),
+                question_index=item.metadata.get("question_index")
+            )
+        
+        logger.info(f"Voice processing result: {result}")
+        
+        # Prepare response data
+        response_data = {
+            'seq': item.seq,
+            'seq_end': item.last_seq,
+            'speech_active': result.get('speech_active', False)
+        }
+        if 'seq' in item.metadata:
+            response_data['client_seq'] = item.metadata['seq']
+        if result.get('transcript'):
+            response_data['transcript'] = result['transcript']
+        if result.get('partial_transcript'):
+            # Hypothesis for an utterance still being spoken; superseded by a later transcript
+            response_data['partial_transcript'] = result['partial_transcript']
+        response_data['is_final'] = bool(result.get('transcript'))
+        if result.get('endpoint_latency_ms'):
+            response_data['endpoint_latency_ms'] = result['endpoint_latency_ms']
+        if result.get('audio_quality'):
+            response_data['audio_quality'] = result['audio_quality']
+        if result.get('prosody'):
+            # Speaking-style summary of the answer that just ended
+            response_data['prosody'] = result['prosody']
+        
+        if result.get('error'):
+            # The recording cannot be decoded; its remaining chunks are dropped until the client restarts it
+            await sio.emit('error', {
+                'message': 'Could not decode voice audio',
+                'details': result['error'],
+                'seq': item.seq
+            }, room=item.sid)
+        
+        # Send results back to client
+        await sio.emit('voice_result', response_data, room=item.sid)
+        logger.info("Voice result sent to client")
+        
+    except Exception as e:
+        logger.error(f"Error in voice processing: {str(e)}", exc_info=True)
+        await sio.emit('error', {
+            'message': 'Error processing voice data',
+            'details': str(e),
+            'seq': item.seq
+        }, room=item.sid)
+
+async def emit_voice_backpressure(sid: Optional[str], data: Dict[str, Any]):
+    """Tell the client to slow down (or resume) sending voice chunks"""
+    await sio.emit('voice_backpressure', data, room=sid)
+
 # Remove feedback event
 # @sio.event
 # async def feedback(sid, data):
@@ -1610,6 +1830,8 @@ async def end_interview(request: Request):
             return JSONResponse({"error": "Missing sessionId"}, status_code=400)
         
         success = end_interview_session(session_id)
+        # Release the live voice session (transcript, metrics, audio buffers)
+        await close_session(session_id)
         
         if success:
             return {"success": True, "message": "Interview session ended successfully"}
@@ -1644,6 +1866,53 @@ async def add_question(request: Request):
         logger.error(f"Error adding question: {str(e)}")
         return JSONResponse({"error": str(e)}, status_code=500)
 
+@app.post("/api/interview/response/audio")
+async def upload_response_audio(request: Request):
+    """Stream response audio to content-addressed storage
+
+    Send the audio as the raw request body (``audio/*`` or
+    ``application/octet-stream``, chunked transfer encoding is fine) or as
+    the ``audio`` field of a multipart form. The body is written to disk as
+    it arrives and capped at AUDIO_UPLOAD_MAX_BYTES. Pass the returned
+    ``audioSha256`` to /api/interview/response instead of ``audioBlob``.
+    """
+    try:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > AUDIO_UPLOAD_MAX_BYTES:
+            return JSONResponse({"error": f"Audio exceeds {AUDIO_UPLOAD_MAX_BYTES} bytes"}, status_code=413)
+        
+        content_type = request.headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            # Parse from a capped stream: request.form() would spool a body of any
+            # size first (e.g. chunked transfer encoding, so no Content-Length)
+            body = capped_chunks(request.stream(), AUDIO_UPLOAD_MAX_BYTES + AUDIO_MULTIPART_OVERHEAD_BYTES)
+            form = await MultiPartParser(request.headers, body, max_files=1).parse()
+            upload = form.get("audio")
+            if upload is None or not hasattr(upload, "read"):
+                return JSONResponse({"error": "Missing audio file field"}, status_code=400)
+            try:
+                stored = await store_audio_stream(
+                    upload_file_chunks(upload), extension=extension_for(upload.content_type)
+                )
+            finally:
+                await form.close()
+        else:
+            stored = await store_audio_stream(request.stream(), extension=extension_for(content_type))
+        
+        return {
+            "success": True,
+            "audioSha256": stored["sha256"],
+            "audioFilePath": stored["path"],
+            "size": stored["size"],
+            "deduplicated": stored["deduplicated"]
+        }
+        
+    except AudioUploadTooLarge as e:
+        return JSONResponse({"error": str(e)}, status_code=413)
+    except Exception as e:
+        logger.error(f"Error uploading response audio: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
 @app.post("/api/interview/response")
 async def save_response(request: Request):
     """Save user response to a question with enhanced data storage"""
@@ -1654,6 +1923,7 @@ async def save_response(request: Request):
         question_text = data.get("question")
         user_answer = data.get("answer") or data.get("userAnswer")
         audio_blob = data.get("audioBlob")
+        audio_sha256 = data.get("audioSha256")  # from /api/interview/response/audio
         response_duration = data.get("responseDuration")
         confidence_score = data.get("confidenceScore")
         question_id = data.get("questionId")  # Add question_id for proper association
@@ -1687,20 +1957,20 @@ async def save_response(request: Request):
         
         # Save audio file if provided
         audio_file_path = None
-        if audio_blob:
+        if audio_sha256:
+            stored_path = await find_stored_audio(str(audio_sha256))
+            if stored_path is None:
+                return JSONResponse({"error": "Unknown audioSha256; upload the audio first"}, status_code=400)
+            audio_file_path = str(stored_path)
+        elif audio_blob:
             try:
-                # Decode base64 audio data
+                # Legacy data-URL upload: decode and store through the async content-addressed path
                 import base64
-                audio_data = base64.b64decode(audio_blob.split(',')[1])
-                
-                # Create audio directory if it doesn't exist
-                audio_dir = f"audio_responses/{session_id}"
-                os.makedirs(audio_dir, exist_ok=True)
-                
-                # Save audio file
-                audio_file_path = f"{audio_dir}/response_{question_index}_{int(datetime.now().timestamp())}.wav"
-                with open(audio_file_path, "wb") as f:
-                    f.write(audio_data)
+                header, _, encoded = audio_blob.partition(',')
+                audio_data = base64.b64decode(encoded)
+                mime_type = header[len("data:"):].split(";", 1)[0] if header.startswith("data:") else None
+                stored = await store_audio_bytes(audio_data, extension=extension_for(mime_type or "audio/wav"))
+                audio_file_path = stored["path"]
                     
             except Exception as e:
                 logger.error(f"Error saving audio file: {e}")
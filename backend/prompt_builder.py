@@ -0,0 +1,237 @@
+import json
+import logging
+import math
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional exact token counts (pip install tiktoken)
+    tiktoken = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6000"))  # default per-route prompt budget
+PROMPT_KEEP_RECENT = int(os.getenv("PROMPT_KEEP_RECENT", "3"))  # latest answers never summarized or dropped
+PROMPT_SUMMARY_WORDS = int(os.getenv("PROMPT_SUMMARY_WORDS", "30"))  # words kept of a summarized answer
+CHARS_PER_TOKEN = 4  # estimate when tiktoken is not installed
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators per chat message
+
+# Bookkeeping fields that cost tokens without informing the feedback
+LOW_VALUE_FIELDS = {
+    "timestamp", "created_at", "updated_at", "completed_at", "session_id", "user_id", "user_email",
+    "index", "audio", "audio_data", "audio_url", "audioBlob", "audioSha256", "audio_sha256",
+    "metrics_timeline",
+}
+
+FULL, SUMMARY, OMITTED = 0, 1, 2
+
+_encodings: Dict[str, Any] = {}
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    """Tokens in ``text`` for ``model``: exact with tiktoken, else a characters/4 estimate"""
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if model not in _encodings:
+            try:
+                _encodings[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encodings[model] = tiktoken.get_encoding("cl100k_base")
+        return len(_encodings[model].encode(text))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str = "gpt-4") -> int:
+    return sum(count_tokens(message.get("content", ""), model) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def summarize_answer(answer: str, words: int = PROMPT_SUMMARY_WORDS) -> str:
+    """Extractive summary: the opening ``words`` words of an answer"""
+    parts = answer.split()
+    if len(parts) <= words:
+        return answer
+    return " ".join(parts[:words]) + " …"
+
+
+def _response_pair(index: int, response: Any) -> Tuple[str, str]:
+    # Handle both dictionary and string response formats
+    if isinstance(response, dict):
+        return str(response.get("question", "N/A")), str(response.get("answer", "No answer provided"))
+    return f"Question {index + 1}", str(response)
+
+
+class PromptBuilder:
+    """Fits session data into a route's prompt token budget.
+
+    Fixed prompt text (system prompt, instructions, JSON schema) is counted
+    first; the variable part gets what is left. Low-value fields are
+    dropped and JSON is written compactly. If answers still do not fit,
+    older ones are summarized, then omitted (oldest first); the latest
+    ``keep_recent`` are only ever truncated. ``report`` says what was done
+    and how many tokens the prompt came to.
+    """
+
+    def __init__(self, budget: int = LLM_PROMPT_TOKEN_BUDGET, model: str = "gpt-4",
+                 keep_recent: int = PROMPT_KEEP_RECENT, route: str = ""):
+        self.budget = budget
+        self.model = model
+        self.keep_recent = keep_recent
+        self.report: Dict[str, Any] = {"route": route, "budget": budget, "summarized": 0, "omitted": 0,
+                                       "truncated": 0, "dropped_fields": 0}
+
+    def count(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def remaining(self, *fixed_texts: str) -> int:
+        """Budget left after the fixed parts of the prompt (and their message overhead)"""
+        used = sum(self.count(text) for text in fixed_texts) + 2 * MESSAGE_OVERHEAD_TOKENS
+        return max(0, self.budget - used)
+
+    def fit_text(self, text: str, budget: int) -> str:
+        """Cut the middle out of ``text`` so it fits ``budget`` tokens, keeping its start and end"""
+        tokens = self.count(text)
+        if tokens <= budget:
+            return text
+        self.report["truncated"] += 1
+        keep = max(0, int(len(text) * budget / tokens) - 8)
+        head = keep * 2 // 3
+        return text[:head] + " … " + text[len(text) - (keep - head):] if keep > head else text[:head] + " …"
+
+    def strip_low_value(self, data: Any) -> Any:
+        if isinstance(data, dict):
+            stripped = {}
+            for key, value in data.items():
+                if key in LOW_VALUE_FIELDS or value in (None, "", [], {}):
+                    self.report["dropped_fields"] += 1
+                    continue
+                stripped[key] = self.strip_low_value(value)
+            return stripped
+        if isinstance(data, list):
+            return [self.strip_low_value(item) for item in data]
+        return data
+
+    def _plan(self, responses: List[Any], budget: int, cost: Callable[[int, int], int]) -> List[int]:
+        """Detail level per response so the total cost fits ``budget`` (or as close as possible)"""
+        levels = [FULL] * len(responses)
+        total = sum(cost(i, FULL) for i in range(len(responses)))
+        older = max(0, len(responses) - self.keep_recent)
+        for level in (SUMMARY, OMITTED):
+            for i in range(older):
+                if total <= budget:
+                    return levels
+                total += cost(i, level) - cost(i, levels[i])
+                levels[i] = level
+        return levels
+
+    def _account(self, levels: List[int]):
+        self.report["summarized"] += levels.count(SUMMARY)
+        self.report["omitted"] += levels.count(OMITTED)
+
+    def fit_responses(self, responses: List[Any], budget: int) -> str:
+        """Question/answer transcript in the post-interview prompt's layout, fitted to ``budget``"""
+        pairs = [_response_pair(i, response) for i, response in enumerate(responses)]
+
+        def render(i: int, level: int) -> str:
+            question, answer = pairs[i]
+            if level == OMITTED:
+                return ""
+            if level == SUMMARY:
+                return f"""
+        Question {i+1}: {question}
+        Answer (summarized): {summarize_answer(answer)}
+        """
+            return f"""
+        Question {i+1}: {question}
+        Answer: {answer}
+        """
+
+        costs: Dict[Tuple[int, int], int] = {}
+
+        def cost(i: int, level: int) -> int:
+            if (i, level) not in costs:
+                costs[(i, level)] = self.count(render(i, level))
+            return costs[(i, level)]
+
+        levels = self._plan(pairs, budget, cost)
+        self._account(levels)
+        omitted = levels.count(OMITTED)
+        text = f"\n        (Questions 1-{omitted} omitted to fit the prompt budget)\n" if omitted else ""
+        kept = [i for i, level in enumerate(levels) if level != OMITTED]
+        used = self.count(text) + sum(cost(i, levels[i]) for i in kept)
+        if used > budget and kept:
+            # Only the latest answers are left; share what remains between them
+            overflow_share = max(1, (budget - self.count(text)) // len(kept))
+            for i in kept:
+                question, answer = pairs[i]
+                pairs[i] = (question, self.fit_text(answer, max(1, overflow_share - self.count(question) - 8)))
+        return text + "".join(render(i, levels[i]) for i in kept)
+
+    def fit_json(self, data: Any, budget: int) -> str:
+        """Compact JSON of ``data`` without low-value fields, its ``responses`` fitted to ``budget``"""
+        data = self.strip_low_value(data)
+        responses = data.get("responses") if isinstance(data, dict) else data
+        if not isinstance(responses, list):
+            return self._fit_json_strings(data, budget)
+
+        def item(i: int, level: int) -> Any:
+            response = responses[i]
+            if level == FULL or not isinstance(response, dict):
+                return response
+            summarized = {key: value for key, value in response.items() if key != "answer"}
+            summarized["answer_summary"] = summarize_answer(str(response.get("answer", "")))
+            return summarized
+
+        def dump(value: Any) -> str:
+            return json.dumps(value, separators=(",", ":"), default=str)
+
+        costs: Dict[Tuple[int, int], int] = {}
+
+        def cost(i: int, level: int) -> int:
+            if level == OMITTED:
+                return 0
+            if (i, level) not in costs:
+                costs[(i, level)] = self.count(dump(item(i, level))) + 1
+            return costs[(i, level)]
+
+        envelope = dict(data, responses=[]) if isinstance(data, dict) else []
+        levels = self._plan(responses, max(0, budget - self.count(dump(envelope))), cost)
+        self._account(levels)
+        fitted = [item(i, level) for i, level in enumerate(levels) if level != OMITTED]
+        if isinstance(data, dict):
+            fitted = dict(data, responses=fitted)
+            if levels.count(OMITTED):
+                fitted["omitted_responses"] = levels.count(OMITTED)
+        return self._fit_json_strings(fitted, budget)
+
+    def _fit_json_strings(self, data: Any, budget: int) -> str:
+        """Compact JSON; if still over budget, long strings are shortened until it fits"""
+        text = json.dumps(data, separators=(",", ":"), default=str)
+        limit = 2000
+        while self.count(text) > budget and limit >= 50:
+            data = self._shorten_strings(data, limit)
+            text = json.dumps(data, separators=(",", ":"), default=str)
+            limit //= 2
+        return text
+
+    def _shorten_strings(self, data: Any, limit: int) -> Any:
+        if isinstance(data, dict):
+            return {key: self._shorten_strings(value, limit) for key, value in data.items()}
+        if isinstance(data, list):
+            return [self._shorten_strings(value, limit) for value in data]
+        if isinstance(data, str) and len(data) > limit:
+            self.report["truncated"] += 1
+            return data[:limit] + " …"
+        return data
+
+    def finish(self, system: str, prompt: str) -> str:
+        """Record the final prompt size, log any trimming, and return the prompt"""
+        tokens = self.count(system) + self.count(prompt) + 2 * MESSAGE_OVERHEAD_TOKENS
+        self.report["tokens"] = tokens
+        trimmed = self.report["summarized"] or self.report["omitted"] or self.report["truncated"]
+        if trimmed or tokens > self.budget:
+            logger.info(f"Prompt for {self.report['route'] or 'LLM call'} fitted to budget: {self.report}")
+        return prompt
@@ -0,0 +1,191 @@
+import logging
+import os
+import re
+from collections import Counter
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from audio_metrics import RunningStat
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Silence between two speech frames shorter than this is articulation, not a pause
+PROSODY_MIN_PAUSE_MS = int(os.getenv("PROSODY_MIN_PAUSE_MS", "250"))
+PROSODY_LONG_PAUSE_MS = int(os.getenv("PROSODY_LONG_PAUSE_MS", "2000"))
+PROSODY_PAUSE_MAX_MS = 10000.0  # histogram range
+
+# Autocorrelation pitch tracker
+PITCH_MIN_HZ = float(os.getenv("PITCH_MIN_HZ", "75"))
+PITCH_MAX_HZ = float(os.getenv("PITCH_MAX_HZ", "400"))
+# Normalised autocorrelation peak a frame needs to count as voiced
+PITCH_VOICING_THRESHOLD = float(os.getenv("PITCH_VOICING_THRESHOLD", "0.3"))
+
+FILLER_WORDS = {"um", "umm", "uh", "uhh", "er", "erm", "ah", "hmm", "mm"}
+FILLER_PHRASES = ("you know", "i mean", "sort of", "kind of")
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+class ProsodyTracker:
+    """Incremental speaking-style metrics for the answer being spoken.
+
+    Fed one VAD frame at a time (with the VAD's speech decision) and the
+    final transcripts as they arrive, it keeps only counters and two
+    fixed-bin histograms, so an answer's speaking rate, pause distribution,
+    speech/silence ratio and pitch statistics are ready the moment it ends
+    without revisiting any audio. ``finish_answer`` returns the compact
+    summary and starts the next answer.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.min_lag = max(1, int(sample_rate / PITCH_MAX_HZ))
+        self.max_lag = int(sample_rate / PITCH_MIN_HZ)
+        frame_samples = int(sample_rate * frame_ms / 1000)
+        # Zero-padded FFT length for a linear (not circular) autocorrelation
+        self._fft_size = 1 << (2 * frame_samples - 1).bit_length()
+        self.answers = 0
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        self.speech_frames = 0
+        self.span_frames = 0  # first to last speech frame of the answer
+        self.voiced_frames = 0
+        self.words = 0
+        self.fillers = Counter()
+        self.pauses_ms = RunningStat(0.0, PROSODY_PAUSE_MAX_MS)
+        self.long_pauses = 0
+        self.pitch_hz = RunningStat(PITCH_MIN_HZ, PITCH_MAX_HZ)
+        self._silence_run = 0
+
+    def observe(self, frame, is_speech: bool):
+        """Account one PCM16 VAD frame (called from the VAD, in the analyze stage)"""
+        self.frames += 1
+        if not is_speech:
+            self._silence_run += 1
+            return
+        if self.speech_frames:
+            self.span_frames += self._silence_run + 1
+            pause_ms = self._silence_run * self.frame_ms
+            if pause_ms >= PROSODY_MIN_PAUSE_MS:
+                self.pauses_ms.add(pause_ms)
+                if pause_ms >= PROSODY_LONG_PAUSE_MS:
+                    self.long_pauses += 1
+        else:
+            self.span_frames = 1
+        self._silence_run = 0
+        self.speech_frames += 1
+        pitch = self.estimate_pitch(frame)
+        if pitch is not None:
+            self.voiced_frames += 1
+            self.pitch_hz.add(pitch)
+
+    def add_transcript(self, text: str):
+        """Count words and filler words of a final transcript segment"""
+        lowered = text.lower()
+        words = _WORD_RE.findall(lowered)
+        self.words += len(words)
+        for word in words:
+            if word in FILLER_WORDS:
+                self.fillers[word] += 1
+        joined = " ".join(words)
+        for phrase in FILLER_PHRASES:
+            count = len(re.findall(rf"\b{phrase}\b", joined))
+            if count:
+                self.fillers[phrase] += count
+
+    def estimate_pitch(self, frame) -> Optional[float]:
+        """Fundamental frequency of one frame in Hz, or None if it is not voiced"""
+        x = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        if len(x) <= self.max_lag:
+            return None
+        x -= x.mean()
+        spectrum = np.fft.rfft(x, n=self._fft_size)
+        autocorr = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=self._fft_size)[:self.max_lag + 2]
+        if autocorr[0] <= 0:
+            return None
+        autocorr /= autocorr[0]
+        region = autocorr[self.min_lag:self.max_lag + 1]
+        index = int(np.argmax(region))
+        if region[index] < PITCH_VOICING_THRESHOLD:
+            return None
+        lag = float(self.min_lag + index)
+        # Parabolic interpolation around the peak for sub-sample resolution
+        left, centre, right = autocorr[int(lag) - 1], autocorr[int(lag)], autocorr[int(lag) + 1]
+        curvature = left - 2 * centre + right
+        if curvature < 0:
+            lag += 0.5 * (left - right) / curvature
+        return self.sample_rate / lag
+
+    @property
+    def has_speech(self) -> bool:
+        return self.speech_frames > 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact metrics for the answer so far"""
+        frame_s = self.frame_ms / 1000
+        span_s = self.span_frames * frame_s
+        speech_s = self.speech_frames * frame_s
+        total_fillers = sum(self.fillers.values())
+        pauses = self.pauses_ms.to_dict()
+        pitch = self.pitch_hz.to_dict()
+        p10 = self.pitch_hz.percentile(10)
+        return {
+            "duration_s": round(span_s, 2),
+            "speech_s": round(speech_s, 2),
+            "speech_ratio": round(speech_s / span_s, 3) if span_s else 0.0,
+            "words": self.words,
+            "words_per_minute": round(self.words / span_s * 60, 1) if span_s else 0.0,
+            "articulation_wpm": round(self.words / speech_s * 60, 1) if speech_s else 0.0,
+            "fillers": dict(self.fillers),
+            "fillers_per_minute": round(total_fillers / span_s * 60, 2) if span_s else 0.0,
+            "pauses": {
+                "count": pauses["count"],
+                "long_count": self.long_pauses,
+                "mean_ms": round(pauses["mean"]),
+                "p50_ms": round(pauses["p50"]),
+                "p90_ms": round(pauses["p90"]),
+                "max_ms": round(pauses["max"]),
+            },
+            "pitch_hz": {
+                "voiced_ratio": round(self.voiced_frames / self.speech_frames, 3) if self.speech_frames else 0.0,
+                "mean": round(pitch["mean"], 1),
+                "p10": round(p10, 1),
+                "p50": round(pitch["p50"], 1),
+                "p90": round(pitch["p90"], 1),
+                # Spread between the 10th and 90th percentile; low values sound monotone
+                "range_semitones": round(12 * np.log2(pitch["p90"] / p10), 2) if pitch["count"] and p10 > 0 else 0.0,
+            },
+        }
+
+    def finish_answer(self) -> Dict[str, Any]:
+        """Summary of the answer that just ended; the tracker then starts a new one"""
+        summary = self.summary()
+        self.answers += 1
+        self.reset()
+        return summary
+
+    def export_state(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames, "speech_frames": self.speech_frames, "span_frames": self.span_frames,
+            "voiced_frames": self.voiced_frames, "words": self.words, "fillers": dict(self.fillers),
+            "long_pauses": self.long_pauses, "silence_run": self._silence_run, "answers": self.answers,
+            "pauses_ms": self.pauses_ms.export_state(), "pitch_hz": self.pitch_hz.export_state(),
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        self.frames = state["frames"]
+        self.speech_frames = state["speech_frames"]
+        self.span_frames = state["span_frames"]
+        self.voiced_frames = state["voiced_frames"]
+        self.words = state["words"]
+        self.fillers = Counter(state["fillers"])
+        self.long_pauses = state["long_pauses"]
+        self._silence_run = state["silence_run"]
+        self.answers = state.get("answers", 0)
+        self.pauses_ms.load_state(state["pauses_ms"])
+        self.pitch_hz.load_state(state["pitch_hz"])
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from audio_metrics import RunningStat
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.05"))  # seconds between probes
+LOOP_LAG_MAX_MS = 2000.0  # histogram range
+
+
+class EventLoopLagMonitor:
+    """Measures how late the event loop wakes a sleeping task.
+
+    A probe sleeps for ``interval`` and records the overshoot; anything that
+    blocks the loop (sync I/O, CPU work outside the executor) shows up
+    directly as lag.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lag_ms = RunningStat(0.0, LOOP_LAG_MAX_MS)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start probing on the running loop (idempotent)"""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"running": self.running, "interval_ms": self.interval * 1000, **self.lag_ms.to_dict()}
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag_ms.add(max(0.0, (loop.time() - started - self.interval) * 1000))
+
+
+def process_memory() -> Dict[str, int]:
+    """Current and peak resident set size of this process in bytes"""
+    peak = 0
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    rss = peak
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+loop_lag_monitor = EventLoopLagMonitor()
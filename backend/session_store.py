@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Set
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SESSION_IDLE_TTL = float(os.getenv("SESSION_IDLE_TTL", "1800"))  # seconds
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "500"))
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "30"))
+
+
+class SessionStore:
+    """In-process store for live sessions with idle-TTL and LRU eviction.
+
+    Entries are kept in access order; every lookup moves the entry to the
+    end, so the front of the dict is always the least recently used. Expired
+    entries are swept at most once per ``sweep_interval`` on access, and the
+    oldest entries are evicted whenever ``max_entries`` is exceeded. Stored
+    objects may define ``close()`` (called on eviction or explicit close) and
+    ``resident_bytes()`` (used for the memory metric). An object with an
+    async ``aclose()`` is closed by a task on the running event loop
+    instead, so it can first wait for work in flight on it; ``wait_closed``
+    waits for those tasks.
+    """
+
+    def __init__(self,
+                 idle_ttl: float = SESSION_IDLE_TTL,
+                 max_entries: int = SESSION_MAX_ENTRIES,
+                 sweep_interval: float = SESSION_SWEEP_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._clock = clock
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self._last_sweep = clock()
+        self.evictions = {"idle": 0, "lru": 0}
+        self.closed = 0
+        self.created = 0
+        self._closing: Set[asyncio.Task] = set()
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def values(self) -> List[Any]:
+        """Snapshot of the live sessions"""
+        with self._lock:
+            return list(self._entries.values())
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """Return a live session and mark it as recently used"""
+        with self._lock:
+            self._maybe_sweep()
+            session = self._entries.get(session_id)
+            if session is not None:
+                self._touch(session_id)
+            return session
+
+    def get_or_create(self, session_id: str, factory: Callable[[], Any]) -> Any:
+        """Return the session for ``session_id``, creating it with ``factory``"""
+        with self._lock:
+            self._maybe_sweep()
+            session = self._entries.get(session_id)
+            if session is None:
+                session = factory()
+                self._entries[session_id] = session
+                self.created += 1
+                self._enforce_capacity()
+            self._touch(session_id)
+            return session
+
+    def close(self, session_id: str) -> bool:
+        """Remove a session explicitly (e.g. when the interview ends)"""
+        with self._lock:
+            session = self._pop(session_id)
+        if session is None:
+            return False
+        self.closed += 1
+        self._close_session(session_id, session)
+        return True
+
+    def sweep(self) -> int:
+        """Evict every session idle for longer than ``idle_ttl``"""
+        now = self._clock()
+        expired = []
+        with self._lock:
+            self._last_sweep = now
+            for session_id in list(self._entries):
+                if now - self._last_seen[session_id] <= self.idle_ttl:
+                    # Entries are in access order, so the rest are fresher
+                    break
+                expired.append((session_id, self._pop(session_id)))
+            self.evictions["idle"] += len(expired)
+        for session_id, session in expired:
+            logger.info(f"Evicting idle voice session {session_id}")
+            self._close_session(session_id, session)
+        return len(expired)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            sessions = list(self._entries.values())
+            metrics = {
+                "live_sessions": len(sessions),
+                "max_entries": self.max_entries,
+                "idle_ttl_seconds": self.idle_ttl,
+                "created": self.created,
+                "closed": self.closed,
+                "evictions": dict(self.evictions),
+            }
+        metrics["resident_bytes"] = sum(
+            session.resident_bytes() for session in sessions if hasattr(session, "resident_bytes")
+        )
+        return metrics
+
+    def _touch(self, session_id: str):
+        self._entries.move_to_end(session_id)
+        self._last_seen[session_id] = self._clock()
+
+    def _pop(self, session_id: str) -> Optional[Any]:
+        self._last_seen.pop(session_id, None)
+        return self._entries.pop(session_id, None)
+
+    def _maybe_sweep(self):
+        if self._clock() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def _enforce_capacity(self):
+        while len(self._entries) > self.max_entries:
+            session_id, session = self._entries.popitem(last=False)
+            self._last_seen.pop(session_id, None)
+            self.evictions["lru"] += 1
+            logger.info(f"Evicting least recently used voice session {session_id}")
+            self._close_session(session_id, session)
+
+    async def wait_closed(self):
+        """Wait for sessions being closed in the background to finish closing"""
+        while self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    async def _aclose_session(self, session_id: str, session: Any):
+        try:
+            await session.aclose()
+        except Exception as e:
+            logger.error(f"Error closing session {session_id}: {e}")
+
+    def _close_session(self, session_id: str, session: Any):
+        aclose = getattr(session, "aclose", None)
+        if aclose is not None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                task = loop.create_task(self._aclose_session(session_id, session))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+                return
+        close = getattr(session, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Error closing session {session_id}: {e}")
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from config import BACKEND_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# "memory" (default, one process) or "sqlite:///path/to/state.db" (shared by all workers on a host)
+SESSION_STATE_BACKEND = os.getenv("SESSION_STATE_BACKEND", "memory")
+# "" (in-process), "local://" (in-process stand-in broker), "sqlite:///path" or "redis://..."
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
+SHARED_STATE_TTL = float(os.getenv("SHARED_STATE_TTL", os.getenv("SESSION_IDLE_TTL", "1800")))
+DEFAULT_SHARED_DB_PATH = str(BACKEND_DIR / "voice_shared_state.db")
+
+
+def _sqlite_path(url: str) -> str:
+    path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else ""
+    return path or DEFAULT_SHARED_DB_PATH
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SessionStateBackend:
+    """Where live-session checkpoints live between requests and workers.
+
+    State is a JSON-serialisable dict produced by
+    ``InterviewSession.export_state``. ``shared`` tells callers whether other
+    processes can see what is saved; if not, checkpointing is skipped.
+    """
+
+    name = "base"
+    shared = False
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def version(self, session_id: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def save(self, session_id: str, state: Dict[str, Any]) -> bool:
+        """Store ``state`` unless a checkpoint with the same or a newer version is already there"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        raise NotImplementedError
+
+
+class InProcessStateBackend(SessionStateBackend):
+    """Dict-backed backend; state is only visible inside this worker"""
+
+    name = "memory"
+    shared = False
+
+    def __init__(self):
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._states.get(session_id)
+
+    def version(self, session_id: str) -> Optional[int]:
+        state = self.load(session_id)
+        return state.get("version") if state else None
+
+    def save(self, session_id: str, state: Dict[str, Any]) -> bool:
+        with self._lock:
+            current = self._states.get(session_id)
+            if current is not None and current.get("version", 0) >= state.get("version", 0):
+                return False
+            self._states[session_id] = state
+            return True
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+
+class SQLiteStateBackend(SessionStateBackend):
+    """Session checkpoints in a WAL-mode SQLite file shared by every worker on the host.
+
+    Rows not updated for ``ttl`` seconds are pruned during saves, so
+    abandoned interviews do not accumulate.
+    """
+
+    name = "sqlite"
+    shared = True
+    PRUNE_EVERY = 200  # saves
+
+    def __init__(self, path: str = DEFAULT_SHARED_DB_PATH, ttl: float = SHARED_STATE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._saves = 0
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS voice_session_state (
+                session_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                state TEXT NOT NULL
+            )
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (event loop thread and executor threads)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT state FROM voice_session_state WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def version(self, session_id: str) -> Optional[int]:
+        row = self._conn().execute(
+            "SELECT version FROM voice_session_state WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, state: Dict[str, Any]) -> bool:
+        now = time.time()
+        conn = self._conn()
+        # Compare-and-swap: a worker holding a stale copy cannot overwrite a newer checkpoint
+        cursor = conn.execute(
+            """
+            INSERT INTO voice_session_state (session_id, version, updated_at, state) VALUES (?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                version = excluded.version, updated_at = excluded.updated_at, state = excluded.state
+            WHERE excluded.version > voice_session_state.version
+            """,
+            (session_id, int(state.get("version", 0)), now, json.dumps(state, separators=(",", ":")))
+        )
+        self._saves += 1
+        if self._saves % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM voice_session_state WHERE updated_at < ?", (now - self.ttl,))
+        return cursor.rowcount > 0
+
+    def delete(self, session_id: str):
+        self._conn().execute("DELETE FROM voice_session_state WHERE session_id = ?", (session_id,))
+
+
+def create_state_backend(url: str = SESSION_STATE_BACKEND) -> SessionStateBackend:
+    """Build the session-state backend named by SESSION_STATE_BACKEND"""
+    if not url or url == "memory":
+        return InProcessStateBackend()
+    if url.startswith("sqlite:"):
+        return SQLiteStateBackend(_sqlite_path(url))
+    raise ValueError(f"Unsupported SESSION_STATE_BACKEND: {url}")
+
+
+class LocalPubSubManager(AsyncPubSubManager):
+    """In-process stand-in for a networked Socket.IO message queue.
+
+    Every manager on the same channel in this process shares one broker, so
+    several AsyncServer instances can exercise the pub/sub code path (e.g. in
+    tests) without Redis.
+    """
+
+    name = "localpubsub"
+    _brokers: Dict[str, List[asyncio.Queue]] = {}
+
+    def __init__(self, url: str = "local://", channel: str = "socketio", write_only: bool = False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._brokers.setdefault(channel, []).append(self._queue)
+
+    async def _publish(self, data):
+        message = self.json.dumps(data)
+        for queue in self._brokers.get(self.channel, []):
+            queue.put_nowait(message)
+
+    async def _listen(self):
+        while True:
+            yield await self._queue.get()
+
+
+class SQLitePubSubManager(AsyncPubSubManager):
+    """Socket.IO message queue over a shared SQLite file for workers on one host.
+
+    Emits are appended to a table and every worker polls for rows newer
+    than the last one it saw. Rows older than ``retention`` seconds are
+    deleted as the table is polled.
+    """
+
+    name = "sqlitepubsub"
+
+    def __init__(self, url: str = "sqlite:///", channel: str = "socketio", write_only: bool = False,
+                 logger=None, poll_interval: float = 0.02, retention: float = 60.0):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = _sqlite_path(url)
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._conn = _connect(self.path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS socketio_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+        """)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def _publish(self, data):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO socketio_messages (channel, created_at, payload) VALUES (?, ?, ?)",
+            (self.channel, time.time(), self.json.dumps(data))
+        )
+
+    async def _listen(self):
+        rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(id), 0) FROM socketio_messages")
+        last_id = rows[0][0]
+        last_prune = time.monotonic()
+        while True:
+            rows = await asyncio.to_thread(
+                self._execute,
+                "SELECT id, payload FROM socketio_messages WHERE id > ? AND channel = ? ORDER BY id",
+                (last_id, self.channel)
+            )
+            for message_id, payload in rows:
+                last_id = message_id
+                yield payload
+            if time.monotonic() - last_prune > self.retention:
+                last_prune = time.monotonic()
+                await asyncio.to_thread(
+                    self._execute, "DELETE FROM socketio_messages WHERE created_at < ?",
+                    (time.time() - self.retention,)
+                )
+            if not rows:
+                await asyncio.sleep(self.poll_interval)
+
+
+def create_socketio_manager(url: str = SOCKETIO_MESSAGE_QUEUE) -> Optional[socketio.AsyncManager]:
+    """Client manager for the Socket.IO server; None keeps the default in-process manager"""
+    if not url:
+        return None
+    if url.startswith("local:"):
+        return LocalPubSubManager(url)
+    if url.startswith("sqlite:"):
+        return SQLitePubSubManager(url)
+    if url.startswith(("redis://", "rediss://")):
+        return socketio.AsyncRedisManager(url)
+    raise ValueError(f"Unsupported SOCKETIO_MESSAGE_QUEUE: {url}")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming audio decoder and container detection
+"""
+
+import asyncio
+import shutil
+import struct
+import subprocess
+import sys
+import time
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+
+import audio_decoder
+from audio_decoder import FFMPEG_BINARY, StreamingDecoder, detect_container, ffmpeg_available, parse_wav
+from asr_engines import FakeASREngine
+from voice_processor import VoiceProcessor
+
+# Stands in for ffmpeg: copies stdin to stdout unbuffered, so the pipe plumbing can be tested anywhere
+PASSTHROUGH_COMMAND = [
+    sys.executable, "-c",
+    "import os\nwhile True:\n    b = os.read(0, 4096)\n    if not b: break\n    os.write(1, b)",
+]
+
+
+def _wav(pcm: bytes, sample_rate: int = 16000, channels: int = 1) -> bytes:
+    header = struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, channels,
+                         sample_rate, sample_rate * channels * 2, channels * 2, 16, b"data", len(pcm))
+    return header + pcm
+
+
+def test_detect_and_parse_wav():
+    """Containers are recognised by their leading bytes; WAV payloads are sliced without copying"""
+    pcm = np.arange(800, dtype=np.int16).tobytes()
+    assert detect_container(_wav(pcm)) == "wav"
+    assert detect_container(b"\x1a\x45\xdf\xa3" + b"\x00" * 20) == "webm"
+    assert detect_container(b"OggS" + b"\x00" * 20) == "ogg"
+    assert detect_container(pcm) is None
+    sample_rate, channels, width, view = parse_wav(_wav(pcm))
+    assert (sample_rate, channels, width) == (16000, 1, 2)
+    assert isinstance(view, memoryview) and bytes(view) == pcm
+
+
+def test_one_decoder_process_per_stream():
+    """Every chunk of a stream goes through the same long-lived process"""
+    decoder = StreamingDecoder("webm", command=PASSTHROUGH_COMMAND)
+    pid = decoder._process.pid
+    out = bytearray()
+    chunks = [b"\x1a\x45\xdf\xa3" + b"\x01" * 1000] + [bytes([i]) * 999 for i in range(2, 6)]
+    for chunk in chunks:
+        out += decoder.feed(chunk, wait=0.5)
+        assert decoder._process.pid == pid and decoder.alive
+    out += decoder.finish()
+    print(f"   Fed {decoder.bytes_in} bytes, got {len(out)} back through pid {pid}")
+    assert bytes(out) == b"".join(chunks)[:len(out)]
+    assert len(out) % 2 == 0 and len(b"".join(chunks)) - len(out) < 2
+    assert not decoder.alive
+
+
+def test_close_does_not_wait_for_the_process():
+    """close() only signals the decoder; its reader thread reaps the process off the event loop"""
+    decoder = StreamingDecoder("webm", command=PASSTHROUGH_COMMAND)
+    decoder.feed(b"\x1a\x45\xdf\xa3" + b"\x01" * 100, wait=0.5)
+    started = time.perf_counter()
+    decoder.close()
+    elapsed = time.perf_counter() - started
+    decoder._reader.join(2.0)
+    print(f"   close() returned in {elapsed * 1000:.1f} ms, exit code {decoder._process.returncode}")
+    assert elapsed < 0.05
+    assert not decoder._reader.is_alive()
+    assert decoder._process.returncode is not None
+
+
+@pytest.mark.skipif(shutil.which(FFMPEG_BINARY) is None, reason="ffmpeg not found")
+def test_voice_processor_streams_webm():
+    """A WebM recording fed in pieces reaches the VAD as PCM (needs ffmpeg)"""
+    webm = subprocess.run(
+        [FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "sine=frequency=300:duration=2",
+         "-ac", "1", "-c:a", "libopus", "-f", "webm", "pipe:1"],
+        check=True, capture_output=True
+    ).stdout
+    processor = VoiceProcessor(engine=FakeASREngine(latency=0.0))
+    decoded = 0
+
+    async def run():
+        nonlocal decoded
+        step = 4000
+        for i in range(0, len(webm), step):
+            await processor.process_audio_chunk(webm[i:i + step], final=i + step >= len(webm))
+            decoded += processor.last_chunk_stats["bytes_in"]
+
+    asyncio.run(run())
+    print(f"   Decoded {decoded} PCM bytes from {len(webm)} WebM bytes")
+    assert abs(decoded - 2 * 16000 * 2) < 16000 * 2 * 0.1
+    assert processor.decoder is None
+
+
+def test_undecodable_stream_is_dropped_until_next_header():
+    """Without a working decoder a WebM stream reports one error and its pieces never reach the VAD as PCM"""
+    original = audio_decoder.FFMPEG_BINARY
+    audio_decoder.FFMPEG_BINARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "no-such-ffmpeg")
+    try:
+        assert not ffmpeg_available()
+        processor = VoiceProcessor(engine=FakeASREngine(latency=0.0))
+        noise = np.random.default_rng(0).integers(-20000, 20000, 16000, dtype=np.int16).tobytes()
+        webm_header = b"\x1a\x45\xdf\xa3" + noise[:3996]
+
+        async def run():
+            await processor.process_audio_chunk(webm_header)
+            first_error = processor.last_error
+            errors, features = [], []
+            for i, final in ((1, False), (2, False), (3, True)):
+                await processor.process_audio_chunk(noise[i * 4000:(i + 1) * 4000], final=final)
+                errors.append(processor.last_error)
+                features.append(processor.last_features)
+            # The next recording sends raw PCM, which is analysed again
+            await processor.process_audio_chunk(noise[:3200])
+            return first_error, errors, features
+
+        first_error, errors, features = asyncio.run(run())
+        print(f"   First chunk: {first_error}")
+        assert first_error and "no-such-ffmpeg" in first_error
+        assert errors == [None, None, None]
+        assert features == [None, None, None]
+        assert processor.dropped_stream_chunks == 3
+        assert processor.asr_calls == 0
+        assert not processor.stream_failed and processor.stream_container is None
+        assert processor.last_features is not None
+    finally:
+        audio_decoder.FFMPEG_BINARY = original
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streaming audio decoder...")
+    test_detect_and_parse_wav()
+    test_one_decoder_process_per_stream()
+    test_close_does_not_wait_for_the_process()
+    if shutil.which(FFMPEG_BINARY) is not None:
+        test_voice_processor_streams_webm()
+    test_undecodable_stream_is_dropped_until_next_header()
+    print("🎉 Streaming audio decoder tests completed!")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming resampler / downmix stage
+"""
+
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from audio_resample import StreamingResampler
+from asr_engines import FakeASREngine
+from voice_processor import VoiceProcessor
+
+
+def _stereo_tone(rate: int, seconds: float, frequency: float = 440.0) -> bytes:
+    t = np.arange(int(rate * seconds)) / rate
+    tone = (8000 * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+    return np.stack([tone, tone], axis=1).tobytes()
+
+
+def test_chunking_does_not_change_output():
+    """Random chunk boundaries (even mid-sample) give the same output as one big chunk"""
+    audio = _stereo_tone(44100, 1.0)
+    whole = StreamingResampler(44100, channels=2)
+    expected = bytes(whole.process(audio)) + bytes(whole.flush())
+
+    streaming = StreamingResampler(44100, channels=2)
+    rng = np.random.default_rng(7)
+    parts, offset = [], 0
+    while offset < len(audio):
+        size = int(rng.integers(1, 6000))
+        parts.append(bytes(streaming.process(audio[offset:offset + size])))
+        offset += size
+    parts.append(bytes(streaming.flush()))
+    print(f"   {len(parts)} chunks -> {len(expected) // 2} samples")
+    assert b"".join(parts) == expected
+    assert abs(len(expected) // 2 - 16000) < 64
+
+
+def test_tone_survives_conversion():
+    """A 440 Hz stereo tone at 48 kHz comes out as a 440 Hz mono tone at 16 kHz"""
+    resampler = StreamingResampler(48000, channels=2)
+    out = np.frombuffer(bytes(resampler.process(_stereo_tone(48000, 1.0))), dtype=np.int16).astype(np.float64)
+    spectrum = np.abs(np.fft.rfft(out * np.hanning(len(out))))
+    peak_hz = np.argmax(spectrum) * 16000 / len(out)
+    print(f"   Peak at {peak_hz:.1f} Hz, amplitude {np.abs(out[500:-500]).max():.0f}")
+    assert abs(peak_hz - 440) < 2
+    assert 7500 < np.abs(out[500:-500]).max() < 8500
+
+
+def test_voice_processor_accepts_48k_stereo():
+    """Declared 48 kHz stereo PCM reaches the VAD as 16 kHz mono; 16 kHz mono is untouched"""
+    processor = VoiceProcessor(engine=FakeASREngine(latency=0.0))
+    audio = _stereo_tone(48000, 0.48)
+
+    async def run():
+        await processor.process_audio_chunk(audio, sample_rate=48000, channels=2)
+        converted = processor.last_chunk_stats["bytes_in"]
+        resampler = processor.resampler
+        await processor.process_audio_chunk(audio[:9600], sample_rate=48000, channels=2)
+        return converted, resampler
+
+    converted, resampler = asyncio.run(run())
+    print(f"   {len(audio)} bytes in -> {converted} bytes to the VAD")
+    assert abs(converted - len(audio) // 6) <= 64
+    assert processor.resampler is resampler  # filter state kept across chunks
+    assert StreamingResampler(16000).passthrough
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streaming resampler...")
+    test_chunking_does_not_change_output()
+    test_tone_survives_conversion()
+    test_voice_processor_accepts_48k_stereo()
+    print("🎉 Streaming resampler tests completed!")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming, content-addressed response audio storage
+"""
+
+import asyncio
+import functools
+import hashlib
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from audio_storage import AudioUploadTooLarge, capped_chunks, find_stored_audio, store_audio_stream, extension_for
+
+
+async def _chunks(data: bytes, size: int = 1000):
+    for start in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[start:start + size]
+
+
+def test_stream_is_stored_by_content_hash():
+    """Chunks land at the SHA-256 path; a repeat upload is deduplicated"""
+    root = Path(tempfile.mkdtemp())
+    audio = os.urandom(10_000)
+
+    async def run():
+        first = await store_audio_stream(_chunks(audio), extension="webm", root=root)
+        second = await store_audio_stream(_chunks(audio, 4096), extension="webm", root=root)
+        found = await find_stored_audio(first["sha256"], root=root)
+        return first, second, found
+
+    first, second, found = asyncio.run(run())
+    print(f"   Stored {first['size']} bytes at {first['path']}")
+    assert first["sha256"] == hashlib.sha256(audio).hexdigest()
+    assert Path(first["path"]).read_bytes() == audio
+    assert not first["deduplicated"] and second["deduplicated"]
+    assert found == Path(first["path"])
+    assert os.listdir(root / "incoming") == []
+
+
+def test_size_cap_aborts_and_cleans_up():
+    """Going over the cap raises and leaves no partial file behind"""
+    root = Path(tempfile.mkdtemp())
+
+    async def run():
+        try:
+            await store_audio_stream(_chunks(b"\x00" * 5000), max_bytes=3000, root=root)
+        except AudioUploadTooLarge:
+            return True
+        return False
+
+    assert asyncio.run(run())
+    assert os.listdir(root / "incoming") == []
+    assert not (root / "objects").exists()
+    assert extension_for("audio/webm;codecs=opus") == "webm"
+
+
+def test_oversized_multipart_upload_is_rejected():
+    """Multipart uploads over the cap get 413, with or without a Content-Length"""
+    from fastapi.testclient import TestClient
+    import main
+
+    root = Path(tempfile.mkdtemp())
+    parsed = []
+
+    async def counting_capped_chunks(chunks, max_bytes):
+        async for chunk in capped_chunks(chunks, max_bytes):
+            parsed.append(len(chunk))
+            yield chunk
+
+    original = main.AUDIO_UPLOAD_MAX_BYTES, main.store_audio_stream, main.capped_chunks
+    main.AUDIO_UPLOAD_MAX_BYTES = 4096
+    main.store_audio_stream = functools.partial(store_audio_stream, max_bytes=4096, root=root)
+    main.capped_chunks = counting_capped_chunks
+    try:
+        client = TestClient(main.app)
+        url = "/api/interview/response/audio"
+        small = client.post(url, files={"audio": ("a.webm", b"\x01" * 1000, "audio/webm")})
+        print(f"   Small upload: {small.status_code} {small.json()}")
+        assert small.status_code == 200 and small.json()["size"] == 1000
+
+        large = client.post(url, files={"audio": ("a.webm", b"\x01" * 10_000, "audio/webm")})
+        print(f"   Oversized upload with Content-Length: {large.status_code}")
+        assert large.status_code == 413
+
+        # Chunked body, no Content-Length: the parser itself must stop reading
+        boundary = "voiceiqboundary"
+        head = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"a.webm\"\r\n"
+                f"Content-Type: audio/webm\r\n\r\n").encode()
+        def body():
+            yield head
+            for _ in range(1000):
+                yield b"\x01" * 1024
+            yield f"\r\n--{boundary}--\r\n".encode()
+
+        parsed.clear()
+        chunked = client.post(url, content=body(),
+                              headers={"content-type": f"multipart/form-data; boundary={boundary}"})
+        print(f"   Oversized chunked upload: {chunked.status_code} after parsing {sum(parsed)} bytes")
+        assert chunked.status_code == 413
+        assert sum(parsed) <= 4096 + main.AUDIO_MULTIPART_OVERHEAD_BYTES
+        assert len(os.listdir(root / "incoming")) == 0
+    finally:
+        main.AUDIO_UPLOAD_MAX_BYTES, main.store_audio_stream, main.capped_chunks = original
+
+
+if __name__ == "__main__":
+    print("🧪 Testing response audio storage...")
+    test_stream_is_stored_by_content_hash()
+    test_size_cap_aborts_and_cleans_up()
+    test_oversized_multipart_upload_is_rejected()
+    print("🎉 Response audio storage tests completed!")
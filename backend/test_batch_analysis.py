@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for concurrent, streaming batch analysis
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from batch_analysis import clamp_batch_options, encode_stream_record, iter_batch_analysis, stream_format
+
+
+def _sessions(delays):
+    return [{"session_id": f"s{i}", "delay": delay} for i, delay in enumerate(delays)]
+
+
+def test_bounded_concurrency_streams_in_completion_order():
+    """Results arrive as they finish, never more than ``concurrency`` run at once"""
+    running, peak = 0, 0
+
+    async def analyze(session):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(session["delay"])
+        running -= 1
+        if session["session_id"] == "s3":
+            raise ValueError("bad transcript")
+        return {"overall_score": 7}
+
+    async def run():
+        started = time.perf_counter()
+        records = [record async for record in iter_batch_analysis(
+            _sessions([0.2, 0.05, 0.05, 0.05, 0.5]), analyze, concurrency=3, item_timeout=0.3)]
+        return records, time.perf_counter() - started
+
+    records, elapsed = asyncio.run(run())
+    results, summary = records[:-1], records[-1]
+    print(f"   Order {[r['session_id'] for r in results]}, peak {peak}, {elapsed:.2f} s")
+    assert peak == 3
+    assert [r["session_id"] for r in results][:2] == ["s1", "s2"]
+    assert summary["type"] == "summary" and summary["total_sessions"] == 5
+    assert summary["successful_analyses"] == 3 and summary["failed_analyses"] == 2 and summary["timed_out"] == 1
+    assert next(r for r in results if r["session_id"] == "s3")["error"] == "bad transcript"
+    assert elapsed < 0.6  # sequential would take 0.85 s
+
+
+def test_closing_the_stream_cancels_outstanding_items():
+    """A client that goes away after the first result cancels the rest"""
+    started, cancelled = [], []
+
+    async def analyze(session):
+        started.append(session["session_id"])
+        try:
+            await asyncio.sleep(session["delay"])
+            return {}
+        except asyncio.CancelledError:
+            cancelled.append(session["session_id"])
+            raise
+
+    async def run():
+        stream = iter_batch_analysis(_sessions([0.01, 5, 5, 5]), analyze, concurrency=2)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    first = asyncio.run(run())
+    assert first["session_id"] == "s0"
+    # s2 took s0's slot before the client left; s3 never started
+    assert started == ["s0", "s1", "s2"]
+    assert sorted(cancelled) == ["s1", "s2"]
+
+
+def test_stream_formats_and_option_clamping():
+    assert stream_format("sse") == "sse"
+    assert stream_format(None, "application/x-ndjson") == "ndjson"
+    assert stream_format(None, "application/json") is None
+    assert encode_stream_record({"type": "summary", "a": 1}, "sse") == 'event: summary\ndata: {"type": "summary", "a": 1}\n\n'
+    assert json.loads(encode_stream_record({"type": "result"}, "ndjson")) == {"type": "result"}
+    assert clamp_batch_options(1000, -5) == {"concurrency": 32, "item_timeout": 0.1}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing batch analysis...")
+    test_bounded_concurrency_streams_in_completion_order()
+    test_closing_the_stream_cancels_outstanding_items()
+    test_stream_formats_and_option_clamping()
+    print("🎉 Batch analysis tests completed!")
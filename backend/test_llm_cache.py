@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM response cache
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openai
+
+import llm_client
+from llm_cache import LLMResponseCache, make_cache_key
+from llm_feedback import LLMFeedbackEngine
+
+
+def test_key_normalization_and_lru():
+    """Whitespace-only prompt differences share a key; LRU, byte cap and TTL evict"""
+    messages = [{"role": "user", "content": "  Rate this answer:\n\n   I used a queue. "}]
+    reindented = [{"role": "user", "content": "Rate this answer: I used a queue."}]
+    assert make_cache_key("gpt-4", messages, {"temperature": 0.7}) == make_cache_key("gpt-4", reindented, {"temperature": 0.7})
+    assert make_cache_key("gpt-4", messages, {"temperature": 0.7}) != make_cache_key("gpt-4", messages, {"temperature": 0.2})
+    assert make_cache_key("gpt-4", messages, {}) != make_cache_key("gpt-3.5-turbo", messages, {})
+
+    cache = LLMResponseCache(ttl=60, max_entries=2, max_bytes=1000)
+
+    async def run():
+        await cache.put("a", "first")
+        await cache.put("b", "second")
+        assert await cache.get("a") == "first"  # "a" is now most recent
+        await cache.put("c", "third")  # evicts "b"
+        assert await cache.get("b") is None
+        await cache.put("big", "x" * 900)  # byte cap evicts the older entries
+        assert await cache.get("a") is None and await cache.get("big")
+        cache.ttl = 0.01
+        await cache.put("short", "lived")
+        await asyncio.sleep(0.02)
+        assert await cache.get("short") is None
+
+    asyncio.run(run())
+    stats = cache.get_stats()
+    print(f"   {stats}")
+    assert stats["evictions"] >= 2 and stats["expirations"] == 1
+    assert stats["hits"] == 2 and stats["misses"] == 3
+
+
+def test_sqlite_tier_survives_restart():
+    """A new cache instance on the same file serves earlier responses"""
+    path = os.path.join(tempfile.mkdtemp(), "llm_cache.db")
+
+    async def run():
+        await LLMResponseCache(path=path).put("key", "stored response", model="gpt-4")
+        reopened = LLMResponseCache(path=path)
+        return await reopened.get("key"), reopened.get_stats()
+
+    value, stats = asyncio.run(run())
+    assert value == "stored response"
+    assert stats["disk_hits"] == 1 and stats["entries"] == 1
+
+
+def test_repeated_prompt_skips_api_call():
+    """The second identical suggest_questions call is served from the cache"""
+    calls = []
+
+    async def fake_acreate(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        message = SimpleNamespace(content='["What is a closure?"]')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    original_acreate, original_cache = openai.ChatCompletion.acreate, llm_client.llm_cache
+    openai.ChatCompletion.acreate = fake_acreate
+    llm_client.llm_cache = LLMResponseCache()
+    try:
+        engine = LLMFeedbackEngine()
+        first = asyncio.run(engine.suggest_questions("Software Engineer"))
+        started = time.perf_counter()
+        second = asyncio.run(engine.suggest_questions("Software Engineer"))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        openai.ChatCompletion.acreate, llm_client.llm_cache = original_acreate, original_cache
+
+    print(f"   Cached call took {elapsed_ms:.2f} ms")
+    assert first == second == ["What is a closure?"]
+    assert len(calls) == 1
+    assert elapsed_ms < 40
+
+
+if __name__ == "__main__":
+    print("🧪 Testing LLM response cache...")
+    test_key_normalization_and_lru()
+    test_sqlite_tier_survives_restart()
+    test_repeated_prompt_skips_api_call()
+    print("🎉 LLM response cache tests completed!")
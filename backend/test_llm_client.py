@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight coalescing of identical LLM calls
+"""
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openai
+
+import llm_client
+from ai_interview_analyzer import AIInterviewAnalyzer, AnalysisType
+
+SESSION = {"session_id": "coalesce-test", "role": "Software Engineer",
+           "responses": [{"question": "Tell me about yourself", "answer": "I build APIs."}]}
+
+
+def _fake_acreate(calls, fail: bool = False):
+    async def acreate(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.05)
+        if fail:
+            raise RuntimeError("rate limited")
+        message = SimpleNamespace(content='{"overall_score": 7, "summary": "Solid"}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    return acreate
+
+
+def _run_with(acreate, coroutine_factory):
+    original_acreate, original_cache = openai.ChatCompletion.acreate, llm_client.llm_cache
+    openai.ChatCompletion.acreate = acreate
+    llm_client.llm_cache = None  # isolate coalescing from caching
+    try:
+        return asyncio.run(coroutine_factory())
+    finally:
+        openai.ChatCompletion.acreate, llm_client.llm_cache = original_acreate, original_cache
+
+
+def test_concurrent_identical_analyses_share_one_call():
+    """Five tabs asking for the same session analysis make one API call"""
+    calls = []
+    analyzer = AIInterviewAnalyzer()
+    before = dict(llm_client.call_stats)
+
+    async def run():
+        return await asyncio.gather(*(
+            analyzer.analyze_interview_session(SESSION, AnalysisType.POST_INTERVIEW) for _ in range(5)
+        ))
+
+    results = _run_with(_fake_acreate(calls), run)
+    saved = llm_client.call_stats["coalesced"] - before["coalesced"]
+    print(f"   {len(calls)} API call(s), {saved} coalesced")
+    assert len(calls) == 1 and saved == 4
+    assert all(result["overall_score"] == 7 for result in results)
+    assert llm_client.get_call_stats()["in_flight"] == 0
+
+
+def test_errors_are_shared_and_cancellation_is_isolated():
+    """Waiters all see the leader's error; a cancelled waiter does not cancel the call"""
+    calls = []
+    messages = [{"role": "user", "content": "Score this"}]
+
+    async def run_failure():
+        return await asyncio.gather(
+            *(llm_client.chat_completion("gpt-4", messages, temperature=0.7) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    errors = _run_with(_fake_acreate(calls, fail=True), run_failure)
+    assert len(calls) == 1
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+    calls.clear()
+
+    async def run_cancelled_leader():
+        leader = asyncio.ensure_future(llm_client.chat_completion("gpt-4", messages, temperature=0.7))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(llm_client.chat_completion("gpt-4", messages, temperature=0.7))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert "Solid" in _run_with(_fake_acreate(calls), run_cancelled_leader)
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing LLM call coalescing...")
+    test_concurrent_identical_analyses_share_one_call()
+    test_errors_are_shared_and_cancellation_is_isolated()
+    print("🎉 LLM call coalescing tests completed!")
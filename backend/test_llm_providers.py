@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test script for LLM providers and the deterministic fake
+"""
+
+import asyncio
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import llm_client
+from ai_interview_analyzer import AIInterviewAnalyzer, AnalysisType
+from llm_feedback import LLMFeedbackEngine
+from llm_providers import FakeLLMProvider, create_llm_provider
+
+SESSION = {
+    "session_id": "fake-provider-test",
+    "role": "Backend Engineer",
+    "responses": [{"question": "Describe a hard bug", "answer": "A race in our cache; I added a lock and a test."}],
+    "current_response": {"question": "Why this team?", "answer": "I like infrastructure work."},
+}
+
+
+def _without_cache(coroutine_factory):
+    original = llm_client.llm_cache
+    llm_client.llm_cache = None
+    try:
+        return asyncio.run(coroutine_factory())
+    finally:
+        llm_client.llm_cache = original
+
+
+def test_fake_answers_every_prompt_type_with_schema_valid_json():
+    """Both engines get parseable, populated results for every prompt they send"""
+    provider = FakeLLMProvider(latency=0, token_rate=0)
+    analyzer = AIInterviewAnalyzer(provider=provider)
+    engine = LLMFeedbackEngine(provider=provider)
+
+    async def run():
+        analyses = {analysis_type: await analyzer.analyze_interview_session(SESSION, analysis_type)
+                    for analysis_type in AnalysisType}
+        response = await engine.analyze_interview_response("Describe a hard bug", "A race in our cache.", "Backend Engineer")
+        comprehensive = await engine.generate_comprehensive_feedback(SESSION, "Backend Engineer")
+        ei = await engine.analyze_emotional_intelligence(SESSION["responses"])
+        questions = await engine.suggest_questions("Backend Engineer")
+        return analyses, response, comprehensive, ei, questions
+
+    analyses, response, comprehensive, ei, questions = _without_cache(run)
+    print(f"   Prompt types seen: {provider.prompt_types}")
+    assert all(analysis["success"] for analysis in analyses.values())
+    assert 5 <= analyses[AnalysisType.POST_INTERVIEW]["overall_score"] <= 9
+    assert 5 <= analyses[AnalysisType.REAL_TIME]["current_response_score"] <= 9
+    assert "System Design Primer" in analyses[AnalysisType.SKILL_ASSESSMENT]["resource_recommendations"]
+    assert analyses[AnalysisType.CAREER_DEVELOPMENT]["role_transitions"] == ["Tech Lead", "Staff Engineer"]
+    assert 5 <= response["score"] <= 9 and len(response["strengths"]) == 2
+    assert 5 <= comprehensive["overall_score"] <= 9 and len(comprehensive["development_plan"]) == 3
+    assert 5 <= ei["ei_score"] <= 9
+    assert len(questions) == 5 and all(question.endswith("?") for question in questions)
+    assert set(provider.prompt_types) == {"comprehensive", "real_time", "skill_gap", "career",
+                                          "response_analysis", "emotional_intelligence", "questions"}
+
+
+def test_fake_is_deterministic_and_paced():
+    """Same prompt, same text; time to first token and total time follow latency and token rate"""
+    provider = create_llm_provider("fake", latency=0.1, token_rate=400)
+    messages = [{"role": "user", "content": "Analyze this complete interview session for a Data Engineer position"}]
+
+    async def run():
+        started = time.perf_counter()
+        first_token_at, pieces = None, []
+        async for piece in provider.stream("gpt-4", messages):
+            if first_token_at is None:
+                first_token_at = time.perf_counter() - started
+            pieces.append(piece)
+        streamed_in = time.perf_counter() - started
+        completed = await provider.complete("gpt-4", messages)
+        return first_token_at, streamed_in, "".join(pieces), completed
+
+    first_token_at, streamed_in, streamed, completed = asyncio.run(run())
+    expected = 0.1 + len(completed) / 4 / 400
+    print(f"   First token {first_token_at:.3f} s, stream {streamed_in:.3f} s (expected ~{expected:.3f} s)")
+    assert streamed == completed
+    assert 0.1 <= first_token_at < 0.15
+    assert expected * 0.8 < streamed_in < expected * 1.5
+    assert provider.get_stats()["calls"] == 2
+
+
+def test_unknown_provider_does_not_fall_back_to_openai():
+    """A mistyped LLM_PROVIDER raises instead of silently using the paid API"""
+    import llm_providers
+    original = llm_providers.LLM_PROVIDER, llm_providers._provider
+    llm_providers.LLM_PROVIDER, llm_providers._provider = "opneai", None
+    try:
+        llm_providers.get_llm_provider()
+    except ValueError as e:
+        print(f"   {e}")
+    else:
+        raise AssertionError("Expected ValueError for an unknown LLM provider")
+    finally:
+        llm_providers.LLM_PROVIDER, llm_providers._provider = original
+
+
+if __name__ == "__main__":
+    print("🧪 Testing LLM providers...")
+    test_fake_answers_every_prompt_type_with_schema_valid_json()
+    test_fake_is_deterministic_and_paced()
+    test_unknown_provider_does_not_fall_back_to_openai()
+    print("🎉 LLM provider tests completed!")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for latency-tiered LLM routing
+"""
+
+import asyncio
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import llm_client
+import llm_routing
+from ai_interview_analyzer import AIInterviewAnalyzer, AnalysisType
+from llm_feedback import LLMFeedbackEngine
+from llm_providers import FakeLLMProvider
+from llm_routing import DEFAULT_ROUTE, RouteMetrics, RoutePolicy, load_route_policies
+
+SESSION = {
+    "session_id": "routing-test",
+    "role": "Backend Engineer",
+    "responses": [{"question": "Describe a hard bug", "answer": "A race in our cache."}],
+    "current_response": {"question": "Why this team?", "answer": "I like infrastructure work."},
+}
+
+
+class RecordingProvider(FakeLLMProvider):
+    """Fake provider that remembers the model and params of every call"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    async def _complete(self, model, messages, **params):
+        self.requests.append({"model": model, **params})
+        return await super()._complete(model, messages, **params)
+
+
+def test_each_route_uses_its_own_policy_and_records_slo():
+    """Real-time goes to the fast tier with a small budget; slow calls count as SLO breaches"""
+    provider = RecordingProvider(latency=0.05, token_rate=0)
+    metrics = RouteMetrics({
+        "real_time": RoutePolicy("fast-model", 400, 0.5, 20, "fast"),
+        "post_interview": RoutePolicy("deep-model", 2000, 0.7, 1000),
+    })
+    original_metrics, original_cache = llm_routing.route_metrics, llm_client.llm_cache
+    llm_routing.route_metrics, llm_client.llm_cache = metrics, None
+    analyzer = AIInterviewAnalyzer(provider=provider)
+
+    async def run():
+        await analyzer.analyze_interview_session(SESSION, AnalysisType.REAL_TIME)
+        await analyzer.analyze_interview_session(SESSION, AnalysisType.POST_INTERVIEW)
+        await LLMFeedbackEngine(provider=provider).suggest_questions("Backend Engineer")
+
+    try:
+        asyncio.run(run())
+    finally:
+        llm_routing.route_metrics, llm_client.llm_cache = original_metrics, original_cache
+
+    stats = metrics.get_stats()
+    print(f"   Requests: {provider.requests}")
+    print(f"   real_time: {stats['real_time']['latency_ms']}")
+    assert provider.requests[0] == {"model": "fast-model", "max_tokens": 400, "temperature": 0.5}
+    assert provider.requests[1] == {"model": "deep-model", "max_tokens": 2000, "temperature": 0.7}
+    # A route without a policy falls back to the default one
+    assert provider.requests[2]["max_tokens"] == DEFAULT_ROUTE.max_tokens
+    assert stats["real_time"]["calls"] == 1 and stats["real_time"]["slo_breaches"] == 1
+    assert stats["real_time"]["slo_attainment"] == 0.0
+    assert stats["post_interview"]["slo_breaches"] == 0 and stats["post_interview"]["latency_ms"]["min"] >= 50
+    assert stats["suggest_questions"]["policy"]["model"] == DEFAULT_ROUTE.model
+
+
+def test_defaults_put_critical_path_on_the_fast_tier_and_overrides_apply():
+    policies = load_route_policies(json.dumps({"real_time": {"model": "tiny", "slo_ms": 800, "bogus": 1},
+                                               "custom": {"max_tokens": 50}}))
+    assert {name for name, policy in policies.items() if policy.tier == "fast"} == {"real_time", "analyze_interview_response"}
+    assert policies["real_time"].model == "tiny" and policies["real_time"].slo_ms == 800
+    assert policies["real_time"].max_tokens == 500
+    assert policies["custom"].max_tokens == 50 and policies["custom"].model == DEFAULT_ROUTE.model
+    assert policies["post_interview"].max_tokens > policies["real_time"].max_tokens
+    assert load_route_policies("not json")["real_time"].model == llm_routing.LLM_FAST_MODEL
+
+
+if __name__ == "__main__":
+    print("🧪 Testing LLM routing...")
+    test_each_route_uses_its_own_policy_and_records_slo()
+    test_defaults_put_critical_path_on_the_fast_tier_and_overrides_apply()
+    print("🎉 LLM routing tests completed!")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for streamed LLM feedback
+"""
+
+import asyncio
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openai
+
+import llm_client
+from llm_cache import LLMResponseCache
+from llm_feedback import LLMFeedbackEngine
+from llm_stream import JSONSectionParser
+
+COMPLETION = 'Here is the assessment:\n```json\n' + json.dumps({
+    "overall_score": 8,
+    "summary": "Clear answers, {mostly} \"structured\", a bit short.",
+    "strengths": ["Concise", "Good examples, with numbers"],
+    "development_plan": ["Practice STAR stories"],
+    "interview_readiness": 7,
+}) + '\n```'
+
+
+def _chunks(text: str, size: int = 7):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_sections_parse_incrementally():
+    """Every top-level member comes out as soon as its delimiter arrives"""
+    parser = JSONSectionParser()
+    seen = []
+    for index, chunk in enumerate(_chunks(COMPLETION)):
+        for name, value in parser.feed(chunk):
+            seen.append((name, index))
+    names = [name for name, _ in seen]
+    print(f"   Sections at chunk: {seen}")
+    assert names == ["overall_score", "summary", "strengths", "development_plan", "interview_readiness"]
+    assert seen[0][1] < len(_chunks(COMPLETION)) // 4
+    assert parser.done
+
+
+def test_comprehensive_feedback_streams_then_matches_blocking_result():
+    """Sections arrive before the completion ends; the final result is cached for blocking callers"""
+    calls = []
+
+    async def fake_acreate(stream=False, **kwargs):
+        calls.append(stream)
+
+        async def generate():
+            for chunk in _chunks(COMPLETION):
+                await asyncio.sleep(0)
+                yield {"choices": [{"delta": {"content": chunk}}]}
+        return generate()
+
+    original_acreate, original_cache = openai.ChatCompletion.acreate, llm_client.llm_cache
+    openai.ChatCompletion.acreate = fake_acreate
+    llm_client.llm_cache = LLMResponseCache()
+    engine = LLMFeedbackEngine()
+    session = {"session_id": "stream-test", "responses": [{"question": "Why us?", "answer": "Scale."}]}
+
+    async def run():
+        records = [record async for record in engine.stream_comprehensive_feedback(session, "Software Engineer")]
+        blocking = await engine.generate_comprehensive_feedback(session, "Software Engineer")
+        return records, blocking
+
+    try:
+        records, blocking = asyncio.run(run())
+    finally:
+        openai.ChatCompletion.acreate, llm_client.llm_cache = original_acreate, original_cache
+
+    kinds = [record["type"] for record in records]
+    first_section = kinds.index("section")
+    last_delta = len(kinds) - 1 - kinds[::-1].index("delta")
+    print(f"   {kinds.count('delta')} deltas, first section at record {first_section}")
+    assert first_section < last_delta
+    assert kinds[-1] == "result"
+    assert "".join(r["text"] for r in records if r["type"] == "delta") == COMPLETION
+    feedback = records[-1]["feedback"]
+    assert feedback["overall_score"] == 8 and feedback["strengths"][1] == "Good examples, with numbers"
+    assert calls == [True]  # the blocking call was a cache hit
+    assert {k: v for k, v in blocking.items() if k != "timestamp"} == {k: v for k, v in feedback.items() if k != "timestamp"}
+
+
+if __name__ == "__main__":
+    print("🧪 Testing streamed LLM feedback...")
+    test_sections_parse_incrementally()
+    test_comprehensive_feedback_streams_then_matches_blocking_result()
+    print("🎉 Streamed LLM feedback tests completed!")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled, retrying LLM transport against a local stand-in API
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import openai
+from aiohttp import web
+from openai import error as openai_error
+
+from llm_transport import CircuitBreaker, CircuitOpenError, LLMTransport
+
+
+def _completion(text: str):
+    return {"id": "chatcmpl-test", "object": "chat.completion", "model": "gpt-4",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]}
+
+
+class StandInAPI:
+    """Minimal /v1/chat/completions server; ``script`` lists the status (or "slow") per request"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        self.client_ports = set()
+
+    async def handle(self, request: web.Request):
+        body = await request.json()
+        self.requests.append(body)
+        self.client_ports.add(request.transport.get_extra_info("peername")[1])
+        step = self.script.pop(0) if self.script else 200
+        if step == "slow":
+            await asyncio.sleep(1.0)
+            step = 200
+        if step != 200:
+            headers = {"Retry-After": "0.01"} if step == 429 else {}
+            return web.json_response({"error": {"message": f"status {step}", "type": "server_error"}},
+                                     status=step, headers=headers)
+        if body.get("stream"):
+            response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+            await response.prepare(request)
+            for piece in ["Hel", "lo"]:
+                chunk = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            await response.write(b"data: [DONE]\n\n")
+            return response
+        return web.json_response(_completion("ok"))
+
+
+def _run_against(api: StandInAPI, scenario):
+    async def run():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", api.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        original = openai.api_base, openai.api_key
+        openai.api_base, openai.api_key = f"http://127.0.0.1:{port}/v1", "sk-test"
+        try:
+            return await scenario()
+        finally:
+            openai.api_base, openai.api_key = original
+            await runner.cleanup()
+
+    return asyncio.run(run())
+
+
+MESSAGES = [{"role": "user", "content": "Score this answer"}]
+
+
+def test_retries_transient_errors_over_one_pooled_connection():
+    """503 and 429 are retried with backoff; every attempt reuses the keep-alive connection"""
+    api = StandInAPI([503, 429, 200])
+    transport = LLMTransport(max_retries=3, breaker=CircuitBreaker(failure_threshold=10))
+
+    async def scenario():
+        try:
+            response = await transport.create(model="gpt-4", messages=MESSAGES)
+            streamed = [chunk["choices"][0]["delta"].get("content")
+                        async for chunk in transport.stream(model="gpt-4", messages=MESSAGES)]
+            return response, streamed
+        finally:
+            await transport.close()
+
+    response, streamed = _run_against(api, scenario)
+    print(f"   {len(api.requests)} requests from {len(api.client_ports)} connection(s), stats {transport.get_stats()}")
+    assert response.choices[0].message.content == "ok"
+    assert "".join(piece for piece in streamed if piece) == "Hello"
+    assert transport.stats["retries"] == 2 and len(api.requests) == 4
+    assert len(api.client_ports) == 1
+    assert transport.breaker.state == "closed"
+
+
+def test_deadline_and_non_retryable_errors():
+    """A hung provider costs at most the deadline; a bad request is not retried"""
+    api = StandInAPI(["slow", "slow", "slow", 400])
+    transport = LLMTransport(deadline=0.5, attempt_timeout=0.2, max_retries=5,
+                             breaker=CircuitBreaker(failure_threshold=10))
+
+    async def scenario():
+        started = time.perf_counter()
+        try:
+            try:
+                await transport.create(model="gpt-4", messages=MESSAGES)
+                raise AssertionError("expected a timeout")
+            except (asyncio.TimeoutError, openai_error.Timeout):
+                elapsed = time.perf_counter() - started
+            await asyncio.sleep(1.0)  # let the stand-in finish the abandoned requests
+            api.script = [400]
+            before = len(api.requests)
+            try:
+                await transport.create(model="gpt-4", messages=MESSAGES)
+                raise AssertionError("expected InvalidRequestError")
+            except openai_error.InvalidRequestError:
+                pass
+            return elapsed, len(api.requests) - before
+        finally:
+            await transport.close()
+
+    elapsed, bad_request_attempts = _run_against(api, scenario)
+    print(f"   Timed out after {elapsed:.2f} s")
+    assert elapsed < 0.7
+    assert bad_request_attempts == 1
+
+
+def test_circuit_breaker_fails_fast_then_recovers():
+    """Consecutive failures open the circuit; after the reset window one trial closes it"""
+    api = StandInAPI([500, 500, 500])
+    transport = LLMTransport(max_retries=0, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2))
+
+    async def scenario():
+        try:
+            for _ in range(3):
+                try:
+                    await transport.create(model="gpt-4", messages=MESSAGES)
+                except openai_error.APIError:
+                    pass
+            assert transport.breaker.state == "open"
+            served = len(api.requests)
+            started = time.perf_counter()
+            try:
+                await transport.create(model="gpt-4", messages=MESSAGES)
+                raise AssertionError("expected CircuitOpenError")
+            except CircuitOpenError:
+                rejected_in = time.perf_counter() - started
+            assert len(api.requests) == served
+            await asyncio.sleep(0.25)
+            response = await transport.create(model="gpt-4", messages=MESSAGES)
+            return rejected_in, response
+        finally:
+            await transport.close()
+
+    rejected_in, response = _run_against(api, scenario)
+    print(f"   Rejected in {rejected_in * 1000:.2f} ms, circuit {transport.breaker.get_stats()}")
+    assert rejected_in < 0.01
+    assert response.choices[0].message.content == "ok"
+    assert transport.breaker.state == "closed" and transport.breaker.stats["opened"] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing LLM transport...")
+    test_retries_transient_errors_over_one_pooled_connection()
+    test_deadline_and_non_retryable_errors()
+    test_circuit_breaker_fails_fast_then_recovers()
+    print("🎉 LLM transport tests completed!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the token-budgeted prompt builder
+"""
+
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import llm_routing
+from ai_interview_analyzer import AIInterviewAnalyzer
+from llm_feedback import LLMFeedbackEngine
+from llm_routing import RouteMetrics, RoutePolicy
+from prompt_builder import PromptBuilder, count_tokens
+
+
+def _long_session(answers: int = 40, words: int = 150):
+    return {
+        "session_id": "long-session",
+        "role": "Platform Engineer",
+        "type": "mixed",
+        "responses": [{
+            "index": i,
+            "question": f"Question number {i + 1} about reliability?",
+            "answer": " ".join(f"answer{i}word{w}" for w in range(words)),
+            "timestamp": "2026-01-01T10:00:00Z",
+        } for i in range(answers)],
+        "metadata": {"total_questions": answers, "completed_at": "2026-01-01T11:00:00Z"},
+    }
+
+
+def _with_budgets(budgets, build):
+    metrics = RouteMetrics({route: RoutePolicy("gpt-4", 1000, 0.7, 30000, prompt_tokens=budget)
+                            for route, budget in budgets.items()})
+    original = llm_routing.route_metrics
+    llm_routing.route_metrics = metrics
+    try:
+        return build()
+    finally:
+        llm_routing.route_metrics = original
+
+
+def test_long_session_prompts_fit_their_budget():
+    """Older answers are summarized then dropped; the latest answers stay verbatim"""
+    session = _long_session()
+    full_size = count_tokens(json.dumps(session, indent=2))
+    comprehensive, post_interview = _with_budgets(
+        {"generate_comprehensive_feedback": 3000, "post_interview": 3000},
+        lambda: (LLMFeedbackEngine()._create_enhanced_comprehensive_feedback_prompt(session, "Platform Engineer"),
+                 AIInterviewAnalyzer()._create_post_interview_prompt(session)))
+
+    for prompt in (comprehensive, post_interview):
+        tokens = count_tokens(prompt)
+        print(f"   {full_size} -> {tokens} tokens")
+        assert tokens <= 3000
+        assert session["responses"][-1]["answer"] in prompt  # latest answer kept whole
+        assert "answer0word149" not in prompt  # oldest answer not kept whole
+    assert '"omitted_responses":' in comprehensive and '"answer_summary":' in comprehensive
+    assert "2026-01-01T10:00:00Z" not in comprehensive  # low-value fields dropped
+    assert "omitted to fit the prompt budget" in post_interview and "Answer (summarized):" in post_interview
+
+
+def test_short_sessions_are_untouched_and_huge_answers_are_truncated():
+    builder = PromptBuilder(budget=6000)
+    short = _long_session(answers=2, words=20)
+    assert json.loads(builder.fit_json(short, 5000))["responses"][1]["answer"] == short["responses"][1]["answer"]
+    assert builder.report["summarized"] == builder.report["omitted"] == builder.report["truncated"] == 0
+
+    answer = "word " * 5000
+    prompt = _with_budgets({"analyze_interview_response": 800}, lambda: LLMFeedbackEngine()._create_enhanced_response_analysis_prompt(
+        "Tell me about yourself", answer, "Engineer", {"mode": "mixed", "notes": "x" * 20000}))
+    print(f"   Response analysis prompt: {count_tokens(prompt)} tokens")
+    assert count_tokens(prompt) <= 800
+    assert "Context: {" in prompt and "word word" in prompt and " … " in prompt
+
+
+def test_placeholder_text_in_user_input_is_left_alone():
+    """A question or context mentioning {answer} does not get the answer spliced into it"""
+    answer = "SECRET-ANSWER " * 5
+    prompt = _with_budgets({"analyze_interview_response": 800}, lambda: LLMFeedbackEngine()._create_enhanced_response_analysis_prompt(
+        "What does {answer} mean in {context}?", answer, "Engineer {session_data}", {"note": "see {answer}"}))
+    assert prompt.count("SECRET-ANSWER") == 5
+    assert "What does {answer} mean in {context}?" in prompt and '"note":"see {answer}"' in prompt
+    assert count_tokens(prompt) <= 800
+    session = {"role": "x", "responses": [{"question": "Q {session_data}", "answer": "A {responses}"}]}
+    comprehensive = LLMFeedbackEngine()._create_enhanced_comprehensive_feedback_prompt(session, "Role {session_data}")
+    assert "Role {session_data}" in comprehensive and comprehensive.count('"Q {session_data}"') == 1
+    ei = LLMFeedbackEngine()._create_emotional_intelligence_prompt(session["responses"])
+    assert ei.count('"A {responses}"') == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing prompt builder...")
+    test_long_session_prompts_fit_their_budget()
+    test_short_sessions_are_untouched_and_huge_answers_are_truncated()
+    test_placeholder_text_in_user_input_is_left_alone()
+    print("🎉 Prompt builder tests completed!")
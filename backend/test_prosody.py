@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming prosody metrics
+"""
+
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from asr_engines import FakeASREngine
+from generate_test_audio import synthesize_speech_like
+from prosody import ProsodyTracker
+from voice_processor import InterviewSession, VoiceProcessor
+
+FRAME = 480  # 30 ms at 16 kHz
+
+
+def _voiced(frequency: float, frames: int) -> bytes:
+    t = np.arange(frames * FRAME) / 16000
+    return (6000 * (np.sin(2 * np.pi * frequency * t) + 0.4 * np.sin(4 * np.pi * frequency * t))).astype(np.int16).tobytes()
+
+
+def _feed(tracker: ProsodyTracker, audio: bytes, is_speech: bool):
+    view = memoryview(audio)
+    for start in range(0, len(view), FRAME * 2):
+        tracker.observe(view[start:start + FRAME * 2], is_speech)
+
+
+def test_pauses_ratio_pitch_and_rate():
+    """Pauses, speech ratio, pitch and words per minute from a scripted frame stream"""
+    tracker = ProsodyTracker()
+    silence = bytes(FRAME * 2 * 20)
+    _feed(tracker, silence[:FRAME * 2 * 10], False)  # leading silence is not a pause
+    _feed(tracker, _voiced(120, 50), True)
+    _feed(tracker, silence, False)  # 600 ms pause
+    _feed(tracker, _voiced(180, 50), True)
+    _feed(tracker, silence[:FRAME * 2 * 5], False)  # 150 ms gap: too short to be a pause
+    _feed(tracker, _voiced(150, 20), True)
+    tracker.add_transcript("Um so I think, you know, we shipped it")
+
+    summary = tracker.finish_answer()
+    print(f"   {summary}")
+    assert summary["duration_s"] == 4.35  # 145 frames from first to last speech
+    assert summary["speech_s"] == 3.6
+    assert summary["pauses"]["count"] == 1 and summary["pauses"]["max_ms"] == 600
+    assert summary["words"] == 9 and summary["fillers"] == {"um": 1, "you know": 1}
+    assert abs(summary["words_per_minute"] - 9 / 4.35 * 60) < 0.1
+    assert summary["pitch_hz"]["voiced_ratio"] == 1.0
+    assert 110 < summary["pitch_hz"]["p10"] < 130 and 170 < summary["pitch_hz"]["p90"] < 190
+    assert tracker.frames == 0 and tracker.answers == 1
+
+
+def test_final_chunk_persists_answer_summary():
+    """The chunk that ends an answer returns its prosody and writes one analytics row"""
+    import db_utils
+
+    saved = []
+    original_save = db_utils.save_interview_analytics
+    db_utils.save_interview_analytics = lambda *args: saved.append(args) or len(saved)
+    try:
+        session = InterviewSession("prosody-test", "Software Engineer")
+        session.voice_processor = VoiceProcessor(engine=FakeASREngine(latency=0.0))
+        session.user_email = "candidate@example.com"
+        speech = synthesize_speech_like(duration=4.0, seed=2).tobytes()
+
+        async def run():
+            await session.process_interview_audio(speech, 0.0)
+            return await session.process_interview_audio(bytes(3200), 1.0, final=True, question_index=3)
+
+        result = asyncio.run(run())
+    finally:
+        db_utils.save_interview_analytics = original_save
+
+    prosody = result["prosody"]
+    print(f"   Answer {prosody['question_index']}: {prosody['speech_s']} s speech, pitch p50 {prosody['pitch_hz']['p50']} Hz")
+    assert prosody["question_index"] == 3 and prosody["speech_s"] > 1
+    assert 90 < prosody["pitch_hz"]["p50"] < 230  # synthetic voices sit at 100-220 Hz
+    assert len(saved) == 1
+    session_id, user_email, _, voice_metrics, _ = saved[0]
+    assert (session_id, user_email) == ("prosody-test", "candidate@example.com")
+    assert voice_metrics == {"prosody": prosody}
+    assert session.current_question_index == 4
+    assert session.get_session_summary()["answer_prosody"] == [prosody]
+
+    restored = InterviewSession.from_state(session.export_state())
+    assert restored.answer_prosody == [prosody]
+
+
+if __name__ == "__main__":
+    print("🧪 Testing prosody metrics...")
+    test_pauses_ratio_pitch_and_rate()
+    test_final_chunk_persists_answer_summary()
+    print("🎉 Prosody metrics tests completed!")
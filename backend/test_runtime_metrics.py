@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Test script for runtime metrics and the synthetic load-test audio
+"""
+
+import asyncio
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from generate_test_audio import synthesize_speech_like
+from runtime_metrics import EventLoopLagMonitor, process_memory
+
+
+def test_loop_lag_monitor_sees_blocking_call():
+    """Blocking the loop for 200 ms shows up as lag"""
+    monitor = EventLoopLagMonitor(interval=0.01)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # deliberately block the loop
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(run())
+    stats = monitor.get_stats()
+    print(f"   {stats['count']} probes, max lag {stats['max']:.1f} ms")
+    assert stats["count"] > 0
+    assert stats["max"] >= 150
+    assert not monitor.running
+    assert process_memory()["rss_bytes"] > 0
+
+
+def test_synthetic_speech_is_deterministic():
+    """Same seed gives the same audio, with both speech and pauses in it"""
+    first = synthesize_speech_like(duration=3.0, seed=4)
+    second = synthesize_speech_like(duration=3.0, seed=4)
+    assert first.dtype == np.int16 and len(first) == 48000
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, synthesize_speech_like(duration=3.0, seed=5))
+    frames = np.abs(first[:len(first) // 320 * 320].reshape(-1, 320).astype(np.int32)).mean(axis=1)
+    print(f"   {int((frames > 500).sum())} loud and {int((frames < 50).sum())} quiet 20 ms frames")
+    assert (frames > 500).any() and (frames < 50).any()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing runtime metrics...")
+    test_loop_lag_monitor_sees_blocking_call()
+    test_synthetic_speech_is_deterministic()
+    print("🎉 Runtime metrics tests completed!")
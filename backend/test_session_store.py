@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded live-session store
+"""
+
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from session_store import SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def resident_bytes(self):
+        return 100
+
+
+class FakeLockedSession(FakeSession):
+    """Closes through aclose(), after whatever holds its lock is done"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.lock = asyncio.Lock()
+        self.busy = False
+
+    async def aclose(self):
+        async with self.lock:
+            assert not self.busy, "closed while a chunk was still being processed"
+            self.close()
+
+
+def test_lru_eviction():
+    """Creating past max_entries evicts the least recently used session"""
+    store = SessionStore(idle_ttl=60, max_entries=2, sweep_interval=1000)
+    a = store.get_or_create("a", lambda: FakeSession("a"))
+    store.get_or_create("b", lambda: FakeSession("b"))
+    store.get("a")  # a is now most recently used
+    store.get_or_create("c", lambda: FakeSession("c"))
+
+    print(f"   Metrics: {store.get_metrics()}")
+    assert "b" not in store
+    assert "a" in store and "c" in store
+    assert not a.closed
+    assert store.get_metrics()["evictions"]["lru"] == 1
+
+
+def test_idle_ttl_eviction():
+    """Sessions idle past the TTL are swept and closed"""
+    clock = FakeClock()
+    store = SessionStore(idle_ttl=10, max_entries=10, sweep_interval=1, clock=clock)
+    old = store.get_or_create("old", lambda: FakeSession("old"))
+    clock.now = 8
+    store.get_or_create("fresh", lambda: FakeSession("fresh"))
+    clock.now = 15
+    store.get("fresh")
+
+    assert old.closed
+    assert "old" not in store
+    assert "fresh" in store
+    metrics = store.get_metrics()
+    assert metrics["evictions"]["idle"] == 1
+    assert metrics["live_sessions"] == 1
+    assert metrics["resident_bytes"] == 100
+
+
+def test_explicit_close():
+    """close() removes and closes a session exactly once"""
+    store = SessionStore()
+    session = store.get_or_create("s", lambda: FakeSession("s"))
+    assert store.close("s")
+    assert session.closed
+    assert not store.close("s")
+    assert store.get_metrics()["closed"] == 1
+
+
+def test_eviction_waits_for_in_flight_work():
+    """A session evicted mid-chunk is closed only after the chunk releases the session lock"""
+    async def run():
+        store = SessionStore(idle_ttl=60, max_entries=1, sweep_interval=1000)
+        busy = store.get_or_create("busy", lambda: FakeLockedSession("busy"))
+        processing = asyncio.Event()
+        finish = asyncio.Event()
+
+        async def process_chunk():
+            async with busy.lock:
+                busy.busy = True
+                processing.set()
+                await finish.wait()
+                busy.busy = False
+
+        task = asyncio.create_task(process_chunk())
+        await processing.wait()
+        store.get_or_create("new", lambda: FakeLockedSession("new"))  # evicts "busy"
+        await asyncio.sleep(0.01)
+        closed_while_busy = busy.closed
+        finish.set()
+        await task
+        await store.wait_closed()
+        return store, busy, closed_while_busy
+
+    store, busy, closed_while_busy = asyncio.run(run())
+    print(f"   Closed while busy: {closed_while_busy}, closed after: {busy.closed}")
+    assert not closed_while_busy
+    assert busy.closed
+    assert "busy" not in store
+    assert store.get_metrics()["evictions"]["lru"] == 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing session store...")
+    test_lru_eviction()
+    test_idle_ttl_eviction()
+    test_explicit_close()
+    test_eviction_waits_for_in_flight_work()
+    print("🎉 Session store tests completed!")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared session-state backends and Socket.IO message managers
+"""
+
+import asyncio
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import voice_processor
+from session_store import SessionStore
+from shared_state import SQLiteStateBackend, InProcessStateBackend, LocalPubSubManager, SQLitePubSubManager
+
+
+def _populated_session(session_id: str) -> voice_processor.InterviewSession:
+    session = voice_processor.InterviewSession(session_id, "Backend Engineer")
+    session.transcript.append({"text": "hello from worker one", "timestamp": 1.0})
+    for i in range(50):
+        session.audio_quality_metrics.append({"volume": 1000.0 + i, "snr": 20.0, "clarity": 0.3, "timestamp": float(i)})
+    return session
+
+
+def test_session_moves_between_workers():
+    """A session checkpointed by one worker is picked up by another"""
+    path = os.path.join(tempfile.mkdtemp(), "state.db")
+    original_backend, original_store = voice_processor.session_state, voice_processor.interview_sessions
+    try:
+        voice_processor.set_session_state_backend(SQLiteStateBackend(path))
+        session = _populated_session("shared-1")
+        asyncio.run(session.checkpoint(force=True))
+
+        # A second worker: empty resident store, same SQLite file
+        voice_processor.interview_sessions = SessionStore()
+        voice_processor.set_session_state_backend(SQLiteStateBackend(path))
+        restored = asyncio.run(voice_processor.get_session("shared-1"))
+        print(f"   Restored version {restored.state_version}, {restored.audio_quality_metrics.total} metric points")
+        assert restored is not session
+        assert restored.transcript == session.transcript
+        assert restored.audio_quality_metrics.summary() == session.audio_quality_metrics.summary()
+        assert restored.audio_quality_metrics.to_list() == session.audio_quality_metrics.to_list()
+
+        # A newer checkpoint from the first worker refreshes the resident copy
+        session.transcript.append({"text": "second answer", "timestamp": 2.0})
+        asyncio.run(session.checkpoint(force=True))
+        refreshed = asyncio.run(voice_processor.get_or_create_session("shared-1", "Backend Engineer"))
+        assert refreshed is restored
+        assert len(refreshed.transcript) == 2
+
+        assert asyncio.run(voice_processor.close_session("shared-1"))
+        assert voice_processor.session_state.load("shared-1") is None
+    finally:
+        voice_processor.set_session_state_backend(original_backend)
+        voice_processor.interview_sessions = original_store
+
+
+def test_stale_checkpoint_does_not_overwrite_newer_state():
+    """Saves are compare-and-swap on the version, so a lagging worker cannot clobber a newer checkpoint"""
+    path = os.path.join(tempfile.mkdtemp(), "state.db")
+    for backend in (SQLiteStateBackend(path), InProcessStateBackend()):
+        assert backend.save("cas-1", {"version": 2, "transcript": ["newer"]})
+        assert not backend.save("cas-1", {"version": 1, "transcript": ["stale"]})
+        assert not backend.save("cas-1", {"version": 2, "transcript": ["same version"]})
+        assert backend.load("cas-1")["transcript"] == ["newer"]
+        assert backend.save("cas-1", {"version": 3, "transcript": ["newest"]})
+        assert backend.version("cas-1") == 3
+
+    original_backend = voice_processor.session_state
+    try:
+        backend = voice_processor.set_session_state_backend(SQLiteStateBackend(path))
+        # Worker two has already checkpointed this session, so worker one's first save loses the swap
+        other = _populated_session("cas-2")
+        other.transcript = [{"text": "from worker two", "timestamp": 5.0}]
+        other.state_version = 5
+        backend.save("cas-2", other.export_state())
+
+        session = _populated_session("cas-2")
+        conflicts = voice_processor.session_state_stats["checkpoint_conflicts"]
+        asyncio.run(session.checkpoint(force=True))
+        stored = backend.load("cas-2")
+        print(f"   Merged after conflict: version {stored['version']}, {[e['text'] for e in stored['transcript']]}")
+        assert voice_processor.session_state_stats["checkpoint_conflicts"] == conflicts + 1
+        assert stored["version"] == 6 and session.state_version == 6
+        assert [e["text"] for e in stored["transcript"]] == ["from worker two", "hello from worker one"]
+        assert stored["metrics"]["total"] == 100
+        assert session.audio_quality_metrics.summary()["volume"]["count"] == 100
+
+        # Nothing new since the merge: the next checkpoint does not replay the same entries
+        asyncio.run(session.checkpoint(force=True))
+        assert len(backend.load("cas-2")["transcript"]) == 2
+    finally:
+        voice_processor.set_session_state_backend(original_backend)
+
+
+def test_checkpoint_carries_aggregates_and_recent_points():
+    """A long session's checkpoint stays small; aggregates cover every point, raw points only the newest"""
+    import json
+    session = voice_processor.InterviewSession("size-1", "Backend Engineer")
+    for i in range(5000):
+        session.audio_quality_metrics.append({"volume": float(i % 3000), "snr": 20.0, "clarity": 0.3,
+                                              "timestamp": float(i)})
+    state = session.export_state()
+    size = len(json.dumps(state))
+    print(f"   Checkpoint of {session.audio_quality_metrics.total} points: {size} bytes")
+    assert size < 40_000
+    restored = voice_processor.InterviewSession.from_state(json.loads(json.dumps(state)))
+    assert restored.audio_quality_metrics.summary() == session.audio_quality_metrics.summary()
+    recent = session.audio_quality_metrics.to_list()[-voice_processor.SESSION_CHECKPOINT_METRIC_POINTS:]
+    assert restored.audio_quality_metrics.to_list() == recent
+    assert restored.audio_quality_metrics.to_list(4990) == session.audio_quality_metrics.to_list(4990)
+    restored.audio_quality_metrics.append({"volume": 1.0, "snr": 1.0, "clarity": 0.1, "timestamp": 9999.0})
+    assert restored.audio_quality_metrics.to_list(5000)[0]["timestamp"] == 9999.0
+
+
+def test_in_process_backend_skips_checkpoints():
+    """The default backend is not shared, so nothing is serialised"""
+    backend = InProcessStateBackend()
+    original_backend = voice_processor.session_state
+    try:
+        voice_processor.set_session_state_backend(backend)
+        session = _populated_session("local-1")
+        asyncio.run(session.checkpoint(force=True))
+        assert backend.load("local-1") is None
+        assert session.state_version == 0
+    finally:
+        voice_processor.set_session_state_backend(original_backend)
+
+
+def test_pubsub_managers_deliver_between_servers():
+    """A message published by one manager reaches the other manager's listener"""
+    path = os.path.join(tempfile.mkdtemp(), "queue.db")
+
+    async def roundtrip(publisher, subscriber):
+        listener = subscriber._listen()
+        first = asyncio.ensure_future(listener.__anext__())
+        await asyncio.sleep(0.05)  # let the subscriber note its starting position
+        await publisher._publish({"method": "emit", "event": "voice_result", "host_id": "a"})
+        message = await asyncio.wait_for(first, timeout=2.0)
+        await listener.aclose()
+        return subscriber.json.loads(message)
+
+    for name, make in (("local", lambda: LocalPubSubManager(channel="test-shared-state")),
+                       ("sqlite", lambda: SQLitePubSubManager(f"sqlite:///{path}"))):
+        publisher, subscriber = make(), make()
+        message = asyncio.run(roundtrip(publisher, subscriber))
+        print(f"   {name}: {message}")
+        assert message["event"] == "voice_result"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing shared session state...")
+    test_session_moves_between_workers()
+    test_stale_checkpoint_does_not_overwrite_newer_state()
+    test_checkpoint_carries_aggregates_and_recent_points()
+    test_in_process_backend_skips_checkpoints()
+    test_pubsub_managers_deliver_between_servers()
+    print("🎉 Shared session state tests completed!")
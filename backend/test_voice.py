@@ -65,5 +65,306 @@ async def test_voice_processor():
     except Exception as e:
         print(f"Session processing failed: {e}")
 
+def _synthetic_speech(sample_rate: int = 16000, seconds: float = 1.0) -> np.ndarray:
+    """Amplitude-modulated tone plus noise, loud enough to pass the VAD"""
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    rng = np.random.default_rng(0)
+    signal = 0.4 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t))
+    return signal + 0.05 * rng.standard_normal(len(t))
+
+def test_streaming_vad_segments_utterances():
+    """Silence / speech / silence fed in 100 ms chunks yields one utterance"""
+    from voice_processor import StreamingVAD
+
+    sample_rate = 16000
+    silence = np.zeros(sample_rate)
+    audio = np.concatenate([silence, _synthetic_speech(sample_rate), silence])
+    pcm = (audio * 32767).astype(np.int16).tobytes()
+
+    vad = StreamingVAD(sample_rate=sample_rate)
+    utterances = []
+    for i in range(0, len(pcm), 3200):
+        utterances.extend(vad.process(pcm[i:i + 3200]))
+
+    print(f"Utterances: {[len(u) for u in utterances]}")
+    assert len(utterances) == 1
+    assert not vad.in_utterance
+    # Pre-roll keeps some audio from before the onset
+    assert len(utterances[0]) > sample_rate * 2
+
+def test_streaming_vad_flush_closes_open_utterance():
+    """flush() hands back an utterance that is still open"""
+    from voice_processor import StreamingVAD
+
+    pcm = (_synthetic_speech() * 32767).astype(np.int16).tobytes()
+    vad = StreamingVAD()
+    assert vad.process(pcm) == []
+    assert vad.in_utterance
+    assert vad.flush() is not None
+    assert not vad.in_utterance
+
+def test_in_memory_recognition_path():
+    """Utterances reach the recognizer as in-memory AudioData, no temp files"""
+    import speech_recognition as sr
+    from asr_engines import GoogleASREngine
+    from voice_processor import VoiceProcessor
+
+    engine = GoogleASREngine()
+    processor = VoiceProcessor(engine=engine)
+    seen = []
+
+    def fake_recognize(audio, language=None):
+        seen.append(audio)
+        return "hello"
+
+    engine.recognizer.recognize_google = fake_recognize
+
+    # Frame-aligned silence is only referenced, never copied
+    silence = np.zeros(4800, dtype=np.int16).tobytes()  # 300 ms
+    assert asyncio.run(processor.process_audio_chunk(silence)) is None
+    assert processor.last_chunk_stats == {"bytes_in": 9600, "bytes_copied": 0}
+
+    speech = (_synthetic_speech() * 32767).astype(np.int16).tobytes()
+    text = asyncio.run(processor.process_audio_chunk(memoryview(speech), final=True))
+    print(f"Transcript: {text}, stats: {processor.last_chunk_stats}")
+    assert text == "hello"
+    assert processor.asr_calls == 1
+    assert isinstance(seen[0], sr.AudioData)
+    assert seen[0].sample_rate == 16000
+
+def test_slow_recognizer_runs_off_loop_with_timeout():
+    """A hung ASR call times out without stalling the event loop"""
+    import time
+    import voice_processor
+    from asr_engines import FakeASREngine
+    from voice_processor import VoiceProcessor, BoundedExecutor
+
+    original = voice_processor.voice_executor
+    voice_processor.voice_executor = BoundedExecutor(stage_timeouts={"asr": 0.2})
+    try:
+        processor = VoiceProcessor(engine=FakeASREngine(latency=1.0))
+        speech = (_synthetic_speech() * 32767).astype(np.int16).tobytes()
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            text = await processor.process_audio_chunk(speech, final=True)
+            task.cancel()
+            return text, ticks
+
+        text, ticks = asyncio.run(run())
+        print(f"Transcript: {text}, loop ticks while waiting: {ticks}")
+        assert text is None
+        assert ticks >= 5
+        assert voice_processor.voice_executor.timeouts["asr"] == 1
+    finally:
+        voice_processor.voice_executor.shutdown()
+        voice_processor.voice_executor = original
+
+def test_slow_analyze_is_not_overlapped_by_next_chunk():
+    """After an analyze stage times out, later chunks wait for its thread instead of sharing the VAD with it"""
+    import threading
+    import time
+    import voice_processor
+    from asr_engines import FakeASREngine
+    from voice_processor import VoiceProcessor, BoundedExecutor
+
+    original = voice_processor.voice_executor
+    voice_processor.voice_executor = BoundedExecutor(max_workers=2, max_pending=2, stage_timeouts={"analyze": 0.1})
+    try:
+        processor = VoiceProcessor(engine=FakeASREngine(latency=0.0))
+        segment = processor._segment
+        active, overlaps, calls = [0], [0], [0]
+        lock = threading.Lock()
+
+        def slow_segment(*args):
+            with lock:
+                active[0] += 1
+                overlaps[0] = max(overlaps[0], active[0])
+                calls[0] += 1
+                first = calls[0] == 1
+            try:
+                if first:
+                    time.sleep(0.4)
+                return segment(*args)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        processor._segment = slow_segment
+        chunk = (_synthetic_speech() * 32767).astype(np.int16).tobytes()[:6400]
+
+        async def run():
+            await processor.process_audio_chunk(chunk)
+            await processor.process_audio_chunk(chunk)  # arrives while the first analyze is still running
+            busy_slots = voice_processor.voice_executor._slots._value
+            await asyncio.sleep(0.5)
+            await processor.process_audio_chunk(chunk)
+            return busy_slots
+
+        free_slots_while_stale = asyncio.run(run())
+        print(f"   Analyze calls: {calls[0]}, max concurrent: {overlaps[0]}, dropped: {processor.stale_dropped_chunks}")
+        assert voice_processor.voice_executor.timeouts["analyze"] == 1
+        assert overlaps[0] == 1
+        assert processor.stale_dropped_chunks == 1
+        assert free_slots_while_stale == 1  # the timed-out call still holds its slot
+        assert calls[0] == 2
+        assert processor.last_features is not None
+    finally:
+        voice_processor.voice_executor.shutdown()
+        voice_processor.voice_executor = original
+
+def test_unknown_asr_engine_does_not_fall_back_to_google():
+    """A mistyped ASR_ENGINE raises instead of silently sending audio to Google"""
+    import asr_engines
+    original = asr_engines.ASR_ENGINE, asr_engines._engine
+    asr_engines.ASR_ENGINE, asr_engines._engine = "vsok", None
+    try:
+        asr_engines.get_asr_engine()
+    except ValueError as e:
+        print(f"   {e}")
+    else:
+        raise AssertionError("Expected ValueError for an unknown ASR engine")
+    finally:
+        asr_engines.ASR_ENGINE, asr_engines._engine = original
+
+def test_fake_asr_engine_is_deterministic():
+    """Same audio gives the same transcript; sessions share one engine"""
+    import asr_engines
+    from asr_engines import FakeASREngine, set_asr_engine
+    from voice_processor import InterviewSession
+
+    previous = asr_engines._engine
+    engine = set_asr_engine(FakeASREngine(latency=0.0))
+    try:
+        speech = (_synthetic_speech(seconds=2.0) * 32767).astype(np.int16).tobytes()
+
+        first = engine.transcribe(speech)
+        assert first == engine.transcribe(speech)
+        assert len(first.split()) == 5  # 2 s at 2.5 words/s
+        assert engine.get_stats()["calls"] == 2
+
+        a = InterviewSession("a", "Software Engineer")
+        b = InterviewSession("b", "Software Engineer")
+        assert a.voice_processor.engine is b.voice_processor.engine is engine
+    finally:
+        # Later tests must get the engine they would have had
+        set_asr_engine(previous)
+
+def test_feature_extractor_single_pass():
+    """Centroid, RMS and the silence gate come out of one framing pass"""
+    from audio_features import AudioFeatureExtractor
+
+    sample_rate = 16000
+    t = np.arange(sample_rate) / sample_rate
+    tone = (0.5 * np.sin(2 * np.pi * 1000 * t) * 32767).astype(np.int16)
+
+    extractor = AudioFeatureExtractor(sample_rate=sample_rate)
+    features = extractor.extract(tone.tobytes())
+    print(f"Tone features: {features}")
+    assert abs(features.spectral_centroid - 1000) < 50
+    # Clarity is the centroid over Nyquist: 1 kHz at 16 kHz is 0.125 (the pre-extractor formula gave ~0)
+    assert abs(features.clarity - 1000 / 8000) < 0.01
+    assert abs(features.rms - 0.5 * 32767 / np.sqrt(2)) < 10
+    assert abs(features.zcr - 2000 / sample_rate) < 0.001
+    assert not features.is_silent
+
+    capacity = extractor._capacity
+    silence = extractor.extract(np.zeros(1600, dtype=np.int16).tobytes())
+    assert silence.is_silent and not silence.has_speech
+    assert extractor._capacity == capacity  # buffers are reused
+
+    # Speech after a quiet lead-in has a real noise floor, hence positive SNR
+    mixed = np.concatenate([np.zeros(8000), _synthetic_speech()]) * 32767
+    assert extractor.extract(mixed.astype(np.int16).tobytes()).snr > 20
+
+def test_metrics_ring_buffer_bounded_with_running_aggregates():
+    """Only the last N points are kept; aggregates cover the whole session"""
+    from audio_metrics import MetricsRingBuffer
+
+    metrics = MetricsRingBuffer(capacity=100)
+    for i in range(1000):
+        metrics.append({"timestamp": float(i), "volume": float(i), "snr": 20.0, "clarity": 0.5})
+
+    summary = metrics.summary()
+    print(f"Volume stats: {summary['volume']}")
+    assert len(metrics) == 100
+    assert metrics.total == 1000
+    assert metrics.to_list()[0]["timestamp"] == 900.0
+    assert summary["volume"]["count"] == 1000
+    assert summary["volume"]["mean"] == 499.5
+    assert summary["volume"]["max"] == 999.0
+    assert abs(summary["volume"]["p50"] - 500) < 128  # within one histogram bin
+    assert metrics.mean("clarity") == 0.5
+
+def test_session_delta_cursor():
+    """Deltas only carry what was added since the client's cursor"""
+    from voice_processor import InterviewSession
+
+    session = InterviewSession("delta_session", "Software Engineer")
+    for i in range(3):
+        session.audio_quality_metrics.append({"timestamp": float(i), "volume": 1.0, "snr": 1.0, "clarity": 0.5})
+    session.transcript.append({"text": "first answer", "timestamp": 0.0})
+
+    delta = session.get_session_delta(None)
+    assert delta["cursor"] == "1:3"
+    assert len(delta["transcript"]) == 1 and len(delta["audio_metrics"]) == 3
+
+    session.audio_quality_metrics.append({"timestamp": 3.0, "volume": 1.0, "snr": 1.0, "clarity": 0.5})
+    delta = session.get_session_delta(delta["cursor"])
+    print(f"Delta: {delta}")
+    assert delta["cursor"] == "1:4"
+    assert delta["transcript"] == []
+    assert [m["timestamp"] for m in delta["audio_metrics"]] == [3.0]
+    assert delta["aggregates"]["audio_quality_stats"]["clarity"]["count"] == 4
+    assert session.get_session_summary()["cursor"] == "1:4"
+
+def test_interim_partials_and_endpoint_latency():
+    """Partials arrive while speech is open; the final result records speech-end latency"""
+    from asr_engines import FakeASREngine
+    from voice_processor import InterviewSession
+
+    sample_rate = 16000
+    audio = np.concatenate([_synthetic_speech(sample_rate, seconds=2.0), np.zeros(sample_rate)])
+    pcm = (audio * 32767).astype(np.int16).tobytes()
+    session = InterviewSession("interim_session", "Software Engineer")
+    session.voice_processor.engine = FakeASREngine(latency=0.0)
+
+    async def run():
+        results = []
+        for i in range(0, len(pcm), 3200):
+            results.append(await session.process_interview_audio(pcm[i:i + 3200], float(i), interim=True))
+        return results
+
+    results = asyncio.run(run())
+    partials = [r["partial_transcript"] for r in results if r["partial_transcript"]]
+    finals = [r for r in results if r["transcript"]]
+    print(f"Partials: {len(partials)}, finals: {len(finals)}, latency: {finals[0]['endpoint_latency_ms']}")
+    assert len(partials) >= 2
+    assert len(finals) == 1
+    # Latency includes the VAD hangover of trailing silence
+    assert finals[0]["endpoint_latency_ms"][0] >= session.voice_processor.vad.hangover_frames * 30
+    stats = session.get_session_summary()["endpoint_latency_ms"]
+    assert stats["count"] == 1
+    assert session.voice_processor.partial_asr_calls == len(partials)
+
 if __name__ == "__main__":
-    asyncio.run(test_voice_processor()) 
\ No newline at end of file
+    asyncio.run(test_voice_processor())
+    test_streaming_vad_segments_utterances()
+    test_streaming_vad_flush_closes_open_utterance()
+    test_in_memory_recognition_path()
+    test_slow_recognizer_runs_off_loop_with_timeout()
+    test_slow_analyze_is_not_overlapped_by_next_chunk()
+    test_unknown_asr_engine_does_not_fall_back_to_google()
+    test_fake_asr_engine_is_deterministic()
+    test_feature_extractor_single_pass()
+    test_metrics_ring_buffer_bounded_with_running_aggregates()
+    test_session_delta_cursor()
+    test_interim_partials_and_endpoint_latency()
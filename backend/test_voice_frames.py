@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for binary / base64 voice message decoding
+"""
+
+import base64
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_frames import decode_timestamp, decode_voice_message, encode_framed_message, VoiceFrameError
+
+PCM = bytes(range(256)) * 8
+
+
+def test_framed_binary_message():
+    """Header is parsed and the payload is a view into the original message"""
+    message = encode_framed_message({"session_id": "abc", "final": True}, PCM)
+    metadata, audio = decode_voice_message(message)
+    print(f"   Metadata: {metadata}, payload: {len(audio)} bytes")
+    assert metadata == {"session_id": "abc", "final": True}
+    assert isinstance(audio, memoryview)
+    assert audio.obj is message  # no copy of the payload
+    assert bytes(audio) == PCM
+
+
+def test_binary_attachment_and_base64_fallback():
+    """Dict payloads accept a binary attachment or legacy base64 text"""
+    metadata, audio = decode_voice_message({"session_id": "abc", "audio_data": PCM})
+    assert metadata == {"session_id": "abc"}
+    assert audio.obj is PCM
+
+    _, audio = decode_voice_message({"session_id": "abc", "audio_data": base64.b64encode(PCM).decode()})
+    assert bytes(audio) == PCM
+
+
+def test_invalid_messages_rejected():
+    for bad in (b"\x01", b"\xff\xff\x00\x00{}", {"audio_data": "not base64!"}, 42):
+        try:
+            decode_voice_message(bad)
+        except VoiceFrameError:
+            continue
+        raise AssertionError(f"Expected VoiceFrameError for {bad!r}")
+
+
+def test_timestamp_validation():
+    """Numeric timestamps (or numeric strings from a query) pass; anything else is a VoiceFrameError"""
+    assert decode_timestamp({}, 7.0) == 7.0
+    assert decode_timestamp({"timestamp": "12.5"}, 0.0) == 12.5
+    assert decode_timestamp({"timestamp": 3}, 0.0) == 3.0
+    for bad in ("soon", "nan", "inf", [1], {"t": 1}):
+        try:
+            decode_timestamp({"timestamp": bad}, 0.0)
+        except VoiceFrameError:
+            continue
+        raise AssertionError(f"Expected VoiceFrameError for {bad!r}")
+
+
+def test_process_endpoint_rejects_bad_timestamp():
+    """/api/voice/process answers 400, not 500, for a non-numeric timestamp"""
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)
+    response = client.post("/api/voice/process?session_id=ts-1&timestamp=later", content=b"\x00" * 640,
+                           headers={"content-type": "application/octet-stream"})
+    print(f"   Binary body: {response.status_code} {response.json()}")
+    assert response.status_code == 400
+    assert "timestamp" in response.json()["error"]
+    response = client.post("/api/voice/process", json={"session_id": "ts-1", "audio_data": "AAAA",
+                                                       "timestamp": "later"})
+    assert response.status_code == 400
+
+
+if __name__ == "__main__":
+    print("🧪 Testing voice frame decoding...")
+    test_framed_binary_message()
+    test_binary_attachment_and_base64_fallback()
+    test_invalid_messages_rejected()
+    test_timestamp_validation()
+    test_process_endpoint_rejects_bad_timestamp()
+    print("🎉 Voice frame tests completed!")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-session ordered voice chunk queue
+"""
+
+import asyncio
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from voice_queue import VoiceChunkQueue
+
+
+def test_results_in_sequence_order():
+    """A slow handler still sees chunks strictly in arrival order"""
+    handled = []
+
+    async def handler(item):
+        await asyncio.sleep(0.01 if item.seq % 2 else 0.001)
+        handled.append(item.seq)
+
+    async def run():
+        queue = VoiceChunkQueue(handler, max_depth=32, coalesce_threshold=32)
+        for i in range(10):
+            await queue.put(b"\x00" * 960, sid="sid")
+        await queue.join()
+        return queue
+
+    queue = asyncio.run(run())
+    print(f"   Handled: {handled}")
+    assert handled == list(range(10))
+    assert queue.get_stats()["processed"] == 10
+
+
+def test_coalesce_and_backpressure():
+    """Past the threshold new audio is merged into the newest queued chunk"""
+    signals = []
+    handled = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(item):
+            await release.wait()
+            handled.append((item.seq, item.last_seq, len(item.audio)))
+
+        async def notify(sid, data):
+            signals.append(data["status"])
+
+        queue = VoiceChunkQueue(handler, notify=notify, max_depth=4, coalesce_threshold=2, max_item_bytes=300)
+        for _ in range(8):
+            await queue.put(b"\x01" * 100, sid="sid")
+            await asyncio.sleep(0)
+        stats = queue.get_stats()
+        release.set()
+        await queue.join()
+        return stats, queue.get_stats()
+
+    during, after = asyncio.run(run())
+    print(f"   Stats while blocked: {during}")
+    print(f"   Handled: {handled}, signals: {signals}")
+    assert during["coalesced"] > 0
+    assert during["depth"] <= 4
+    assert signals == ["slow_down", "resume"]
+    seqs = [seq for seq, _, _ in handled]
+    assert seqs == sorted(seqs)
+    assert after["processed"] + after["dropped"] == 8
+
+
+def _fill_blocked_queue(chunks, **kwargs):
+    """Put ``chunks`` (audio, final[, metadata]) while the handler is stuck on the first one, then release it
+
+    Returns the queue stats, (seq, last_seq, final, audio) per handled item, and the items themselves.
+    """
+    handled, items = [], []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def handler(item):
+            await release.wait()
+            handled.append((item.seq, item.last_seq, item.final, bytes(item.audio)))
+            items.append(item)
+
+        queue = VoiceChunkQueue(handler, **kwargs)
+        for audio, final, *metadata in chunks:
+            await queue.put(audio, sid="sid", final=final, metadata=metadata[0] if metadata else None)
+            await asyncio.sleep(0)
+        release.set()
+        await queue.join()
+        return queue.get_stats()
+
+    return asyncio.run(run()), handled, items
+
+
+def test_drops_oldest_when_full():
+    """Chunks that cannot be merged (over max_item_bytes) are dropped oldest-first"""
+    stats, handled, _ = _fill_blocked_queue([(b"\x01" * 100, False)] * 7,
+                                         max_depth=3, coalesce_threshold=2, max_item_bytes=100)
+    print(f"   Handled: {[seq for seq, _, _, _ in handled]}, stats: {stats}")
+    assert stats["dropped"] == 3
+    assert [seq for seq, _, _, _ in handled] == [0, 4, 5, 6]
+
+
+def test_final_chunk_at_head_is_never_dropped():
+    """Past max_depth the oldest non-final chunk goes, never a final one waiting at the head"""
+    chunks = [(b"\x01" * 100, False), (b"\x02" * 100, True)] + [(b"\x03" * 100, False)] * 8
+    stats, handled, _ = _fill_blocked_queue(chunks, max_depth=3, coalesce_threshold=2, max_item_bytes=100)
+    seqs = [seq for seq, _, _, _ in handled]
+    print(f"   Handled: {seqs}, stats: {stats}")
+    assert seqs[:2] == [0, 1]
+    assert handled[1][2] is True
+    assert stats["dropped"] == 6
+    assert stats["processed"] + stats["dropped"] == len(chunks)
+
+    # A queue holding nothing but final chunks grows past max_depth rather than dropping one
+    stats, handled, _ = _fill_blocked_queue([(b"\x01" * 100, True)] * 7, max_depth=3, coalesce_threshold=2)
+    assert stats["dropped"] == 0
+    assert [seq for seq, _, _, _ in handled] == list(range(7))
+
+
+def test_container_stream_coalesces_instead_of_dropping():
+    """WebM continuation chunks are merged into the tail at max_depth so the stream stays decodable"""
+    header = b"\x1a\x45\xdf\xa3" + b"\x00" * 96
+    chunks = [(header, False)] + [(bytes([i]) * 100, False) for i in range(1, 12)]
+    stats, handled, _ = _fill_blocked_queue(chunks, max_depth=3, coalesce_threshold=2, max_item_bytes=100)
+    print(f"   Handled: {[(seq, last) for seq, last, _, _ in handled]}, stats: {stats}")
+    assert stats["dropped"] == 0
+    assert b"".join(audio for _, _, _, audio in handled) == b"".join(audio for audio, _ in chunks)
+    assert stats["max_depth_seen"] <= 3
+
+
+def test_pcm_with_different_format_is_not_merged():
+    """Raw PCM is only merged into a chunk with the same rate, channels, interim flag and question"""
+    pcm = b"\x01" * 100
+    mono = {"sample_rate": 16000, "channels": 1}
+    stereo = {"sample_rate": 48000, "channels": 2}
+    chunks = [(pcm, False, mono)] * 3 + [(pcm, False, stereo)] * 2 + [(pcm, False, dict(mono, question_index=1))]
+    stats, _, items = _fill_blocked_queue(chunks, max_depth=32, coalesce_threshold=1)
+    print(f"   Items: {[(item.seq, item.last_seq, item.metadata) for item in items]}")
+    assert [(item.seq, item.last_seq) for item in items] == [(0, 0), (1, 2), (3, 4), (5, 5)]
+    assert items[2].metadata == stereo and len(items[2].audio) == 200
+    assert stats["dropped"] == 0
+
+
+def test_wav_chunks_are_never_concatenated():
+    """Every WAV chunk carries its own RIFF header, so each stays a separate item"""
+    wav = b"RIFF" + b"\x00" * 4 + b"WAVE" + b"\x00" * 88
+    stats, handled, _ = _fill_blocked_queue([(wav, False)] * 5, max_depth=32, coalesce_threshold=1)
+    print(f"   Handled: {[(seq, last) for seq, last, _, _ in handled]}")
+    assert [(seq, last) for seq, last, _, _ in handled] == [(i, i) for i in range(5)]
+    assert all(audio == wav for _, _, _, audio in handled)
+    # Raw PCM that follows a WAV chunk is not appended to it either
+    stats, handled, _ = _fill_blocked_queue([(wav, False), (wav, False), (b"\x01" * 100, False)],
+                                         max_depth=32, coalesce_threshold=1)
+    assert [audio for _, _, _, audio in handled] == [wav, wav, b"\x01" * 100]
+
+
+def test_new_container_header_starts_a_new_item():
+    """A recorder restart (new WebM header) is queued on its own, not appended to the old stream"""
+    first = b"\x1a\x45\xdf\xa3" + b"\x01" * 96
+    second = b"\x1a\x45\xdf\xa3" + b"\x02" * 96
+    chunks = [(first, False), (b"\x03" * 100, False), (b"\x04" * 100, False),
+              (second, False), (b"\x05" * 100, False)]
+    stats, handled, _ = _fill_blocked_queue(chunks, max_depth=32, coalesce_threshold=1)
+    print(f"   Handled: {[(seq, last) for seq, last, _, _ in handled]}")
+    assert [(seq, last) for seq, last, _, _ in handled] == [(0, 0), (1, 2), (3, 4)]
+    assert handled[2][3] == second + b"\x05" * 100
+
+    # Even at max_depth, where continuation chunks are merged past max_item_bytes
+    chunks = [(first, False)] + [(b"\x03" * 100, False)] * 4 + [(second, False), (b"\x05" * 100, False)]
+    stats, handled, _ = _fill_blocked_queue(chunks, max_depth=2, coalesce_threshold=2, max_item_bytes=100)
+    assert any(audio.startswith(second) for _, _, _, audio in handled)
+    assert not any(second in audio[1:] for _, _, _, audio in handled)
+    assert stats["dropped"] == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Testing voice chunk queue...")
+    test_results_in_sequence_order()
+    test_coalesce_and_backpressure()
+    test_drops_oldest_when_full()
+    test_final_chunk_at_head_is_never_dropped()
+    test_container_stream_coalesces_instead_of_dropping()
+    test_pcm_with_different_format_is_not_merged()
+    test_wav_chunks_are_never_concatenated()
+    test_new_container_header_starts_a_new_item()
+    print("🎉 Voice chunk queue tests completed!")
@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+import logging
+import math
+import struct
+from typing import Dict, Any, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Framed binary voice message:
+#   [uint32 little-endian header length N][N bytes UTF-8 JSON header][raw PCM16 payload]
+FRAME_HEADER_LENGTH = struct.Struct("<I")
+MAX_FRAME_HEADER_BYTES = 4096
+MAX_INPUT_SAMPLE_RATE = 192000
+MAX_INPUT_CHANNELS = 8
+
+
+class VoiceFrameError(ValueError):
+    """Raised when a voice message cannot be decoded"""
+
+
+def decode_framed_message(message) -> Tuple[Dict[str, Any], memoryview]:
+    """Split a framed binary message into its JSON header and a zero-copy payload view"""
+    view = memoryview(message).cast("B")
+    if len(view) < FRAME_HEADER_LENGTH.size:
+        raise VoiceFrameError("Binary voice frame is shorter than its length prefix")
+    (header_length,) = FRAME_HEADER_LENGTH.unpack_from(view)
+    header_end = FRAME_HEADER_LENGTH.size + header_length
+    if header_length > MAX_FRAME_HEADER_BYTES or header_end > len(view):
+        raise VoiceFrameError("Binary voice frame header length is invalid")
+    try:
+        header = json.loads(bytes(view[FRAME_HEADER_LENGTH.size:header_end]).decode("utf-8")) if header_length else {}
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise VoiceFrameError(f"Binary voice frame header is not valid JSON: {e}")
+    if not isinstance(header, dict):
+        raise VoiceFrameError("Binary voice frame header must be a JSON object")
+    return header, view[header_end:]
+
+
+def encode_framed_message(header: Dict[str, Any], payload) -> bytes:
+    """Build a framed binary message (used by test clients and benchmarks)"""
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return FRAME_HEADER_LENGTH.pack(len(encoded)) + encoded + bytes(payload)
+
+
+def decode_audio_field(audio_data) -> memoryview:
+    """Return PCM16 audio from a message field: binary attachment or base64 text"""
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        return memoryview(audio_data).cast("B")
+    if isinstance(audio_data, str):
+        # Legacy clients send base64, optionally as a data URL
+        if audio_data.startswith("data:") and "," in audio_data:
+            audio_data = audio_data.split(",", 1)[1]
+        try:
+            return memoryview(base64.b64decode(audio_data))
+        except (binascii.Error, ValueError) as e:
+            raise VoiceFrameError(f"Invalid base64 audio data: {e}")
+    raise VoiceFrameError(f"Unsupported audio_data type: {type(audio_data).__name__}")
+
+
+def decode_voice_message(data) -> Tuple[Dict[str, Any], memoryview]:
+    """Normalise any accepted ``voice`` event payload to (metadata, PCM16 view)
+
+    Accepted forms:
+    - a framed binary message (see ``decode_framed_message``)
+    - a dict whose ``audio_data`` is a binary attachment
+    - a dict whose ``audio_data`` is base64 text (fallback)
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return decode_framed_message(data)
+    if isinstance(data, dict):
+        metadata = {key: value for key, value in data.items() if key != "audio_data"}
+        audio_data = data.get("audio_data")
+        if audio_data is None or len(audio_data) == 0:
+            return metadata, memoryview(b"")
+        return metadata, decode_audio_field(audio_data)
+    raise VoiceFrameError(f"Unsupported voice message type: {type(data).__name__}")
+
+
+def decode_audio_format(metadata: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """Optional ``sample_rate`` / ``channels`` of raw PCM16 input from message or query metadata"""
+    limits = {"sample_rate": MAX_INPUT_SAMPLE_RATE, "channels": MAX_INPUT_CHANNELS}
+    values = []
+    for key, limit in limits.items():
+        value = metadata.get(key)
+        if value is None or value == "":
+            values.append(None)
+            continue
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise VoiceFrameError(f"Invalid {key}: {value!r}")
+        if not 0 < value <= limit:
+            raise VoiceFrameError(f"Invalid {key}: {value}")
+        values.append(value)
+    return values[0], values[1]
+
+
+def decode_timestamp(metadata: Dict[str, Any], default: float) -> float:
+    """Optional client ``timestamp`` of the chunk (seconds); ``default`` when absent"""
+    value = metadata.get("timestamp")
+    if value is None or value == "":
+        return default
+    try:
+        timestamp = float(value)
+    except (TypeError, ValueError):
+        raise VoiceFrameError(f"Invalid timestamp: {value!r}")
+    if not math.isfinite(timestamp):
+        raise VoiceFrameError(f"Invalid timestamp: {value!r}")
+    return timestamp
+
+
+def decode_question_index(metadata: Dict[str, Any]) -> Optional[int]:
+    """Optional 0-based ``question_index`` the audio answers"""
+    value = metadata.get("question_index")
+    if value is None or value == "":
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise VoiceFrameError(f"Invalid question_index: {value!r}")
+    if value < 0:
+        raise VoiceFrameError(f"Invalid question_index: {value}")
+    return value
@@ -1,106 +1,574 @@
 import asyncio
 import json
 import logging
-from typing import Optional, Dict, Any
-import speech_recognition as sr
-# import webrtcvad  # Temporarily commented out due to build requirements
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, Any, List, Tuple
 import numpy as np
 from pydub import AudioSegment
 from pydub.utils import make_chunks
-import tempfile
 import os
+from asr_engines import ASREngine, get_asr_engine
+from audio_features import AudioFeatureExtractor, AudioFeatures
+from audio_decoder import AudioDecodeError, StreamingDecoder, detect_container, parse_wav
+from audio_resample import StreamingResampler
+from session_store import SessionStore
+from audio_metrics import MetricsRingBuffer, RunningStat
+from shared_state import SessionStateBackend, create_state_backend
+from prosody import ProsodyTracker
+
+try:
+    import webrtcvad
+except ImportError:  # webrtcvad needs a C toolchain to build on some platforms
+    webrtcvad = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class VoiceProcessor:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        # self.vad = webrtcvad.Vad(2)  # Temporarily commented out
-        self.sample_rate = 16000
-        self.chunk_duration = 30  # ms
-        
-    async def process_audio_chunk(self, audio_data: bytes) -> Optional[str]:
-        """Process a chunk of audio data and return transcribed text"""
+# VAD tuning (overridable from the environment)
+VAD_AGGRESSIVENESS = int(os.getenv("VAD_AGGRESSIVENESS", "2"))
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_PRE_ROLL_MS = int(os.getenv("VAD_PRE_ROLL_MS", "300"))
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "450"))
+VAD_MIN_SPEECH_MS = int(os.getenv("VAD_MIN_SPEECH_MS", "150"))
+VAD_MAX_UTTERANCE_MS = int(os.getenv("VAD_MAX_UTTERANCE_MS", "15000"))
+
+# Interim results: minimum new utterance audio between partial hypotheses
+INTERIM_INTERVAL_MS = int(os.getenv("INTERIM_INTERVAL_MS", "600"))
+# Upper bound of the speech-end -> final-transcript latency histogram
+ENDPOINT_LATENCY_MAX_MS = float(os.getenv("ENDPOINT_LATENCY_MAX_MS", "10000"))
+
+
+# Blocking/CPU-bound pipeline stages run on a bounded thread pool
+VOICE_EXECUTOR_WORKERS = int(os.getenv("VOICE_EXECUTOR_WORKERS", str(min(8, (os.cpu_count() or 1) + 4))))
+VOICE_EXECUTOR_MAX_PENDING = int(os.getenv("VOICE_EXECUTOR_MAX_PENDING", str(VOICE_EXECUTOR_WORKERS * 4)))
+VOICE_STAGE_TIMEOUTS = {
+    "decode": float(os.getenv("VOICE_DECODE_TIMEOUT", "3.0")),  # WebM/Ogg -> PCM16
+    "analyze": float(os.getenv("VOICE_ANALYZE_TIMEOUT", "2.0")),  # features + VAD
+    "asr": float(os.getenv("VOICE_ASR_TIMEOUT", "10.0")),
+    "checkpoint": float(os.getenv("VOICE_CHECKPOINT_TIMEOUT", "2.0")),  # shared state write
+    "restore": float(os.getenv("VOICE_RESTORE_TIMEOUT", "2.0")),  # shared state read or delete
+    "persist": float(os.getenv("VOICE_PERSIST_TIMEOUT", "5.0")),  # per-answer analytics row
+}
+
+# Minimum seconds between shared-state checkpoints of a session (new transcript text always checkpoints)
+SESSION_CHECKPOINT_INTERVAL = float(os.getenv("SESSION_CHECKPOINT_INTERVAL", "2.0"))
+# Raw metric points carried by a checkpoint; the running aggregates always cover the whole session
+SESSION_CHECKPOINT_METRIC_POINTS = int(os.getenv("SESSION_CHECKPOINT_METRIC_POINTS", "256"))
+# Reload-merge-save attempts when another worker checkpointed the same session first
+SESSION_CHECKPOINT_RETRIES = int(os.getenv("SESSION_CHECKPOINT_RETRIES", "3"))
+
+
+class StageTimeoutError(Exception):
+    """Raised when a voice pipeline stage exceeds its timeout
+
+    ``pending`` is the still-running call; stateful stages must not touch
+    the same session objects again until it is done.
+    """
+
+    def __init__(self, message: str, pending: Optional[asyncio.Future] = None):
+        super().__init__(message)
+        self.pending = pending
+
+
+class BoundedExecutor:
+    """Thread pool for blocking voice-pipeline stages with admission control.
+
+    At most ``max_pending`` calls may be queued or running; further callers
+    wait on the event loop instead of growing the pool's queue. Each call is
+    bounded by its stage timeout. A timed-out call keeps running in its
+    worker thread and keeps its slot until it finishes; its result is
+    discarded.
+    """
+
+    def __init__(self,
+                 max_workers: int = VOICE_EXECUTOR_WORKERS,
+                 max_pending: int = VOICE_EXECUTOR_MAX_PENDING,
+                 stage_timeouts: Optional[Dict[str, float]] = None):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.stage_timeouts = dict(VOICE_STAGE_TIMEOUTS)
+        if stage_timeouts:
+            self.stage_timeouts.update(stage_timeouts)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="voice")
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.timeouts = {stage: 0 for stage in self.stage_timeouts}
+
+    def _release(self, future: asyncio.Future):
+        self._slots.release()
+        if not future.cancelled():
+            future.exception()  # a timed-out call's error has no one left to see it
+
+    async def run(self, stage: str, func, *args):
+        """Run ``func(*args)`` in the pool under the timeout for ``stage``"""
+        timeout = self.stage_timeouts.get(stage)
+        await self._slots.acquire()
         try:
-            logger.info(f"Processing audio chunk of size: {len(audio_data)} bytes")
-            
-            # Check if audio data is too small to process
-            if len(audio_data) < 1024:  # Less than 1KB, likely silence or very short
-                return None
-            
-            # Convert audio data to AudioSegment
+            future = asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts[stage] = self.timeouts.get(stage, 0) + 1
+            raise StageTimeoutError(f"Voice stage '{stage}' timed out after {timeout}s", future)
+
+    def shutdown(self, wait: bool = False):
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+voice_executor = BoundedExecutor()
+
+
+def configure_voice_executor(max_workers: Optional[int] = None,
+                             max_pending: Optional[int] = None,
+                             stage_timeouts: Optional[Dict[str, float]] = None) -> BoundedExecutor:
+    """Replace the shared voice executor (e.g. from startup code or benchmarks)"""
+    global voice_executor
+    old = voice_executor
+    voice_executor = BoundedExecutor(
+        max_workers=max_workers or old.max_workers,
+        max_pending=max_pending or old.max_pending,
+        stage_timeouts={**old.stage_timeouts, **(stage_timeouts or {})}
+    )
+    old.shutdown(wait=False)
+    return voice_executor
+
+
+class StreamingVAD:
+    """Stateful frame-level voice activity detector and utterance segmenter.
+
+    Audio is fed in arbitrarily sized PCM16 chunks and split into fixed
+    10/20/30 ms frames. A ring buffer keeps the most recent non-speech frames
+    as pre-roll so word onsets are not clipped, and an utterance is only
+    closed after ``hangover_ms`` of continuous non-speech. ``frame_observer``,
+    if given, is called with every frame and its speech decision.
+    """
+
+    def __init__(self,
+                 sample_rate: int = 16000,
+                 frame_ms: int = VAD_FRAME_MS,
+                 aggressiveness: int = VAD_AGGRESSIVENESS,
+                 pre_roll_ms: int = VAD_PRE_ROLL_MS,
+                 hangover_ms: int = VAD_HANGOVER_MS,
+                 min_speech_ms: int = VAD_MIN_SPEECH_MS,
+                 max_utterance_ms: int = VAD_MAX_UTTERANCE_MS,
+                 frame_observer: Optional[Callable[[memoryview, bool], None]] = None):
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("frame_ms must be 10, 20 or 30")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+        self.pre_roll_frames = max(0, pre_roll_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_utterance_frames = max(1, max_utterance_ms // frame_ms)
+        self.vad = webrtcvad.Vad(aggressiveness) if webrtcvad else None
+        self.frame_observer = frame_observer
+
+        self._pending = bytearray()
+        self._pre_roll: deque = deque(maxlen=self.pre_roll_frames or None)
+        self._utterance = bytearray()
+        self._triggered = False
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._utterance_frames = 0
+        self._closed_silence_run = 0
+        # For each utterance returned since the last process() (including a
+        # following flush()): ms of audio between its last speech frame and
+        # the end of the chunk
+        self.endpoint_lag_ms: List[int] = []
+
+        self.frames_processed = 0
+        self.utterances_emitted = 0
+        self.bytes_copied = 0
+
+    @property
+    def in_utterance(self) -> bool:
+        """True while an utterance is open (speech seen, hangover not elapsed)"""
+        return self._triggered
+
+    @property
+    def utterance_bytes(self) -> int:
+        return len(self._utterance)
+
+    def snapshot(self) -> bytes:
+        """Copy of the open utterance so far (for interim recognition)"""
+        return bytes(self._utterance)
+
+    def process(self, audio_data, silent: bool = False) -> List[bytearray]:
+        """Feed PCM16 audio (any bytes-like object) and return finished utterances
+
+        Frames are sliced as ``memoryview``s of the input; only a trailing
+        partial frame is buffered, and only speech (plus pre-roll) is copied
+        into the utterance buffer. Returned utterances are owned by the caller.
+        ``silent`` marks a chunk the feature gate already found too quiet for
+        speech, so its frames are classified without calling the VAD.
+        """
+        self.endpoint_lag_ms = []
+        view = memoryview(audio_data).cast("B")
+        if self._pending:
+            # Complete the partial frame left over from the previous chunk
+            needed = self.frame_bytes - len(self._pending)
+            self._pending.extend(view[:needed])
+            self.bytes_copied += min(needed, len(view))
+            view = view[needed:]
+            if len(self._pending) < self.frame_bytes:
+                return []
+            head, self._pending = self._pending, bytearray()
+            frames = [memoryview(head)]
+        else:
+            frames = []
+
+        full = len(view) - len(view) % self.frame_bytes
+        frames.extend(view[i:i + self.frame_bytes] for i in range(0, full, self.frame_bytes))
+        if full < len(view):
+            self._pending.extend(view[full:])
+            self.bytes_copied += len(view) - full
+
+        utterances = []
+        for index, frame in enumerate(frames):
+            utterance = self._process_frame(frame, False if silent else None)
+            if utterance is not None:
+                utterances.append(utterance)
+                trailing_frames = self._closed_silence_run + len(frames) - 1 - index
+                self.endpoint_lag_ms.append(trailing_frames * self.frame_ms)
+        return utterances
+
+    def flush(self) -> Optional[bytearray]:
+        """Close the open utterance (e.g. when the client stops recording)"""
+        self._pending.clear()
+        if not self._triggered:
+            self._pre_roll.clear()
+            return None
+        utterance = self._close_utterance()
+        if utterance is not None:
+            self.endpoint_lag_ms.append(self._closed_silence_run * self.frame_ms)
+        return utterance
+
+    def reset(self):
+        """Drop all buffered audio and return to the idle state"""
+        self._pending.clear()
+        self._pre_roll.clear()
+        self._utterance = bytearray()
+        self._triggered = False
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._utterance_frames = 0
+
+    def _is_speech_frame(self, frame: memoryview) -> bool:
+        if self.vad is not None:
             try:
-                audio_segment = AudioSegment(
-                    data=audio_data,
-                    sample_width=2,  # 16-bit
-                    frame_rate=self.sample_rate,
-                    channels=1
-                )
+                return self.vad.is_speech(frame, self.sample_rate)
             except Exception as e:
-                logger.warning(f"Failed to create AudioSegment from raw data: {e}")
-                # Try alternative approach for different audio formats
+                logger.debug(f"webrtcvad rejected frame, using energy gate: {e}")
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float64)
+        rms = np.sqrt(np.mean(samples ** 2))
+        zcr = np.count_nonzero(np.diff(np.signbit(samples))) / len(samples)
+        return rms > 500 and 0.01 < zcr < 0.3
+
+    def _process_frame(self, frame: memoryview, is_speech: Optional[bool] = None) -> Optional[bytearray]:
+        self.frames_processed += 1
+        if is_speech is None:
+            is_speech = self._is_speech_frame(frame)
+        if self.frame_observer is not None:
+            self.frame_observer(frame, is_speech)
+
+        if not self._triggered:
+            if is_speech:
+                self._triggered = True
+                for buffered in self._pre_roll:
+                    self._utterance.extend(buffered)
+                self._utterance_frames = len(self._pre_roll)
+                self._pre_roll.clear()
+                self._utterance.extend(frame)
+                self._utterance_frames += 1
+                self.bytes_copied += self._utterance_frames * self.frame_bytes
+                self._speech_frames = 1
+                self._silence_run = 0
+            elif self.pre_roll_frames:
+                # Read-only inputs (bytes) can be referenced; mutable ones may be reused
+                if frame.readonly:
+                    self._pre_roll.append(frame)
+                else:
+                    self._pre_roll.append(bytes(frame))
+                    self.bytes_copied += self.frame_bytes
+            return None
+
+        self._utterance.extend(frame)
+        self._utterance_frames += 1
+        self.bytes_copied += self.frame_bytes
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if (self._silence_run >= self.hangover_frames or
+                self._utterance_frames >= self.max_utterance_frames):
+            return self._close_utterance()
+        return None
+
+    def _close_utterance(self) -> Optional[bytearray]:
+        # Hand the buffer itself to the caller instead of copying it
+        utterance = self._utterance
+        speech_frames = self._speech_frames
+        self._closed_silence_run = self._silence_run
+        self._utterance = bytearray()
+        self._triggered = False
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._utterance_frames = 0
+        if speech_frames < self.min_speech_frames:
+            return None
+        self.utterances_emitted += 1
+        return utterance
+
+
+class VoiceProcessor:
+    def __init__(self, engine: Optional[ASREngine] = None):
+        # Engines are process-wide and pooled; sessions only hold a reference
+        self.engine = engine or get_asr_engine()
+        self.sample_rate = 16000
+        self.sample_width = 2  # 16-bit PCM
+        self.chunk_duration = VAD_FRAME_MS  # ms
+        # Speaking rate, pauses and pitch of the current answer, fed frame by frame by the VAD
+        self.prosody = ProsodyTracker(sample_rate=self.sample_rate, frame_ms=self.chunk_duration)
+        self.vad = StreamingVAD(sample_rate=self.sample_rate, frame_ms=self.chunk_duration,
+                                frame_observer=self.prosody.observe)
+        self.features = AudioFeatureExtractor(sample_rate=self.sample_rate)
+        self.last_features: Optional[AudioFeatures] = None
+        self.asr_calls = 0
+        self.last_chunk_stats = {"bytes_in": 0, "bytes_copied": 0}
+        # Live decoder for a WebM/Ogg stream; kept for the whole recording
+        self.decoder: Optional[StreamingDecoder] = None
+        # Container of the recording in progress; continuation chunks carry no header
+        self.stream_container: Optional[str] = None
+        # Set when that recording could not be decoded: its chunks are dropped until a new header arrives
+        self.stream_failed = False
+        self.dropped_stream_chunks = 0
+        self.last_error: Optional[str] = None
+        # A decode/analyze call that timed out but is still running on this session's state
+        self._stale_stage: Optional[asyncio.Future] = None
+        self.stale_dropped_chunks = 0
+        # Rate/channel conversion for PCM input that is not 16 kHz mono
+        self.input_format = (self.sample_rate, 1)
+        self.resampler: Optional[StreamingResampler] = None
+        # Interim hypotheses for the open utterance
+        self.last_partial: Optional[str] = None
+        self.partial_asr_calls = 0
+        self._partial_mark = 0
+        self.interim_bytes = int(self.sample_rate * INTERIM_INTERVAL_MS / 1000) * self.sample_width
+        # Speech end -> final transcript, per finished utterance
+        self.endpoint_latency = RunningStat(0.0, ENDPOINT_LATENCY_MAX_MS)
+        self.last_endpoint_latency_ms: List[float] = []
+        
+    def set_input_format(self, sample_rate: Optional[int] = None, channels: Optional[int] = None):
+        """Declare the rate/channels of incoming PCM; filter state is kept until the format changes"""
+        input_format = (sample_rate or self.input_format[0], channels or self.input_format[1])
+        if input_format == self.input_format:
+            return
+        self.input_format = input_format
+        resampler = StreamingResampler(input_format[0], input_format[1], output_rate=self.sample_rate)
+        self.resampler = None if resampler.passthrough else resampler
+        
+    async def process_audio_chunk(self, audio_data, final: bool = False,
+                                  sample_rate: Optional[int] = None, channels: Optional[int] = None,
+                                  interim: bool = False) -> Optional[str]:
+        """Feed a chunk of audio through the VAD and transcribe finished utterances
+
+        ``audio_data`` may be ``bytes``, ``bytearray`` or a ``memoryview`` of
+        raw PCM16 (16 kHz mono unless ``sample_rate``/``channels`` say
+        otherwise), a WAV chunk, or the next piece of a WebM/Ogg recording.
+        Recognition only runs when the VAD closes an utterance (or when
+        ``final`` is set and one is still open), so silence and mid-utterance
+        chunks cost no ASR round-trip. With ``interim`` set, an open utterance
+        is also recognised every ``INTERIM_INTERVAL_MS`` of new audio and the
+        hypothesis left in ``last_partial``. If a WebM/Ogg recording cannot be
+        decoded (e.g. ffmpeg is missing) the reason is left in ``last_error``
+        and the rest of it is dropped rather than treated as PCM.
+        """
+        received = time.perf_counter()
+        self.last_features = None
+        self.last_partial = None
+        self.last_error = None
+        self.last_endpoint_latency_ms = []
+        if self._stale_stage is not None:
+            if not self._stale_stage.done():
+                # Its worker thread still owns the decoder/VAD; this chunk cannot be analysed safely
+                self.stale_dropped_chunks += 1
                 return None
-            
-            # Check if audio contains speech
-            if not self._has_speech(audio_segment):
+            self._stale_stage = None
+            self._reset_stream_state()
+        try:
+            logger.debug(f"Processing audio chunk of size: {len(audio_data)} bytes")
+            container = detect_container(audio_data)
+            resample = True
+            if container == "wav":
+                sample_rate, channels, _, audio_data = parse_wav(audio_data)
+            elif container is None and self.stream_failed:
+                self.dropped_stream_chunks += 1
+                if final:
+                    self.stream_container, self.stream_failed = None, False
                 return None
-                
-            # Save to temporary file for speech recognition
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                audio_segment.export(temp_file.name, format="wav")
-                temp_path = temp_file.name
+            elif container is not None or self.stream_container is not None:
+                # ffmpeg already outputs 16 kHz mono
+                audio_data = await voice_executor.run("decode", self._decode_stream, audio_data, container, final)
+                resample = False
+            if resample and (sample_rate or channels):
+                self.set_input_format(sample_rate, channels)
+            utterances = await voice_executor.run("analyze", self._segment, audio_data, final, resample)
+            endpoint_lags = list(self.vad.endpoint_lag_ms)
             
-            try:
-                with sr.AudioFile(temp_path) as source:
-                    audio = self.recognizer.record(source)
-                    text = self.recognizer.recognize_google(audio)
-                    return text if text.strip() else None
-            except sr.UnknownValueError:
-                logger.info("Speech recognition could not understand audio")
-                return None
-            except sr.RequestError as e:
-                logger.error(f"Speech recognition service error: {e}")
-                return None
-            finally:
-                os.unlink(temp_path)
+            texts = []
+            for utterance, lag_ms in zip(utterances, endpoint_lags):
+                text = await self._recognize(utterance)
+                if text:
+                    texts.append(text)
+                self._record_endpoint_latency(lag_ms + (time.perf_counter() - received) * 1000)
+            if utterances or not self.vad.in_utterance:
+                self._partial_mark = 0
+            if interim and self.vad.in_utterance:
+                self.last_partial = await self._recognize_partial()
+            return " ".join(texts) if texts else None
                 
+        except StageTimeoutError as e:
+            logger.warning(str(e))
+            if e.pending is not None and not e.pending.done():
+                self._stale_stage = e.pending
+            elif e.pending is not None:
+                self._reset_stream_state()
+            return None
+        except AudioDecodeError as e:
+            self.last_error = str(e)
+            logger.error(f"Dropping undecodable audio stream: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error processing audio chunk: {e}")
             return None
     
+    def _decode_stream(self, audio_data, container: Optional[str], final: bool) -> bytearray:
+        """Push one chunk through the session's streaming decoder (executor stage)
+
+        A chunk that starts a new container means the client restarted its
+        recorder, so the old stream is flushed and a new decoder started.
+        Any failure marks the stream as failed and raises ``AudioDecodeError``.
+        """
+        head = None
+        try:
+            if container is not None:
+                if self.decoder is not None:
+                    head = self.decoder.finish()
+                    self.decoder = None
+                self.stream_container, self.stream_failed = container, False
+            if self.decoder is None:
+                self.decoder = StreamingDecoder(self.stream_container, sample_rate=self.sample_rate)
+            pcm = self.decoder.feed(audio_data)
+            if final:
+                pcm += self.decoder.finish()
+                self.decoder = None
+                self.stream_container = None
+        except Exception as e:
+            self.close_decoder()
+            name = self.stream_container
+            if final:
+                # The recording ended with this chunk, so there is nothing left to drop
+                self.stream_container = None
+            else:
+                self.stream_failed = True
+            if isinstance(e, AudioDecodeError):
+                raise
+            raise AudioDecodeError(f"Could not decode {name} audio: {e}") from e
+        if head:
+            head += pcm
+            return head
+        return pcm
+    
+    def _reset_stream_state(self):
+        """Start clean after a decode/analyze call timed out part-way through a chunk"""
+        if self.stream_container is not None:
+            # The decoder's place in the recording is unknown: drop the rest of it until a new header
+            self.close_decoder()
+            self.stream_failed = True
+        self.vad.reset()
+        self.prosody.reset()
+        if self.resampler is not None:
+            self.resampler.reset()
+        self._partial_mark = 0
+
+    def close_decoder(self):
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+    
+    def _segment(self, audio_data, final: bool, resample: bool = True) -> List[bytearray]:
+        """Resample if needed, extract features and run the VAD over one chunk (executor stage)"""
+        if resample and self.resampler is not None:
+            audio_data = self.resampler.process(audio_data)
+            if final:
+                audio_data = bytes(audio_data) + bytes(self.resampler.flush())
+        copied_before = self.vad.bytes_copied
+        features = self.features.extract(audio_data)
+        self.last_features = features
+        utterances = self.vad.process(audio_data, silent=features.is_silent)
+        if final:
+            tail = self.vad.flush()
+            if tail:
+                utterances.append(tail)
+        self.last_chunk_stats = {
+            "bytes_in": memoryview(audio_data).nbytes,
+            "bytes_copied": self.vad.bytes_copied - copied_before
+        }
+        return utterances
+    
+    def resident_bytes(self) -> int:
+        """Approximate bytes held by VAD and feature buffers"""
+        vad = self.vad
+        held = len(vad._pending) + len(vad._utterance) + len(vad._pre_roll) * vad.frame_bytes
+        extractor = self.features
+        held += (extractor._samples.nbytes + extractor._signs.nbytes + extractor._crossings.nbytes +
+                 extractor._windowed.nbytes + extractor._magnitude.nbytes)
+        held += self.prosody.pauses_ms.histogram.nbytes + self.prosody.pitch_hz.histogram.nbytes
+        return held
+    
+    def _record_endpoint_latency(self, latency_ms: float):
+        self.endpoint_latency.add(latency_ms)
+        self.last_endpoint_latency_ms.append(round(latency_ms, 1))
+    
+    async def _recognize_partial(self) -> Optional[str]:
+        """Recognise the open utterance if enough new audio arrived since the last hypothesis"""
+        if self.vad.utterance_bytes - self._partial_mark < self.interim_bytes:
+            return None
+        self._partial_mark = self.vad.utterance_bytes
+        return await self._recognize(self.vad.snapshot(), partial=True)
+    
+    async def _recognize(self, pcm_data, partial: bool = False) -> Optional[str]:
+        """Run speech recognition over one complete PCM16 utterance (or an open one's prefix)"""
+        if len(pcm_data) < self.sample_width:
+            return None
+        if partial:
+            self.partial_asr_calls += 1
+        else:
+            self.asr_calls += 1
+        try:
+            return await voice_executor.run(
+                "asr", self.engine.transcribe, pcm_data, self.sample_rate, self.sample_width
+            )
+        except StageTimeoutError as e:
+            logger.warning(str(e))
+            return None
+    
     def _has_speech(self, audio_segment: AudioSegment) -> bool:
         """Check if audio segment contains speech"""
         try:
-            # Get raw audio data
-            raw_audio = audio_segment.get_array_of_samples()
-            if len(raw_audio) == 0:
-                return False
-            
-            # Convert to numpy array for analysis
-            audio_array = np.array(raw_audio, dtype=np.float64)
-            
-            # Calculate RMS (Root Mean Square) to check audio level
-            rms = np.sqrt(np.mean(audio_array ** 2))
-            
-            # Calculate zero crossing rate as a simple speech indicator
-            zero_crossings = np.sum(np.diff(np.sign(audio_array)) != 0)
-            zcr = zero_crossings / len(audio_array)
-            
-            # Speech typically has higher RMS and moderate ZCR
-            # Adjust thresholds based on your audio characteristics
-            rms_threshold = 500  # Adjust based on your microphone sensitivity
-            zcr_threshold_min = 0.01  # Minimum ZCR for speech
-            zcr_threshold_max = 0.3   # Maximum ZCR for speech
-            
-            has_speech = (rms > rms_threshold and 
-                         zcr_threshold_min < zcr < zcr_threshold_max)
-            
-            logger.debug(f"Audio analysis - RMS: {rms:.2f}, ZCR: {zcr:.4f}, Has speech: {has_speech}")
-            
-            return has_speech
-            
+            features = self.features.extract(audio_segment.raw_data)
+            logger.debug(f"Audio analysis - RMS: {features.rms:.2f}, ZCR: {features.zcr:.4f}, Has speech: {features.has_speech}")
+            return features.has_speech
         except Exception as e:
             logger.error(f"Error in speech detection: {e}")
             return False
@@ -112,103 +580,107 @@ class InterviewSession:
         self.voice_processor = VoiceProcessor()
         self.transcript = []
         self.current_question_index = 0
-        self.audio_quality_metrics = []
+        self.audio_quality_metrics = MetricsRingBuffer()
+        # Owner of the interview; per-answer prosody is only persisted when known
+        self.user_email: Optional[str] = None
+        # Prosody summary of every completed answer, in order
+        self.answer_prosody: List[Dict[str, Any]] = []
+        self.closed = False
+        # Ordered per-session chunk queue for the Socket.IO voice event (set up by the server)
+        self.chunk_queue = None
+        # Held by callers across processing *and* emitting so results for one
+        # session go out in arrival order (asyncio.Lock wakes waiters FIFO)
+        self.lock = asyncio.Lock()
+        # Version of the last checkpoint written to / restored from shared state
+        self.state_version = 0
+        self._last_checkpoint = 0.0
+        # Transcript, metric, prosody and ASR counts already in shared state
+        self._synced = (0, 0, 0, 0)
         
-    async def process_interview_audio(self, audio_data: bytes, timestamp: float) -> Dict[str, Any]:
-        """Process interview audio and return analysis results"""
+    async def process_interview_audio(self, audio_data: bytes, timestamp: float, final: bool = False,
+                                      sample_rate: Optional[int] = None, channels: Optional[int] = None,
+                                      interim: bool = False, question_index: Optional[int] = None) -> Dict[str, Any]:
+        """Process interview audio and return analysis results
+
+        A ``final`` chunk ends the current answer: its prosody summary is
+        returned under ``prosody`` and saved to the interview analytics.
+        """
         result = {
             "transcript": None,
+            "partial_transcript": None,
             "audio_quality": None,
-            "feedback": None
+            "feedback": None,
+            "speech_active": False
         }
         
         # Process speech recognition
-        transcript = await self.voice_processor.process_audio_chunk(audio_data)
+        transcript = await self.voice_processor.process_audio_chunk(
+            audio_data, final=final, sample_rate=sample_rate, channels=channels, interim=interim
+        )
+        result["speech_active"] = self.voice_processor.vad.in_utterance
+        result["partial_transcript"] = self.voice_processor.last_partial
+        result["endpoint_latency_ms"] = self.voice_processor.last_endpoint_latency_ms
+        result["error"] = self.voice_processor.last_error
         if transcript:
             result["transcript"] = transcript
             self.transcript.append({
                 "text": transcript,
                 "timestamp": timestamp
             })
+            self.voice_processor.prosody.add_transcript(transcript)
         
-        # Analyze audio quality
-        quality_metrics = self._analyze_audio_quality(audio_data)
+        # Audio quality comes from the features computed alongside the VAD
+        quality_metrics = self._quality_metrics(self.voice_processor.last_features)
         result["audio_quality"] = quality_metrics
+        result["pipeline_stats"] = dict(self.voice_processor.last_chunk_stats)
         self.audio_quality_metrics.append(quality_metrics)
+        if final:
+            result["prosody"] = await self.complete_answer(question_index)
+        await self.checkpoint(force=bool(transcript) or final)
         
         return result
     
-    def _analyze_audio_quality(self, audio_data: bytes) -> Dict[str, float]:
-        """Analyze audio quality metrics"""
-        try:
-            # Ensure audio data length is even (16-bit samples)
-            if len(audio_data) % 2 != 0:
-                audio_data = audio_data[:-1]  # Remove last byte if odd length
-            
-            if len(audio_data) == 0:
-                return {"volume": 0.0, "snr": 0.0, "clarity": 0.0, "timestamp": asyncio.get_event_loop().time()}
-            
-            # Convert to numpy array with proper dtype
-            audio_array = np.frombuffer(audio_data, dtype=np.int16)
-            
-            if len(audio_array) == 0:
-                return {"volume": 0.0, "snr": 0.0, "clarity": 0.0, "timestamp": asyncio.get_event_loop().time()}
-            
-            # Calculate metrics
-            volume = np.sqrt(np.mean(audio_array.astype(np.float64)**2))
-            snr = self._calculate_snr(audio_array)
-            clarity = self._calculate_clarity(audio_array)
-            
-            return {
-                "volume": float(volume),
-                "snr": float(snr),
-                "clarity": float(clarity),
-                "timestamp": asyncio.get_event_loop().time()
-            }
-        except Exception as e:
-            logger.error(f"Error analyzing audio quality: {e}")
-            return {"volume": 0.0, "snr": 0.0, "clarity": 0.0, "timestamp": asyncio.get_event_loop().time()}
+    async def complete_answer(self, question_index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Close the current answer's prosody metrics and persist them to interview_analytics"""
+        prosody = self.voice_processor.prosody
+        if not prosody.has_speech:
+            prosody.reset()
+            return None
+        if question_index is None:
+            question_index = self.current_question_index
+        summary = {"question_index": question_index, **prosody.finish_answer()}
+        self.answer_prosody.append(summary)
+        self.current_question_index = question_index + 1
+        if self.user_email:
+            # Imported here: db_utils initializes the database on import
+            from db_utils import save_interview_analytics
+            try:
+                await voice_executor.run(
+                    "persist", save_interview_analytics, self.session_id, self.user_email,
+                    None, {"prosody": summary}, None
+                )
+            except Exception as e:
+                logger.error(f"Error saving prosody for session {self.session_id}: {e}")
+        return summary
     
-    def _calculate_snr(self, audio_array: np.ndarray) -> float:
-        """Calculate Signal-to-Noise Ratio"""
-        try:
-            # Simple SNR calculation
-            signal_power = np.mean(audio_array.astype(np.float64)**2)
-            noise_estimate = np.percentile(audio_array.astype(np.float64)**2, 10)  # Assume 10th percentile is noise
-            
-            # Avoid division by zero and negative values
-            if noise_estimate <= 0 or signal_power <= 0:
-                return 0.0
-                
-            snr = 10 * np.log10(signal_power / noise_estimate)
-            return max(0, snr)
-        except Exception as e:
-            logger.error(f"Error calculating SNR: {e}")
-            return 0.0
+    def _quality_metrics(self, features: Optional[AudioFeatures]) -> Dict[str, float]:
+        """Map extracted features to the per-chunk quality record"""
+        if features is None:
+            return {"volume": 0.0, "snr": 0.0, "clarity": 0.0, "timestamp": time.monotonic()}
+        return {
+            "volume": features.rms,
+            "snr": features.snr,
+            "clarity": features.clarity,
+            "timestamp": time.monotonic()
+        }
     
-    def _calculate_clarity(self, audio_array: np.ndarray) -> float:
-        """Calculate audio clarity score"""
+    def _analyze_audio_quality(self, audio_data: bytes) -> Dict[str, float]:
+        """Analyze audio quality metrics for a standalone chunk"""
         try:
-            # Ensure we have enough samples for FFT
-            if len(audio_array) < 64:
-                return 0.0
-                
-            # Calculate spectral centroid as a measure of clarity
-            fft = np.fft.fft(audio_array.astype(np.float64))
-            freqs = np.fft.fftfreq(len(audio_array))
-            magnitude = np.abs(fft)
-            
-            # Avoid division by zero
-            total_magnitude = np.sum(magnitude)
-            if total_magnitude <= 0:
-                return 0.0
-            
-            # Spectral centroid
-            centroid = np.sum(freqs * magnitude) / total_magnitude
-            return min(1.0, max(0.0, abs(centroid) / 8000))  # Normalize to 0-1
+            return self._quality_metrics(self.voice_processor.features.extract(audio_data))
         except Exception as e:
-            logger.error(f"Error calculating clarity: {e}")
-            return 0.0
+            logger.error(f"Error analyzing audio quality: {e}")
+            return self._quality_metrics(None)
     
     def get_session_summary(self) -> Dict[str, Any]:
         """Get comprehensive session summary"""
@@ -216,16 +688,262 @@ class InterviewSession:
             "session_id": self.session_id,
             "role": self.role,
             "total_questions": len(self.transcript),
-            "average_audio_quality": np.mean([m["clarity"] for m in self.audio_quality_metrics]) if self.audio_quality_metrics else 0,
+            "average_audio_quality": self.audio_quality_metrics.mean("clarity"),
+            "audio_quality_stats": self.audio_quality_metrics.summary(),
+            "asr_calls": self.voice_processor.asr_calls,
+            "partial_asr_calls": self.voice_processor.partial_asr_calls,
+            "asr_engine": self.voice_processor.engine.name,
+            "endpoint_latency_ms": self.voice_processor.endpoint_latency.to_dict(),
+            "answer_prosody": self.answer_prosody,
+            "current_answer_prosody": self.voice_processor.prosody.summary(),
             "transcript": self.transcript,
-            "audio_metrics": self.audio_quality_metrics
+            "audio_metrics": self.audio_quality_metrics.to_list(),
+            # Resume point for delta requests after a full resync
+            "cursor": format_session_cursor(len(self.transcript), self.audio_quality_metrics.total)
+        }
+
+    def get_session_delta(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Transcript segments and metric points added since ``cursor``, plus O(1) aggregates
+
+        The returned ``cursor`` is what the client should send next time.
+        Metric points older than the ring buffer's window are no longer
+        available; ``metrics_truncated`` tells the client it missed some.
+        """
+        transcript_index, metrics_index = parse_session_cursor(cursor)
+        transcript_index = min(transcript_index, len(self.transcript))
+        metrics = self.audio_quality_metrics
+        oldest_retained = max(0, metrics.total - metrics.capacity)
+        return {
+            "session_id": self.session_id,
+            "cursor": format_session_cursor(len(self.transcript), metrics.total),
+            "transcript": self.transcript[transcript_index:],
+            "audio_metrics": metrics.to_list(start=metrics_index),
+            "metrics_truncated": metrics_index < oldest_retained,
+            "aggregates": {
+                "total_questions": len(self.transcript),
+                "average_audio_quality": metrics.mean("clarity"),
+                "audio_quality_stats": metrics.summary(),
+                "asr_calls": self.voice_processor.asr_calls,
+                "endpoint_latency_ms": self.voice_processor.endpoint_latency.to_dict(),
+            }
         }
+    
+    def resident_bytes(self) -> int:
+        """Approximate memory held by this session (transcript, metrics, audio buffers)"""
+        held = sys.getsizeof(self.transcript) + self.audio_quality_metrics.nbytes
+        for entry in self.transcript:
+            held += sys.getsizeof(entry) + sys.getsizeof(entry.get("text", ""))
+        return held + self.voice_processor.resident_bytes()
+    
+    def export_state(self) -> Dict[str, Any]:
+        """Snapshot of the state other workers need to continue this interview.
+
+        In-flight VAD audio is not included: a half-spoken utterance stays
+        with the worker that received it.
+        """
+        return {
+            "version": self.state_version,
+            "session_id": self.session_id,
+            "role": self.role,
+            "current_question_index": self.current_question_index,
+            "transcript": list(self.transcript),
+            "asr_calls": self.voice_processor.asr_calls,
+            "metrics": self.audio_quality_metrics.export_state(SESSION_CHECKPOINT_METRIC_POINTS),
+            "endpoint_latency": self.voice_processor.endpoint_latency.export_state(),
+            "user_email": self.user_email,
+            "answer_prosody": list(self.answer_prosody),
+            "prosody": self.voice_processor.prosody.export_state(),
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Replace the durable parts of this session with a shared-state snapshot"""
+        self.role = state.get("role", self.role)
+        self.current_question_index = state.get("current_question_index", 0)
+        self.transcript = list(state.get("transcript", []))
+        self.voice_processor.asr_calls = state.get("asr_calls", 0)
+        self.audio_quality_metrics = MetricsRingBuffer.from_state(state["metrics"])
+        if "endpoint_latency" in state:
+            self.voice_processor.endpoint_latency.load_state(state["endpoint_latency"])
+        self.user_email = state.get("user_email", self.user_email)
+        self.answer_prosody = list(state.get("answer_prosody", []))
+        if "prosody" in state:
+            self.voice_processor.prosody.load_state(state["prosody"])
+        self.state_version = state.get("version", 0)
+        self._last_checkpoint = time.monotonic()
+        self._synced = self._sync_marks()
+
+    def _sync_marks(self) -> Tuple[int, int, int, int]:
+        return (len(self.transcript), self.audio_quality_metrics.total, len(self.answer_prosody),
+                self.voice_processor.asr_calls)
+
+    def _merge_stored_state(self, state: Dict[str, Any]):
+        """Rebase this worker's unsynced appends onto a newer snapshot written by another worker
 
-# Global session storage
-interview_sessions: Dict[str, InterviewSession] = {}
+        Our new transcript entries and metric points go after the stored
+        ones (socket timestamps come from each worker's own loop clock, so
+        they cannot order entries across workers). The in-progress answer
+        (VAD, prosody tracker) and latency stats stay as they are here.
+        """
+        transcript_mark, metrics_mark, prosody_mark, asr_mark = self._synced
+        transcript = list(state.get("transcript", [])) + self.transcript[transcript_mark:]
+        metrics = MetricsRingBuffer.from_state(state["metrics"])
+        for point in self.audio_quality_metrics.to_list(metrics_mark):
+            metrics.append(point)
+        asr_calls = state.get("asr_calls", 0) + self.voice_processor.asr_calls - asr_mark
+        self.transcript = transcript
+        self.audio_quality_metrics = metrics
+        self.answer_prosody = list(state.get("answer_prosody", [])) + self.answer_prosody[prosody_mark:]
+        self.voice_processor.asr_calls = asr_calls
+        self.current_question_index = max(self.current_question_index, state.get("current_question_index", 0))
+        self.state_version = state.get("version", 0)
+        self._synced = (len(state.get("transcript", [])), int(state["metrics"]["total"]),
+                        len(state.get("answer_prosody", [])), state.get("asr_calls", 0))
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "InterviewSession":
+        session = cls(state["session_id"], state.get("role", ""))
+        session.restore_state(state)
+        return session
+
+    async def checkpoint(self, force: bool = False):
+        """Write this session to the shared state backend (rate limited unless ``force``)"""
+        backend = session_state
+        if not backend.shared or self.closed:
+            return
+        if not force and time.monotonic() - self._last_checkpoint < SESSION_CHECKPOINT_INTERVAL:
+            return
+        self._last_checkpoint = time.monotonic()
+        try:
+            for attempt in range(SESSION_CHECKPOINT_RETRIES):
+                self.state_version += 1
+                marks = self._sync_marks()
+                if await voice_executor.run("checkpoint", backend.save, self.session_id, self.export_state()):
+                    self._synced = marks
+                    session_state_stats["checkpoints"] += 1
+                    return
+                # Another worker checkpointed first: take its state, replay what we appended, try again
+                session_state_stats["checkpoint_conflicts"] += 1
+                stored = await voice_executor.run("restore", session_state.load, self.session_id)
+                if stored is None:
+                    logger.warning(f"Voice session {self.session_id} was closed by another worker; not checkpointing")
+                    return
+                self._merge_stored_state(stored)
+        except Exception as e:
+            session_state_stats["checkpoint_errors"] += 1
+            logger.error(f"Error checkpointing voice session {self.session_id}: {e}")
+            return
+        session_state_stats["checkpoint_errors"] += 1
+        logger.error(f"Gave up checkpointing voice session {self.session_id} after "
+                     f"{SESSION_CHECKPOINT_RETRIES} conflicting writes")
+
+    async def aclose(self):
+        """Close once any chunk being processed is done (the session store calls this on the event loop)"""
+        async with self.lock:
+            self.close()
+
+    def close(self):
+        """Release buffered audio; called when the session is ended or evicted"""
+        if self.chunk_queue is not None:
+            self.chunk_queue.close()
+        self.voice_processor.close_decoder()
+        self.voice_processor.vad.reset()
+        self.closed = True
+
+def parse_session_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    """Decode a "<transcript_index>:<metrics_index>" cursor; empty means from the start"""
+    if not cursor:
+        return 0, 0
+    try:
+        transcript_part, metrics_part = str(cursor).split(":", 1)
+        transcript_index, metrics_index = int(transcript_part), int(metrics_part)
+    except ValueError:
+        raise ValueError(f"Invalid session cursor: {cursor!r}")
+    if transcript_index < 0 or metrics_index < 0:
+        raise ValueError(f"Invalid session cursor: {cursor!r}")
+    return transcript_index, metrics_index
+
+def format_session_cursor(transcript_index: int, metrics_index: int) -> str:
+    return f"{transcript_index}:{metrics_index}"
+
+# Global session storage (idle-TTL + LRU bounded)
+interview_sessions = SessionStore()
+
+# Checkpoints shared between workers (in-process unless SESSION_STATE_BACKEND says otherwise)
+session_state: SessionStateBackend = create_state_backend()
+session_state_stats = {"checkpoints": 0, "checkpoint_errors": 0, "checkpoint_conflicts": 0, "restores": 0}
+
+def set_session_state_backend(backend: SessionStateBackend) -> SessionStateBackend:
+    """Replace the shared session-state backend (e.g. in tests)"""
+    global session_state
+    session_state = backend
+    return backend
+
+async def _load_shared_state(session_id: str, session: Optional[InterviewSession]) -> Optional[Dict[str, Any]]:
+    """Shared snapshot of ``session_id`` if it is newer than the resident copy"""
+    if not session_state.shared:
+        return None
+    try:
+        version = await voice_executor.run("restore", session_state.version, session_id)
+        if version is None or (session is not None and version <= session.state_version):
+            return None
+        state = await voice_executor.run("restore", session_state.load, session_id)
+    except Exception as e:
+        logger.error(f"Error loading shared state for voice session {session_id}: {e}")
+        return None
+    if state:
+        session_state_stats["restores"] += 1
+    return state
+
+async def _restore_session(session: InterviewSession, state: Dict[str, Any]):
+    # Under the session lock so a chunk being processed never sees a half-restored session
+    async with session.lock:
+        if state.get("version", 0) > session.state_version:
+            session.restore_state(state)
+
+async def get_or_create_session(session_id: str, role: str) -> InterviewSession:
+    """Get existing session or create new one, picking up work done by other workers"""
+    session = interview_sessions.get_or_create(session_id, lambda: InterviewSession(session_id, role))
+    state = await _load_shared_state(session_id, session)
+    if state:
+        await _restore_session(session, state)
+    return session
+
+async def get_session(session_id: str) -> Optional[InterviewSession]:
+    """Return a live session (resident or in shared state) without creating one"""
+    session = interview_sessions.get(session_id)
+    state = await _load_shared_state(session_id, session)
+    if state is None:
+        return session
+    if session is None:
+        return interview_sessions.get_or_create(session_id, lambda: InterviewSession.from_state(state))
+    await _restore_session(session, state)
+    return session
+
+async def close_session(session_id: str) -> bool:
+    """Drop a session explicitly; returns False if it was neither resident nor shared"""
+    shared = False
+    if session_state.shared:
+        try:
+            shared = await voice_executor.run("restore", session_state.version, session_id) is not None
+            await voice_executor.run("restore", session_state.delete, session_id)
+        except Exception as e:
+            logger.error(f"Error deleting shared state for voice session {session_id}: {e}")
+    closed = interview_sessions.close(session_id)
+    await interview_sessions.wait_closed()
+    return closed or shared
 
-def get_or_create_session(session_id: str, role: str) -> InterviewSession:
-    """Get existing session or create new one"""
-    if session_id not in interview_sessions:
-        interview_sessions[session_id] = InterviewSession(session_id, role)
-    return interview_sessions[session_id] 
\ No newline at end of file
+def get_session_metrics() -> Dict[str, Any]:
+    """Live-session, eviction, resident-memory and chunk-queue metrics for the voice store"""
+    metrics = interview_sessions.get_metrics()
+    queues = [session.chunk_queue.get_stats() for session in interview_sessions.values()
+              if session.chunk_queue is not None]
+    metrics["chunk_queues"] = {
+        "active": len(queues),
+        "total_depth": sum(q["depth"] for q in queues),
+        "max_depth": max((q["depth"] for q in queues), default=0),
+        "throttled": sum(1 for q in queues if q["throttled"]),
+        "dropped": sum(q["dropped"] for q in queues),
+        "coalesced": sum(q["coalesced"] for q in queues),
+    }
+    metrics["shared_state"] = {"backend": session_state.name, "shared": session_state.shared, **session_state_stats}
+    return metrics
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from audio_decoder import FFMPEG_INPUT_FORMATS, detect_container
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+VOICE_QUEUE_MAX_DEPTH = int(os.getenv("VOICE_QUEUE_MAX_DEPTH", "32"))
+VOICE_QUEUE_COALESCE_THRESHOLD = int(os.getenv("VOICE_QUEUE_COALESCE_THRESHOLD", "8"))
+VOICE_QUEUE_MAX_ITEM_BYTES = int(os.getenv("VOICE_QUEUE_MAX_ITEM_BYTES", str(16000 * 2 * 10)))  # 10 s of PCM16
+# Metadata that says how a chunk is decoded or reported; chunks are only merged when these match
+MERGE_METADATA_KEYS = ("sample_rate", "channels", "interim", "question_index")
+
+
+@dataclass
+class QueuedChunk:
+    seq: int
+    audio: Any  # bytes-like; becomes a bytearray once coalesced
+    sid: Optional[str] = None
+    final: bool = False
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    last_seq: int = -1
+    coalesced: int = 1
+    container: Optional[str] = None  # "wav"/"webm"/"ogg" this chunk belongs to; None for raw PCM
+
+    def __post_init__(self):
+        if self.last_seq < 0:
+            self.last_seq = self.seq
+
+
+def _merge_key(metadata: Dict[str, Any]):
+    return tuple(metadata.get(key) for key in MERGE_METADATA_KEYS)
+
+
+class VoiceChunkQueue:
+    """Bounded, ordered per-session queue for incoming voice chunks.
+
+    Chunks get increasing sequence numbers and are handled one at a time by
+    a single drain task, so results always go out in sequence order. Once
+    the backlog reaches ``coalesce_threshold`` new audio is appended to the
+    newest queued chunk instead of queueing behind it, if both are raw PCM
+    with the same format metadata or both belong to the same WebM/Ogg
+    stream; a chunk that starts a container (WAV, or a new WebM/Ogg
+    recording) is always queued on its own. At ``max_depth`` the
+    oldest waiting non-final chunk is dropped; final chunks close an answer
+    and are never dropped. WebM/Ogg streams are never dropped either (losing
+    a piece would corrupt everything decoded after it): at ``max_depth``
+    their audio is merged into the newest chunk regardless of
+    ``max_item_bytes``. Crossing the threshold sends a ``slow_down``
+    backpressure notice, and draining to half of it sends ``resume``.
+    """
+
+    def __init__(self,
+                 handler: Callable[[QueuedChunk], Awaitable[None]],
+                 notify: Optional[Callable[[Optional[str], Dict[str, Any]], Awaitable[None]]] = None,
+                 max_depth: int = VOICE_QUEUE_MAX_DEPTH,
+                 coalesce_threshold: int = VOICE_QUEUE_COALESCE_THRESHOLD,
+                 max_item_bytes: int = VOICE_QUEUE_MAX_ITEM_BYTES):
+        self.handler = handler
+        self.notify = notify
+        self.max_depth = max_depth
+        self.coalesce_threshold = min(coalesce_threshold, max_depth)
+        self.low_watermark = self.coalesce_threshold // 2
+        self.max_item_bytes = max_item_bytes
+        self._items: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._throttled = False
+        self._last_sid: Optional[str] = None
+        self._container: Optional[str] = None  # "webm"/"ogg" while a compressed stream is being queued
+        self.next_seq = 0
+        self.stats = {
+            "enqueued": 0,
+            "processed": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "backpressure_events": 0,
+            "max_depth_seen": 0,
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self._items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "depth": self.depth, "throttled": self._throttled}
+
+    async def put(self, audio, sid: Optional[str] = None, final: bool = False,
+                  metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Enqueue a chunk and return its sequence number"""
+        seq = self.next_seq
+        self.next_seq += 1
+        self.stats["enqueued"] += 1
+        self._last_sid = sid
+
+        kind = detect_container(audio)
+        if kind is not None:
+            self._container = kind if kind in FFMPEG_INPUT_FORMATS else None
+
+        container = kind or self._container
+        metadata = metadata or {}
+        tail = self._items[-1] if self._items else None
+        mergeable = (tail is not None and kind is None and not tail.final and tail.sid == sid
+                     and tail.container == container and _merge_key(tail.metadata) == _merge_key(metadata))
+        if (mergeable and self.depth >= self.coalesce_threshold
+                and len(tail.audio) + len(audio) <= self.max_item_bytes):
+            self._merge(tail, seq, audio, final)
+        elif mergeable and self.depth >= self.max_depth and container is not None:
+            self._merge(tail, seq, audio, final)
+        else:
+            if self.depth >= self.max_depth and self._container is None:
+                self._drop_oldest()
+            self._items.append(QueuedChunk(seq=seq, audio=audio, sid=sid, final=final, metadata=metadata,
+                                           container=container))
+
+        self.stats["max_depth_seen"] = max(self.stats["max_depth_seen"], self.depth)
+        if not self._throttled and self.depth >= self.coalesce_threshold:
+            self._throttled = True
+            await self._signal("slow_down", sid)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+        return seq
+
+    def _merge(self, tail: QueuedChunk, seq: int, audio, final: bool):
+        if not isinstance(tail.audio, bytearray):
+            tail.audio = bytearray(tail.audio)
+        tail.audio.extend(audio)
+        tail.final = final
+        tail.last_seq = seq
+        tail.coalesced += 1
+        self.stats["coalesced"] += 1
+
+    def _drop_oldest(self):
+        for index, stale in enumerate(self._items):
+            if not stale.final:
+                del self._items[index]
+                self.stats["dropped"] += stale.coalesced
+                logger.warning(f"Voice queue full; dropped chunks {stale.seq}-{stale.last_seq}")
+                return
+        logger.warning(f"Voice queue full of final chunks; keeping all {self.depth}")
+
+    async def join(self):
+        """Wait until everything queued so far has been handled"""
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    def close(self):
+        self._items.clear()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _drain(self):
+        while self._items:
+            item = self._items.popleft()
+            try:
+                await self.handler(item)
+            except Exception as e:
+                logger.error(f"Error handling voice chunk {item.seq}: {e}", exc_info=True)
+            self.stats["processed"] += item.coalesced
+            if self._throttled and self.depth <= self.low_watermark:
+                self._throttled = False
+                await self._signal("resume", item.sid)
+
+    async def _signal(self, status: str, sid: Optional[str]):
+        self.stats["backpressure_events"] += 1
+        if self.notify is None:
+            return
+        try:
+            await self.notify(sid or self._last_sid, {
+                "status": status,
+                "queue_depth": self.depth,
+                "dropped": self.stats["dropped"],
+            })
+        except Exception as e:
+            logger.error(f"Error sending voice backpressure signal: {e}")
@@ -6,6 +6,7 @@ import './VoiceInterview.css';
 const VoiceInterview = ({ sessionId, role, onTranscriptUpdate, onAudioQualityUpdate, selectedAudioDevice }) => {
     const [isRecording, setIsRecording] = useState(false);
     const [transcript, setTranscript] = useState('');
+    const [partialTranscript, setPartialTranscript] = useState('');
     const [audioQuality, setAudioQuality] = useState(null);
     const [isConnected, setIsConnected] = useState(false);
     const [error, setError] = useState(null);
@@ -280,6 +281,12 @@ const VoiceInterview = ({ sessionId, role, onTranscriptUpdate, onAudioQualityUpd
             
             socketRef.current.on('voice_result', (data) => {
                 console.log('🎤 Received voice result:', data);
+                // Interim hypothesis for the utterance still being spoken; replaced by the final text
+                if (data.partial_transcript) {
+                    setPartialTranscript(data.partial_transcript);
+                } else if (data.is_final) {
+                    setPartialTranscript('');
+                }
                 if (data.transcript) {
                     console.log('📝 Updating transcript with:', data.transcript);
                     setTranscript(prev => {
@@ -359,7 +366,8 @@ const VoiceInterview = ({ sessionId, role, onTranscriptUpdate, onAudioQualityUpd
             mediaRecorderRef.current.ondataavailable = (event) => {
                 if (event.data.size > 0) {
                     audioChunksRef.current.push(event.data);
-                    processAudioChunk(event.data);
+                    // The last chunk arrives after stop(), when the recorder is inactive
+                    processAudioChunk(event.data, mediaRecorderRef.current.state === 'inactive');
                 }
             };
             
@@ -387,25 +395,24 @@ const VoiceInterview = ({ sessionId, role, onTranscriptUpdate, onAudioQualityUpd
         }
     };
 
-    const processAudioChunk = async (audioBlob) => {
+    const processAudioChunk = async (audioBlob, final = false) => {
         try {
-            // Convert WebM to WAV format for better compatibility
-            const audioContext = new (window.AudioContext || window.webkitAudioContext)();
-            const arrayBuffer = await audioBlob.arrayBuffer();
-            const audioBuffer = await audioContext.decodeAudioData(arrayBuffer);
-            
-            // Convert to WAV format
-            const wavBlob = await convertToWav(audioBuffer);
-            const wavArrayBuffer = await wavBlob.arrayBuffer();
-            const base64Audio = btoa(String.fromCharCode(...new Uint8Array(wavArrayBuffer)));
+            // Send the recorder's WebM/Opus chunk as-is; the server keeps one
+            // streaming decoder per session, so only the first chunk carries
+            // the container header and nothing is re-decoded in the browser
+            const audioArrayBuffer = await audioBlob.arrayBuffer();
             
-            // Send to server via WebSocket
             if (socketRef.current && isConnected) {
                 socketRef.current.emit('voice', {
                     type: 'voice',
-                    audio_data: base64Audio,
+                    audio_data: audioArrayBuffer,
                     session_id: sessionId,
                     role: role,
+                    final: final,
+                    interim: true,
+                    // Lets the server file this answer's prosody summary under the right question
+                    question_index: questionIndex,
+                    user_email: localStorage.getItem('user_email'),
                     timestamp: Date.now()
                 });
             }
@@ -414,48 +421,6 @@ const VoiceInterview = ({ sessionId, role, onTranscriptUpdate, onAudioQualityUpd
         }
     };
 
-    const convertToWav = async (audioBuffer) => {
-        const numChannels = audioBuffer.numberOfChannels;
-        const sampleRate = audioBuffer.sampleRate;
-        const length = audioBuffer.length;
-        
-        // Create WAV header
-        const buffer = new ArrayBuffer(44 + length * numChannels * 2);
-        const view = new DataView(buffer);
-        
-        // WAV header
-        const writeString = (offset, string) => {
-            for (let i = 0; i < string.length; i++) {
-                view.setUint8(offset + i, string.charCodeAt(i));
-            }
-        };
-        
-        writeString(0, 'RIFF');
-        view.setUint32(4, 36 + length * numChannels * 2, true);
-        writeString(8, 'WAVE');
-        writeString(12, 'fmt ');
-        view.setUint32(16, 16, true);
-        view.setUint16(20, 1, true);
-        view.setUint16(22, numChannels, true);
-        view.setUint32(24, sampleRate, true);
-        view.setUint32(28, sampleRate * numChannels * 2, true);
-        view.setUint16(32, numChannels * 2, true);
-        view.setUint16(34, 16, true);
-        writeString(36, 'data');
-        view.setUint32(40, length * numChannels * 2, true);
-        
-        // Convert audio data
-        const offset = 44;
-        for (let i = 0; i < length; i++) {
-            for (let channel = 0; channel < numChannels; channel++) {
-                const sample = Math.max(-1, Math.min(1, audioBuffer.getChannelData(channel)[i]));
-                view.setInt16(offset + (i * numChannels + channel) * 2, sample * 0x7FFF, true);
-            }
-        }
-        
-        return new Blob([buffer], { type: 'audio/wav' });
-    };
-
     const clearTranscript = () => {
         setTranscript('');
     };
@@ -720,8 +685,11 @@ const VoiceInterview = ({ sessionId, role, onTranscriptUpdate, onAudioQualityUpd
                 
                 <div className="transcript-content">
                     {console.log('🔍 Rendering transcript panel, transcript:', transcript)}
-                    {transcript ? (
-                        <p>{transcript}</p>
+                    {transcript || partialTranscript ? (
+                        <p>
+                            {transcript}
+                            {partialTranscript && <span className="partial-transcript"> {partialTranscript}</span>}
+                        </p>
                     ) : (
                         <p className="placeholder-text">
                             Start recording to see live transcription...
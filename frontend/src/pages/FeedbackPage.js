@@ -170,16 +170,39 @@ const FeedbackPage = () => {
         return;
       }
 
+      // Stream the feedback as NDJSON so each section renders as soon as it is generated
       const res = await fetch(`${config.BACKEND_URL}/api/llm/comprehensive-feedback`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ session_data: payload, role: payload.role })
+        body: JSON.stringify({ session_data: payload, role: payload.role, stream: 'ndjson' })
       });
-      const data = await res.json();
-      if (!res.ok || !data.success) {
+      if (!res.ok || !res.body) {
+        const data = await res.json().catch(() => null);
         throw new Error(data?.error || 'Failed to get AI feedback');
       }
-      setAiFeedback(data.feedback);
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffered = '';
+      let finished = false;
+      while (!finished) {
+        const { value, done } = await reader.read();
+        buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+        const lines = buffered.split('\n');
+        buffered = done ? '' : lines.pop();
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const record = JSON.parse(line);
+          if (record.type === 'section') {
+            setAiFeedback(prev => ({ ...(prev || {}), [record.name]: record.value }));
+            setLoading(false);
+          } else if (record.type === 'result') {
+            setAiFeedback(record.feedback);
+          } else if (record.type === 'error') {
+            throw new Error(record.error || 'Failed to get AI feedback');
+          }
+        }
+        finished = done;
+      }
     } catch (e) {
       setError(e.message);
       showToast('Could not retrieve AI feedback. Showing your raw responses instead.', 'warning');
@@ -849,12 +849,31 @@ const InterviewPage = () => {
       // Save response to backend (only if backend is available)
       if (!connectionError) {
         try {
+          // Stream the recording as the raw request body; the response row references it by hash
+          let audioSha256 = null;
+          if (audioBlob) {
+            const uploadResponse = await fetch(`${config.BACKEND_URL}/api/interview/response/audio`, {
+              method: 'POST',
+              headers: {
+                'Content-Type': audioBlob.type || 'application/octet-stream',
+              },
+              body: audioBlob
+            });
+            const upload = await uploadResponse.json();
+            if (upload.success) {
+              audioSha256 = upload.audioSha256;
+            } else {
+              console.error('Audio upload failed:', upload.error);
+            }
+          }
+
+          const { audioBlob: _localAudio, ...responsePayload } = responseData;
           const response = await fetch(`${config.BACKEND_URL}/api/interview/response`, {
             method: 'POST',
             headers: {
               'Content-Type': 'application/json',
             },
-            body: JSON.stringify(responseData)
+            body: JSON.stringify({ ...responsePayload, audioSha256 })
           });
 
           const data = await response.json();